@@ -0,0 +1,91 @@
+"""
+Pengukur waktu & memori per tahap benchmark.
+
+Memori diukur dari RSS proses (bukan tracemalloc), karena kolom string pandas
+berbasis Arrow dan buffer numpy besar tidak selalu tercatat oleh tracemalloc.
+Pengukur RSS, sampler puncak dan penghitung baris sama dengan yang dipakai
+dashboard (common/diagnostics.py), jadi angka benchmark & log diagnostik sebanding.
+"""
+import time
+import traceback
+
+from common.diagnostics import count_rows, current_rss_mb, track_peak
+
+
+class StageProfiler:
+    """
+    Jalankan tahap satu per satu dan kumpulkan hasil ukurnya di `records`.
+
+    Tiap record: suite, dataset_rows, stage, status, seconds, rss_before_mb,
+    peak_rss_mb, peak_delta_mb, rss_after_mb, rows_in, rows_out, error.
+    """
+
+    def __init__(self, suite, dataset_rows, skip_stages=()):
+        self.suite = suite
+        self.dataset_rows = dataset_rows
+        self.skip_stages = set(skip_stages)
+        self.records = []
+
+    def _record(self, stage, status, **fields):
+        record = {
+            'suite': self.suite,
+            'dataset_rows': self.dataset_rows,
+            'stage': stage,
+            'status': status,
+            'seconds': None,
+            'rss_before_mb': None,
+            'peak_rss_mb': None,
+            'peak_delta_mb': None,
+            'rss_after_mb': None,
+            'rows_in': None,
+            'rows_out': None,
+            'error': None,
+        }
+        record.update(fields)
+        self.records.append(record)
+        return record
+
+    def run(self, stage, fn, *args, rows_in=None, **kwargs):
+        """
+        Jalankan fn(*args, **kwargs) sebagai satu tahap dan kembalikan hasilnya.
+        Error dicatat di record lalu dilempar ulang (tahap berikutnya biasanya bergantung).
+        Tahap yang ada di `skip_stages` tidak dijalankan dan mengembalikan None.
+        """
+        if stage in self.skip_stages:
+            self.skip(stage, 'dinonaktifkan lewat --skip', rows_in=rows_in)
+            return None
+        sampler = None
+        start = time.perf_counter()
+        try:
+            with track_peak() as sampler:
+                result = fn(*args, **kwargs)
+        except Exception as e:
+            self._record(
+                stage, 'error',
+                seconds=round(time.perf_counter() - start, 4),
+                rss_before_mb=round(sampler.start_mb, 1),
+                peak_rss_mb=round(sampler.peak_mb, 1),
+                peak_delta_mb=round(sampler.peak_mb - sampler.start_mb, 1),
+                rows_in=rows_in,
+                error=f"{type(e).__name__}: {e}\n{traceback.format_exc(limit=3)}",
+            )
+            raise
+        seconds = time.perf_counter() - start
+        record = self._record(
+            stage, 'ok',
+            seconds=round(seconds, 4),
+            rss_before_mb=round(sampler.start_mb, 1),
+            peak_rss_mb=round(sampler.peak_mb, 1),
+            peak_delta_mb=round(sampler.peak_mb - sampler.start_mb, 1),
+            rss_after_mb=round(current_rss_mb(), 1),
+            rows_in=rows_in,
+            rows_out=count_rows(result),
+        )
+        print(f"⏱️ {self.suite}/{stage}: {record['seconds']:.2f}s, "
+              f"puncak +{record['peak_delta_mb']:.0f} MB")
+        return result
+
+    def skip(self, stage, reason, rows_in=None):
+        """Catat tahap yang sengaja dilewati (misal melebihi batas baris Excel)."""
+        print(f"⏭️ {self.suite}/{stage}: dilewati ({reason})")
+        return self._record(stage, 'skipped', rows_in=rows_in, error=reason)
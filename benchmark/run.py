@@ -0,0 +1,206 @@
+"""
+Jalankan benchmark RCA / TT di beberapa ukuran data dan simpan hasilnya sebagai JSON.
+
+Contoh:
+    python -m benchmark.run --sizes 10k 100k
+    python -m benchmark.run --sizes 1M --suites rca program --skip train_model
+    python -m benchmark.run --compare benchmark/results/lama.json benchmark/results/baru.json
+
+File hasil berisi metadata (commit git, versi library, CPU) + satu record per
+(suite, ukuran data, tahap), jadi dua commit bisa dibandingkan dengan --compare.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+from .suites import ROOT_DIR, SUITES, SUITE_DATA
+from .synthetic import ensure_dataset, parse_rows
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATA_DIR = os.path.join(BENCH_DIR, 'data')
+DEFAULT_RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+DEFAULT_SIZES = ['10k', '100k']
+# Rasio (baru / lama) di atas batas ini dianggap regresi oleh --compare
+DEFAULT_THRESHOLD = 1.2
+
+
+def git_revision():
+    """Commit pendek + penanda '-dirty' bila ada perubahan yang belum di-commit."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f"{commit}-dirty" if dirty else commit
+
+
+def environment_info():
+    info = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+    for name in ['pandas', 'numpy', 'pyarrow', 'sklearn']:
+        try:
+            info[name] = __import__(name).__version__
+        except ImportError:
+            info[name] = None
+    return info
+
+
+def run_suite_process(suite, data_path, rows, work_dir, skip_stages):
+    """Jalankan satu suite di proses Python baru dan kembalikan record-nya."""
+    output_path = os.path.join(work_dir, f"{suite}_{rows}.json")
+    command = [
+        sys.executable, '-m', 'benchmark.suites', suite,
+        '--data', data_path, '--rows', str(rows),
+        '--work-dir', os.path.join(work_dir, f"{suite}_{rows}"),
+        '--output', output_path,
+    ]
+    if skip_stages:
+        command += ['--skip', *skip_stages]
+    completed = subprocess.run(command, cwd=ROOT_DIR)
+    if not os.path.exists(output_path):
+        return [{
+            'suite': suite, 'dataset_rows': rows, 'stage': '*', 'status': 'error',
+            'error': f'proses suite keluar dengan kode {completed.returncode}',
+        }]
+    with open(output_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def run_benchmark(sizes, suites, data_dir=DEFAULT_DATA_DIR, skip_stages=(), seed=42, keep_work=False):
+    """Jalankan semua kombinasi suite x ukuran. Return dict {'meta': ..., 'results': [...]}."""
+    started = datetime.now()
+    results = []
+    work_dir = tempfile.mkdtemp(prefix='rca_bench_')
+    try:
+        for rows in sizes:
+            for suite in suites:
+                data_path = ensure_dataset(data_dir, SUITE_DATA[suite], rows, seed)
+                print(f"\n🏁 Suite {suite} — {rows:,} baris")
+                results.extend(run_suite_process(suite, data_path, rows, work_dir, skip_stages))
+    finally:
+        if keep_work:
+            print(f"📂 Direktori kerja disimpan: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'meta': {
+            'commit': git_revision(),
+            'started_at': started.isoformat(timespec='seconds'),
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'sizes': sizes,
+            'suites': suites,
+            'seed': seed,
+            **environment_info(),
+        },
+        'results': results,
+    }
+
+
+def default_output_path(meta):
+    stamp = datetime.fromisoformat(meta['started_at']).strftime('%Y%m%d_%H%M%S')
+    return os.path.join(DEFAULT_RESULTS_DIR, f"{stamp}_{meta['commit']}.json")
+
+
+def print_results(report):
+    print(f"\n📊 Hasil benchmark (commit {report['meta']['commit']})")
+    print(f"{'suite':<8} {'baris':>10} {'tahap':<26} {'status':<8} {'detik':>9} {'puncak MB':>10}")
+    for r in report['results']:
+        seconds = f"{r['seconds']:.2f}" if r.get('seconds') is not None else '-'
+        peak = f"{r['peak_delta_mb']:.0f}" if r.get('peak_delta_mb') is not None else '-'
+        print(f"{r['suite']:<8} {r['dataset_rows']:>10,} {r['stage']:<26} {r['status']:<8} {seconds:>9} {peak:>10}")
+
+
+def compare_reports(old, new, threshold=DEFAULT_THRESHOLD):
+    """
+    Bandingkan dua file hasil per (suite, ukuran, tahap).
+    Return list baris perbandingan; 'regresi' True jika waktu atau puncak memori naik > threshold.
+    """
+    def index(report):
+        return {(r['suite'], r['dataset_rows'], r['stage']): r for r in report['results'] if r['status'] == 'ok'}
+
+    old_index, new_index = index(old), index(new)
+    rows = []
+    for key in sorted(set(old_index) & set(new_index)):
+        before, after = old_index[key], new_index[key]
+        time_ratio = after['seconds'] / before['seconds'] if before['seconds'] else None
+        # Puncak memori di bawah 1 MB terlalu kecil untuk dibandingkan (noise sampler)
+        mem_ratio = (
+            after['peak_delta_mb'] / before['peak_delta_mb']
+            if before['peak_delta_mb'] and before['peak_delta_mb'] >= 1 else None
+        )
+        rows.append({
+            'suite': key[0], 'dataset_rows': key[1], 'stage': key[2],
+            'seconds_old': before['seconds'], 'seconds_new': after['seconds'], 'time_ratio': time_ratio,
+            'peak_mb_old': before['peak_delta_mb'], 'peak_mb_new': after['peak_delta_mb'], 'mem_ratio': mem_ratio,
+            'regression': any(ratio is not None and ratio > threshold for ratio in (time_ratio, mem_ratio)),
+        })
+    return rows
+
+
+def print_comparison(old, new, rows):
+    print(f"🔍 {old['meta']['commit']} -> {new['meta']['commit']}")
+    print(f"{'suite':<8} {'baris':>10} {'tahap':<26} {'detik lama':>10} {'detik baru':>10} {'x':>6} {'MB x':>6}")
+    for r in rows:
+        time_ratio = f"{r['time_ratio']:.2f}" if r['time_ratio'] is not None else '-'
+        mem_ratio = f"{r['mem_ratio']:.2f}" if r['mem_ratio'] is not None else '-'
+        flag = ' ⚠️' if r['regression'] else ''
+        print(f"{r['suite']:<8} {r['dataset_rows']:>10,} {r['stage']:<26} "
+              f"{r['seconds_old']:>10.2f} {r['seconds_new']:>10.2f} {time_ratio:>6} {mem_ratio:>6}{flag}")
+
+
+def load_report(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark waktu & memori pipeline RCA / TT.")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES,
+                        help="Ukuran data sintetis, misal 10k 100k 1M 10M (default: 10k 100k)")
+    parser.add_argument("--suites", nargs="+", choices=sorted(SUITES), default=['rca', 'cluster', 'tt', 'program'])
+    parser.add_argument("--skip", nargs="*", default=[],
+                        help="Tahap yang tidak dijalankan, misal train_model generate_excel_output")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Folder cache data sintetis")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None,
+                        help="File JSON hasil (default: benchmark/results/<waktu>_<commit>.json)")
+    parser.add_argument("--keep-work", action="store_true", help="Jangan hapus direktori kerja sementara")
+    parser.add_argument("--compare", nargs=2, metavar=("LAMA", "BARU"),
+                        help="Bandingkan dua file hasil; keluar dengan kode 1 jika ada regresi")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Rasio baru/lama yang dianggap regresi (default: {DEFAULT_THRESHOLD})")
+    args = parser.parse_args()
+
+    if args.compare:
+        old, new = (load_report(path) for path in args.compare)
+        comparison = compare_reports(old, new, args.threshold)
+        print_comparison(old, new, comparison)
+        sys.exit(1 if any(r['regression'] for r in comparison) else 0)
+
+    report = run_benchmark(
+        [parse_rows(size) for size in args.sizes], args.suites,
+        data_dir=args.data_dir, skip_stages=args.skip, seed=args.seed, keep_work=args.keep_work
+    )
+    print_results(report)
+
+    output = args.output or default_output_path(report['meta'])
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Hasil disimpan: {output}")
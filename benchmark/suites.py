@@ -0,0 +1,168 @@
+"""
+Suite benchmark per aplikasi. Tiap suite dijalankan di proses Python sendiri
+(lihat run.py): ketiga dashboard punya package `utils` dengan nama yang sama,
+dan RSS proses baru membuat angka memori antar suite tidak saling tercampur.
+
+Dipanggil langsung:
+    python -m benchmark.suites rca --data data.csv --rows 100000 --output hasil.json
+"""
+import argparse
+import json
+import os
+import sys
+
+from .profiler import StageProfiler
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIRS = {
+    'rca': os.path.join(ROOT_DIR, 'rca_dashboard'),
+    'cluster': os.path.join(ROOT_DIR, 'rca_dashboard_cluster'),
+    'tt': os.path.join(ROOT_DIR, 'tt-inc_dashboard'),
+    'program': os.path.join(ROOT_DIR, 'program'),
+}
+# Data yang dibutuhkan tiap suite: RCA (pemisah ';') atau TT (pemisah ',')
+SUITE_DATA = {'rca': 'rca', 'cluster': 'rca', 'tt': 'tt', 'program': 'rca'}
+# Batas baris worksheet Excel (termasuk header)
+EXCEL_MAX_ROWS = 1_048_576
+MERGE_PARTS = 4
+
+
+def suite_rca(prof, data_path, work_dir):
+    from utils.preprocessing import load_and_clean_data, calculate_total_bulanan, create_pivot_table
+    from utils.pipeline import prepare_frame, compute_aggregates, train_model
+    from common.cube import build_cube
+    from utils.exporter import generate_excel_output
+
+    _, filtered_df, *_ = prof.run('load_and_clean_data', load_and_clean_data, data_path, keep_all_columns=True)
+    rows = len(filtered_df)
+    filtered_df = prof.run('prepare_frame', prepare_frame, filtered_df, rows_in=rows)
+    prof.run('calculate_total_bulanan', calculate_total_bulanan, filtered_df, rows_in=rows)
+    prof.run('pivot_rca_severity', create_pivot_table, filtered_df, rows_in=rows)
+    cube = prof.run('build_cube', build_cube, filtered_df, rows_in=rows)
+    aggregates = prof.run('compute_aggregates', compute_aggregates, filtered_df, cube=cube, rows_in=rows)
+
+    trained = prof.run('train_model', train_model, filtered_df, rows_in=rows)
+    y_test = y_pred = None
+    if trained is not None and trained[0] is not None:
+        y_test, y_pred = trained[0]['y_test'], trained[0]['y_pred']
+
+    if rows >= EXCEL_MAX_ROWS:
+        prof.skip('generate_excel_output', f'{rows} baris melebihi batas worksheet Excel', rows_in=rows)
+    else:
+        prof.run(
+            'generate_excel_output', generate_excel_output,
+            filtered_df, aggregates['trend_bulanan'], aggregates['total_bulanan'],
+            aggregates['avg_mttr_per_rca'], aggregates['pivot'], y_test, y_pred, rows_in=rows
+        )
+
+
+def suite_cluster(prof, data_path, work_dir):
+    from utils.preprocessing import load_and_clean_data
+
+    # load_and_clean_data versi cluster membaca atribut .name seperti objek upload Streamlit
+    with open(data_path, 'rb') as f:
+        prof.run('load_and_clean_data', load_and_clean_data, f)
+
+
+def suite_tt(prof, data_path, work_dir):
+    from utils.preprocessing import load_data, clean_data
+    from utils.modeling import train_model
+    from utils.exporter import generate_excel_output
+
+    # train_model menulis saved_model/ relatif ke direktori kerja: jangan timpa model di repo
+    os.chdir(work_dir)
+    df = prof.run('load_data', load_data, data_path)
+    rows = len(df)
+    df = prof.run('clean_data', clean_data, df, rows_in=rows)
+    prof.run('train_model', train_model, df, force_retrain=True, return_mae=True, rows_in=rows)
+    if rows >= EXCEL_MAX_ROWS:
+        prof.skip('generate_excel_output', f'{rows} baris melebihi batas worksheet Excel', rows_in=rows)
+    else:
+        prof.run('generate_excel_output', generate_excel_output, df, rows_in=rows)
+
+
+def split_csv(data_path, target_dir, parts=MERGE_PARTS):
+    """Pecah CSV jadi beberapa file (header diulang) sebagai sumber benchmark merge, baris demi baris."""
+    os.makedirs(target_dir, exist_ok=True)
+    with open(data_path, 'rb') as f:
+        total = sum(1 for _ in f) - 1
+    per_part = max(-(-total // parts), 1)
+    paths = []
+    with open(data_path, 'rb') as f:
+        header = f.readline()
+        out = None
+        for i, line in enumerate(f):
+            if i % per_part == 0:
+                if out is not None:
+                    out.close()
+                paths.append(os.path.join(target_dir, f"part_{i // per_part:02d}.csv"))
+                out = open(paths[-1], 'wb')
+                out.write(header)
+            out.write(line)
+        if out is not None:
+            out.close()
+    return paths
+
+
+def suite_program(prof, data_path, work_dir):
+    import gabung_excel_cli
+    from common.file_probe import read_csv_fast
+    from ttype_filter import TTTypeClassifier
+
+    source_dir = os.path.join(work_dir, 'merge_source')
+    split_csv(data_path, source_dir)
+    # Output gabungan ditulis ke direktori kerja (nama file data_gabungan_<timestamp>)
+    output_dir = os.path.join(work_dir, 'merge_output')
+    os.makedirs(output_dir, exist_ok=True)
+    os.chdir(output_dir)
+
+    rows = prof.dataset_rows
+    prof.run('gabung_process_files', gabung_excel_cli.process_files, source_dir, 1, ['parquet'], rows_in=rows)
+    prof.run('gabung_stream_files', gabung_excel_cli.stream_files, source_dir, ['parquet'], rows_in=rows)
+    cache_dir = os.path.join(work_dir, 'merge_cache')
+    prof.run('gabung_incremental_cold', gabung_excel_cli.incremental_merge,
+             source_dir, ['parquet'], cache_dir, rows_in=rows)
+    prof.run('gabung_incremental_warm', gabung_excel_cli.incremental_merge,
+             source_dir, ['parquet'], cache_dir, rows_in=rows)
+
+    tt_type = read_csv_fast(data_path, usecols=['TT Type'])['TT Type']
+    classifier = TTTypeClassifier()
+    prof.run('ttype_filter_mask', classifier.mask, tt_type, rows_in=len(tt_type))
+
+
+SUITES = {
+    'rca': suite_rca,
+    'cluster': suite_cluster,
+    'tt': suite_tt,
+    'program': suite_program,
+}
+
+
+def run_suite(suite, data_path, rows, work_dir, skip_stages=()):
+    """Jalankan satu suite di proses ini. Return list record (tahap yang gagal ikut tercatat)."""
+    sys.path.insert(0, APP_DIRS[suite])
+    os.makedirs(work_dir, exist_ok=True)
+    prof = StageProfiler(suite, rows, skip_stages)
+    cwd = os.getcwd()
+    try:
+        SUITES[suite](prof, os.path.abspath(data_path), os.path.abspath(work_dir))
+    except Exception as e:
+        print(f"❌ Suite {suite} berhenti: {e}")
+    finally:
+        os.chdir(cwd)
+    return prof.records
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Jalankan satu suite benchmark (dipanggil oleh benchmark.run).")
+    parser.add_argument("suite", choices=sorted(SUITES))
+    parser.add_argument("--data", required=True)
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--work-dir", required=True)
+    parser.add_argument("--output", required=True, help="File JSON tujuan record hasil ukur")
+    parser.add_argument("--skip", nargs="*", default=[], help="Nama tahap yang tidak dijalankan")
+    args = parser.parse_args()
+
+    records = run_suite(args.suite, args.data, args.rows, args.work_dir, args.skip)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=2)
@@ -0,0 +1,207 @@
+"""
+Generator data insiden sintetis (RCA & TT) untuk benchmark.
+
+Kolom dan format mengikuti export asli: tanggal dd/mm/YYYY HH:MM:SS, mttr dengan
+koma desimal, label berulang (circle, severity, rca, sitename, mccluster) dan
+sebagian sub_root_cause kosong supaya jalur fallback subcause ikut teruji.
+Data TT berisi semua kolom yang dibaca tt-inc_dashboard (SLA status, service
+interruption time, restore_duration, ...), jadi tidak ada tab / evaluasi yang terlewati.
+File ditulis per chunk, jadi 10 juta baris pun tidak perlu dimuat sekaligus.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 500_000
+# Naikkan bila kolom berubah: file cache lama di data dir tidak dipakai lagi
+DATASET_VERSION = 2
+DATE_START = pd.Timestamp('2023-01-01')
+DATE_SPAN_MINUTES = 2 * 365 * 24 * 60
+
+CIRCLES = ['Jabo', 'Java', 'Sumatra', 'Kalimantan', 'Sulawesi', 'Bali Nusra', 'Papua Maluku']
+CIRCLE_WEIGHTS = [0.24, 0.26, 0.2, 0.1, 0.1, 0.06, 0.04]
+SEVERITIES = ['Critical', 'Major', 'Minor', 'Warning']
+SEVERITY_WEIGHTS = [0.15, 0.35, 0.4, 0.1]
+TT_TYPES = ['Site Down', 'Non Site Down', 'Cell Down', 'Link Down', 'Site-Down Partial']
+TT_TYPE_WEIGHTS = [0.35, 0.2, 0.2, 0.2, 0.05]
+
+# RCA -> (sub root cause, rata-rata mttr jam)
+RCA_TREE = {
+    'FO Cut': (['Galian', 'Vandalisme', 'Gigitan Hewan', 'Kabel Putus'], 6.0),
+    'Power': (['PLN Padam', 'Genset Gagal', 'Baterai Drop', 'Rectifier Rusak'], 3.5),
+    'HW': (['Modul Rusak', 'Radio Rusak', 'Board Rusak'], 4.5),
+    'SW': (['Bug Software', 'Konfigurasi', 'Lisensi'], 2.0),
+    'Environment': (['Banjir', 'Petir', 'Suhu Tinggi'], 8.0),
+    'Transmission': (['Microwave Fading', 'Link Degradasi', 'Interferensi'], 5.0),
+}
+RCA_WEIGHTS = [0.3, 0.25, 0.15, 0.1, 0.08, 0.12]
+
+RCA_COLUMNS = [
+    'createfaultfirstoccurtime', 'circle', 'severity', 'rca', 'sub_root_cause',
+    'subcause', 'subcause2', 'mttr', 'slastatus', 'sitename', 'TT Type',
+    'restoreduration', 'mccluster'
+]
+
+
+def site_count(rows):
+    """Jumlah site unik, tumbuh mengikuti ukuran data (kardinalitas tinggi seperti data asli)."""
+    return int(min(max(rows // 20, 500), 200_000))
+
+
+def _choice(rng, values, weights, size):
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=size, p=weights)]
+
+
+def _site_names(rng, size, n_sites):
+    # Distribusi Zipf: sebagian kecil site menyumbang banyak gangguan berulang
+    ranks = (rng.zipf(1.2, size=size) - 1) % n_sites
+    return np.char.add('SITE', ranks.astype(str)).astype(object)
+
+
+def _format_dates(rng, size):
+    minutes = rng.integers(0, DATE_SPAN_MINUTES, size=size)
+    seconds = rng.integers(0, 60, size=size)
+    stamps = DATE_START + pd.to_timedelta(minutes * 60 + seconds, unit='s')
+    return pd.Series(stamps), pd.Series(stamps).dt.strftime('%d/%m/%Y %H:%M:%S')
+
+
+def _incident_chunk(rng, size, n_sites):
+    """Kolom bersama RCA & TT untuk satu chunk."""
+    rca_names = list(RCA_TREE)
+    rca_idx = rng.choice(len(rca_names), size=size, p=RCA_WEIGHTS)
+    rca = np.asarray(rca_names, dtype=object)[rca_idx]
+
+    sub_root_cause = np.empty(size, dtype=object)
+    mean_mttr = np.empty(size, dtype='float64')
+    for i, name in enumerate(rca_names):
+        rows = rca_idx == i
+        subs, mttr_hours = RCA_TREE[name]
+        sub_root_cause[rows] = np.asarray(subs, dtype=object)[rng.integers(0, len(subs), rows.sum())]
+        mean_mttr[rows] = mttr_hours
+    subcause = sub_root_cause.copy()
+    subcause2 = np.char.add('Detail ', rng.integers(1, 6, size).astype(str)).astype(object)
+
+    # ±15% sub_root_cause kosong / spasi / 'nan' seperti export asli, sebagian subcause ikut kosong
+    empty_sub = rng.random(size) < 0.15
+    sub_root_cause[empty_sub] = _choice(rng, ['', ' ', 'nan', None], [0.4, 0.2, 0.2, 0.2], int(empty_sub.sum()))
+    subcause[empty_sub & (rng.random(size) < 0.3)] = None
+
+    mttr = np.round(rng.gamma(2.0, mean_mttr / 2.0), 2)
+    return {
+        'circle': _choice(rng, CIRCLES, CIRCLE_WEIGHTS, size),
+        'severity': _choice(rng, SEVERITIES, SEVERITY_WEIGHTS, size),
+        'rca': rca,
+        'sub_root_cause': sub_root_cause,
+        'subcause': subcause,
+        'subcause2': subcause2,
+        'mttr': mttr,
+        'slastatus': np.where(mttr > 8, 'OUT', 'IN').astype(object),
+        'sitename': _site_names(rng, size, n_sites),
+        'TT Type': _choice(rng, TT_TYPES, TT_TYPE_WEIGHTS, size),
+        'restoreduration': np.round(mttr * 3600 * rng.uniform(0.8, 1.2, size)).astype('int64'),
+        'mccluster': np.char.add('MC-', (rng.integers(0, 250, size)).astype(str)).astype(object),
+    }
+
+
+def rca_chunk(rng, size, n_sites):
+    """Satu chunk data RCA (kolom sesuai rca_dashboard), mttr dengan koma desimal."""
+    columns = _incident_chunk(rng, size, n_sites)
+    _, columns['createfaultfirstoccurtime'] = _format_dates(rng, size)
+    df = pd.DataFrame(columns)[RCA_COLUMNS]
+    df['mttr'] = df['mttr'].map('{:.2f}'.format).str.replace('.', ',', regex=False)
+    return df
+
+
+def tt_chunk(rng, size, n_sites, first_order_id=0):
+    """Satu chunk data TT (nama kolom gaya export TT, sesuai tt-inc_dashboard)."""
+    columns = _incident_chunk(rng, size, n_sites)
+    create_time, create_text = _format_dates(rng, size)
+    close_time = create_time + pd.to_timedelta(columns['restoreduration'], unit='s')
+    duration = pd.Series(columns['restoreduration'])
+    # Service Interruption Time 'H:MM' (dipakai evaluasi prediksi), SLA dilanggar di atas 8 jam
+    interruption = (duration // 3600).astype(str) + ':' + (duration % 3600 // 60).astype(str).str.zfill(2)
+    week_start = create_time.dt.normalize() - pd.to_timedelta(create_time.dt.dayofweek, unit='D')
+    return pd.DataFrame({
+        'Order ID': np.arange(first_order_id, first_order_id + size, dtype='int64'),
+        'TT Type': columns['TT Type'],
+        'Create Time': create_text,
+        'Close Time': close_time.dt.strftime('%d/%m/%Y %H:%M:%S'),
+        'Circle': columns['circle'],
+        'Site Region': columns['circle'] + ' R' + rng.integers(1, 5, size).astype(str).astype(object),
+        'Severity': columns['severity'],
+        'Root Cause': columns['rca'],
+        # Evaluasi model TT menolak fitur kosong, jadi subcause TT selalu terisi
+        'Subcause': pd.Series(columns['subcause']).fillna('Lainnya'),
+        'Subcause2': columns['subcause2'],
+        'MC Cluster': columns['mccluster'],
+        'Site Name': columns['sitename'],
+        'Alarm Name': columns['TT Type'],
+        'Restore Duration': columns['restoreduration'],
+        'restore_duration': np.round(duration / 3600, 2),
+        'Service Interruption Time': interruption,
+        'SLA Status': np.where(columns['mttr'] > 8, 'SLA_Violation', 'Normal').astype(object),
+        'minggu_label': week_start.dt.strftime('%d %b %Y'),
+        'createfaultfirstoccurtime': create_text,
+        'mttr': pd.Series(columns['mttr']).map('{:.2f}'.format).str.replace('.', ',', regex=False),
+    })
+
+
+def write_dataset(kind, rows, path, seed=42, chunk_rows=CHUNK_ROWS):
+    """
+    Tulis dataset sintetis `kind` ('rca' / 'tt') sebanyak `rows` baris ke CSV `path`.
+    RCA memakai ';' (koma dipakai sebagai desimal), TT memakai ','.
+    """
+    rng = np.random.default_rng(seed)
+    n_sites = site_count(rows)
+    sep = ';' if kind == 'rca' else ','
+    tmp_path = f"{path}.tmp"
+    written = 0
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        while written < rows:
+            size = min(chunk_rows, rows - written)
+            if kind == 'rca':
+                chunk = rca_chunk(rng, size, n_sites)
+            else:
+                chunk = tt_chunk(rng, size, n_sites, first_order_id=written)
+            chunk.to_csv(f, sep=sep, index=False, header=written == 0)
+            written += size
+    os.replace(tmp_path, path)
+    return path
+
+
+def dataset_path(data_dir, kind, rows, seed=42):
+    return os.path.join(data_dir, f"{kind}_{rows}_s{seed}_v{DATASET_VERSION}.csv")
+
+
+def ensure_dataset(data_dir, kind, rows, seed=42):
+    """Path dataset; dibuat dulu jika belum ada (file yang sama dipakai ulang antar run)."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = dataset_path(data_dir, kind, rows, seed)
+    if not os.path.exists(path):
+        print(f"🧪 Membuat data sintetis {kind} {rows:,} baris -> {path}")
+        write_dataset(kind, rows, path, seed)
+    return path
+
+
+def parse_rows(text):
+    """'10k' -> 10000, '1M' -> 1000000, '250000' -> 250000."""
+    text = str(text).strip().lower()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    number = text[:-1] if multiplier > 1 else text
+    return int(float(number) * multiplier)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Buat file insiden RCA / TT sintetis untuk benchmark.")
+    parser.add_argument("--rows", nargs="+", default=['10k', '100k'],
+                        help="Ukuran data, misal 10k 100k 1M 10M (default: 10k 100k)")
+    parser.add_argument("--kind", nargs="+", choices=['rca', 'tt'], default=['rca', 'tt'])
+    parser.add_argument("--data-dir", default=os.path.join('benchmark', 'data'))
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        for kind in args.kind:
+            ensure_dataset(args.data_dir, kind, parse_rows(rows), args.seed)
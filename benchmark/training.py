@@ -0,0 +1,123 @@
+"""
+Bandingkan mode training model RCA: waktu fit dan akurasi pada data sintetis.
+
+Contoh:
+    python -m benchmark.training --rows 1M
+    python -m benchmark.training --rows 100k --configs rf_all_cores hgb_native
+    python -m benchmark.training --rows 1M --configs rf_sampled --learning-curve
+
+Konfigurasi:
+    rf_1core_nocap  perilaku lama: RandomForest 1 core, semua nilai sitename di-label-encode
+    rf_all_cores    RandomForest n_jobs=-1, kolom berkardinalitas tinggi dipangkas
+    hgb_native      HistGradientBoosting dengan kolom kategori native (+ pemangkasan)
+    rf_sampled      rf_all_cores pada sampel terstratifikasi (TRAINING_SAMPLE_ROWS baris)
+    hgb_sampled     hgb_native pada sampel terstratifikasi
+
+Konfigurasi tanpa sampling memakai split 80/20 yang sama, jadi akurasi / F1 bisa
+dibandingkan langsung. --learning-curve menambahkan metrik per ukuran sampel train
+(semua dinilai pada test set yang sama) untuk backend konfigurasi pertama.
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+from .profiler import StageProfiler
+from .run import DEFAULT_DATA_DIR, DEFAULT_RESULTS_DIR, environment_info, git_revision
+from .suites import APP_DIRS
+from .synthetic import ensure_dataset, parse_rows
+
+CONFIGS = {
+    'rf_1core_nocap': {'backend': 'random_forest', 'max_categories': None, 'params': {'n_jobs': 1}, 'max_rows': None},
+    'rf_all_cores': {'backend': 'random_forest', 'max_rows': None},
+    'hgb_native': {'backend': 'hist_gradient_boosting', 'max_rows': None},
+    'rf_sampled': {'backend': 'random_forest'},
+    'hgb_sampled': {'backend': 'hist_gradient_boosting'},
+}
+
+
+def run_training_benchmark(rows, configs, data_dir=DEFAULT_DATA_DIR, seed=42, with_curve=False):
+    """
+    Latih model RCA dengan tiap konfigurasi.
+    Return dict {'meta': ..., 'results': [...], 'learning_curve': [...] (bila with_curve)}.
+    """
+    sys.path.insert(0, APP_DIRS['rca'])
+    from utils.preprocessing import load_and_clean_data
+    from utils.pipeline import prepare_frame
+    from utils.training import load_or_fit_rca_model, learning_curve
+
+    data_path = ensure_dataset(data_dir, 'rca', rows, seed)
+    prof = StageProfiler('training', rows)
+    _, filtered_df, *_ = prof.run('load_and_clean_data', load_and_clean_data, data_path, keep_all_columns=True)
+    filtered_df = prof.run('prepare_frame', prepare_frame, filtered_df, rows_in=len(filtered_df))
+
+    for name in configs:
+        result, problem = prof.run(name, load_or_fit_rca_model, filtered_df, rows_in=len(filtered_df),
+                                   **CONFIGS[name])
+        record = prof.records[-1]
+        record['config'] = CONFIGS[name]
+        if problem is not None:
+            record['status'] = 'error'
+            record['error'] = problem[0]
+            continue
+        record['train_rows'] = result['sample_rows'] - len(result['y_test'])
+        record['capped_columns'] = sorted(result['caps'])
+        record['accuracy'] = result['metrics']['Accuracy']
+        record['f1_weighted'] = result['metrics']['F1-Score (Weighted)']
+
+    report = {
+        'meta': {
+            'commit': git_revision(),
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'rows': rows,
+            'seed': seed,
+            **environment_info(),
+        },
+        'results': prof.records,
+    }
+    if with_curve:
+        backend = CONFIGS[configs[0]]['backend']
+        curve = prof.run(f'learning_curve:{backend}', learning_curve, filtered_df, backend=backend,
+                         rows_in=len(filtered_df))
+        report['learning_curve'] = curve.to_dict(orient='records')
+    return report
+
+
+def print_results(report):
+    print(f"\n📊 Training RCA — {report['meta']['rows']:,} baris, {report['meta']['cpu_count']} core")
+    print(f"{'konfigurasi':<20} {'detik':>9} {'puncak MB':>10} {'akurasi':>9} {'F1':>7}")
+    for r in report['results']:
+        if 'accuracy' not in r:
+            continue
+        print(f"{r['stage']:<20} {r['seconds']:>9.2f} {r['peak_delta_mb']:>10.0f} "
+              f"{r['accuracy']:>9.2%} {r['f1_weighted']:>7.2%}")
+    if report.get('learning_curve'):
+        print("\n📈 Learning curve")
+        print(f"{'baris train':>12} {'akurasi':>9} {'F1':>7} {'detik fit':>10}")
+        for r in report['learning_curve']:
+            print(f"{r['train_rows']:>12,} {r['Accuracy']:>9.2%} {r['F1-Score (Weighted)']:>7.2%} {r['fit_seconds']:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bandingkan waktu fit & akurasi mode training model RCA.")
+    parser.add_argument("--rows", default='1M', help="Ukuran data sintetis, misal 100k atau 1M (default: 1M)")
+    parser.add_argument("--configs", nargs="+", choices=sorted(CONFIGS), default=list(CONFIGS))
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Folder cache data sintetis")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--learning-curve", action="store_true",
+                        help="Hitung juga learning curve (paralel) untuk backend konfigurasi pertama")
+    parser.add_argument("--output", default=None,
+                        help="File JSON hasil (default: benchmark/results/training_<waktu>_<commit>.json)")
+    args = parser.parse_args()
+
+    report = run_training_benchmark(parse_rows(args.rows), args.configs, data_dir=args.data_dir, seed=args.seed,
+                                    with_curve=args.learning_curve)
+    print_results(report)
+
+    stamp = datetime.fromisoformat(report['meta']['started_at']).strftime('%Y%m%d_%H%M%S')
+    output = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"training_{stamp}_{report['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"💾 Hasil disimpan: {output}")
@@ -0,0 +1,7 @@
+"""
+Modul bersama untuk ketiga dashboard, script di program/ dan benchmark/.
+
+Aplikasi tetap dijalankan dari foldernya masing-masing (misal `streamlit run app.py`);
+`utils/__init__.py` tiap dashboard dan script di program/ menambahkan root repo ke
+sys.path supaya `from common.<modul> import ...` bisa dipakai tanpa menyalin modul.
+"""
@@ -0,0 +1,149 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+# Batas total ukuran hasil parsing yang disimpan di memori (semua sesi berbagi cache yang sama)
+CACHE_MAX_BYTES = 2 * 1024 ** 3
+HASH_BLOCK_SIZE = 4 * 1024 * 1024
+# Mulai pandas 3 Copy-on-Write selalu aktif; di versi lama hanya bila diaktifkan sendiri oleh aplikasi
+PANDAS_COPY_ON_WRITE = int(pd.__version__.split('.')[0]) >= 3
+
+
+class FrameCache:
+    """
+    Cache LRU untuk hasil load & clean, dibatasi total ukuran (bytes).
+
+    Entry yang paling lama tidak dipakai dibuang sampai total ukuran <= max_bytes.
+    Cache dipakai bersama semua sesi (st.cache_resource), jadi akses ke entry dijaga lock.
+    `get` / `put` memakai salinan dangkal bila Copy-on-Write aktif: data kolom tidak
+    digandakan dan perubahan di app (tambah kolom, isi nilai) tidak mengotori isi cache.
+    Tanpa Copy-on-Write (pandas lama) salinannya penuh, opsi pandas global tidak diubah.
+    """
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            value = self._entries[key][0]
+        return copy_result(value)
+
+    def put(self, key, value):
+        size = result_nbytes(value)
+        if size > self.max_bytes:
+            return  # terlalu besar untuk di-cache, biarkan diparsing ulang
+        value = copy_result(value)
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+
+def copy_on_write_enabled():
+    return PANDAS_COPY_ON_WRITE or pd.get_option('mode.copy_on_write') is True
+
+
+def copy_result(value, _copied=None):
+    # Objek yang sama di dalam tuple (misal df & filtered_df) disalin sekali dan tetap satu objek
+    copied = {} if _copied is None else _copied
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        if id(value) not in copied:
+            copied[id(value)] = value.copy(deep=not copy_on_write_enabled())
+        return copied[id(value)]
+    if isinstance(value, tuple):
+        return tuple(copy_result(item, copied) for item in value)
+    return value
+
+
+def result_nbytes(value, _seen=None):
+    seen = set() if _seen is None else _seen
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        if id(value) in seen:
+            return 0
+        seen.add(id(value))
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, tuple):
+        return sum(result_nbytes(item, seen) for item in value)
+    return 0
+
+
+@st.cache_resource
+def get_frame_cache():
+    return FrameCache()
+
+
+def file_content_hash(uploaded_file):
+    """
+    SHA-256 isi file upload. Hasilnya disimpan di session_state per file_id,
+    jadi rerun karena klik widget tidak menghitung hash ulang.
+    """
+    file_id = getattr(uploaded_file, 'file_id', None) or f"{uploaded_file.name}:{uploaded_file.size}"
+    hashes = st.session_state.setdefault('_file_content_hashes', {})
+    if file_id not in hashes:
+        digest = hashlib.sha256()
+        uploaded_file.seek(0)
+        while True:
+            block = uploaded_file.read(HASH_BLOCK_SIZE)
+            if not block:
+                break
+            digest.update(block)
+        uploaded_file.seek(0)
+        hashes[file_id] = digest.hexdigest()
+    return hashes[file_id]
+
+
+def load_cached(uploaded_file, loader, **kwargs):
+    """
+    Jalankan loader(uploaded_file, **kwargs) sekali per isi file + opsi.
+
+    Kunci cache: hash isi file, nama loader dan opsi, jadi upload ulang file yang
+    sama (nama berbeda pun) tidak diparsing lagi, sedangkan klik filter hanya
+    bekerja dengan dataframe di memori.
+    """
+    key = (
+        file_content_hash(uploaded_file),
+        f"{loader.__module__}.{loader.__qualname__}",
+        tuple(sorted(kwargs.items())),
+    )
+    cache = get_frame_cache()
+    result = cache.get(key)
+    if result is None:
+        uploaded_file.seek(0)
+        result = loader(uploaded_file, **kwargs)
+        cache.put(key, result)
+    return result
+
+
+def session_cached(name, uploaded_file, builder):
+    """
+    Simpan hasil builder() di session_state per isi file upload (misal index filter
+    atau cube agregasi), jadi hanya dibangun ulang saat file yang diunggah berubah.
+    """
+    content_hash = file_content_hash(uploaded_file)
+    state_key = f"_upload_{name}"
+    entry = st.session_state.get(state_key)
+    if entry is None or entry[0] != content_hash:
+        entry = (content_hash, builder())
+        st.session_state[state_key] = entry
+    return entry[1]
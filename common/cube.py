@@ -0,0 +1,102 @@
+import pandas as pd
+
+from .dates import known_month
+
+# Dimensi cube: semua chart, pivot dan tabel RCA bisa diturunkan dari kombinasi ini,
+# dan semua filter dashboard (tahun, bulan, circle, severity, rca, subrootcause) bisa
+# diterapkan langsung ke cube tanpa menyentuh data mentah
+CUBE_DIMENSIONS = ['tahun', 'bulan_label', 'rca', 'circle', 'severity', 'subrootcause']
+CUBE_MEASURES = ['rows', 'total_count', 'mttr_sum', 'mttr_count']
+
+
+def build_cube(df, dimensions=CUBE_DIMENSIONS):
+    """
+    Agregasi satu kali jalan: jumlah baris, total_count, jumlah & banyaknya mttr
+    per kombinasi `dimensions`.
+
+    NaN di dimensi tetap jadi grup sendiri (dropna=False) supaya turunan per satu
+    dimensi tetap menghitung baris yang dimensi lainnya kosong, sama seperti groupby
+    langsung ke data mentah.
+    """
+    dimensions = [col for col in dimensions if col in df.columns]
+    # bulan_sort ikut jadi kunci grup (1:1 dengan bulan_label, jumlah grup tidak bertambah)
+    if 'bulan_label' in dimensions and 'bulan_sort' in df.columns and 'bulan_sort' not in dimensions:
+        dimensions.insert(dimensions.index('bulan_label') + 1, 'bulan_sort')
+    agg = {
+        'rows': ('mttr', 'size'),
+        'mttr_sum': ('mttr', 'sum'),
+        'mttr_count': ('mttr', 'count'),
+    }
+    if 'total_count' in df.columns:
+        agg['total_count'] = ('total_count', 'sum')
+
+    cube = df.groupby(dimensions, observed=True, dropna=False).agg(**agg).reset_index()
+    if 'total_count' not in cube.columns:
+        cube['total_count'] = cube['rows']
+    cube['mttr_sum'] = cube['mttr_sum'].astype('float64')
+    return add_month_columns(cube)
+
+
+def add_month_columns(cube):
+    """Turunkan bulan_dt & quarter dari kunci bulan_sort (bulan_label tidak diparsing)."""
+    if 'bulan_sort' not in cube.columns:
+        return cube
+    cube['bulan_dt'] = known_month(cube['bulan_sort'])
+    cube['quarter'] = cube['bulan_dt'].dt.to_period('Q').dt.to_timestamp()
+    return cube
+
+
+def slice_cube(cube, selections):
+    """
+    Terapkan pilihan filter ke cube (bukan ke baris data).
+
+    selections: dict kolom -> list nilai terpilih; None atau kolom yang tidak ada
+    di cube dilewati. Hasilnya sama dengan build_cube dari baris yang lolos filter.
+    """
+    mask = pd.Series(True, index=cube.index)
+    for col, selected in selections.items():
+        if selected is None or col not in cube.columns:
+            continue
+        mask &= cube[col].isin(list(selected))
+    return cube[mask]
+
+
+def _sum(cube, by, measures):
+    return cube.groupby(by, observed=True)[measures].sum()
+
+
+def count_by(cube, dim):
+    """Jumlah kasus per nilai `dim`, terbesar dulu (pengganti value_counts)."""
+    return _sum(cube, dim, 'rows').sort_values(ascending=False)
+
+
+def trend_by(cube, dim):
+    """Jumlah kasus per bulan per nilai `dim`, urut bulan (untuk grafik trend)."""
+    # Grup dengan bulan_dt NaT (tanggal tidak valid) otomatis terbuang oleh groupby
+    trend = (
+        _sum(cube, ['bulan_label', 'bulan_sort', 'bulan_dt', dim], 'rows')
+        .reset_index(name='count')
+        .sort_values('bulan_sort')
+        .rename(columns={'bulan_dt': 'date'})
+    )
+    return trend[trend['count'] > 0]
+
+
+def trend_bulanan(cube):
+    return _sum(cube, ['bulan_label', 'rca'], 'rows').reset_index(name='count')
+
+
+def avg_mttr_by(cube, dim):
+    """Rata-rata MTTR per nilai `dim` = jumlah mttr / banyaknya mttr (NaN tidak dihitung)."""
+    sums = _sum(cube, dim, ['mttr_sum', 'mttr_count'])
+    avg = sums['mttr_sum'] / sums['mttr_count'].where(sums['mttr_count'] > 0)
+    return avg.rename('mttr').sort_values(ascending=False)
+
+
+def pivot_by(cube, index, columns):
+    return cube.pivot_table(index=index, columns=columns, values='total_count',
+                            aggfunc='sum', fill_value=0, observed=True)
+
+
+def total_bulanan(cube):
+    return _sum(cube, ['quarter', 'bulan_label'], ['total_count']).reset_index()
@@ -0,0 +1,143 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Format tanggal yang biasa muncul di export vendor. Format hari-dulu (dayfirst)
+# dicoba sebelum bulan-dulu supaya tanggal ambigu seperti 03/04/2024 tetap 3 April.
+CANDIDATE_FORMATS = [
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%d',
+    '%d/%m/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M',
+    '%d/%m/%Y',
+    '%d-%m-%Y %H:%M:%S',
+    '%d-%m-%Y %H:%M',
+    '%d-%m-%Y',
+    '%d.%m.%Y %H:%M:%S',
+    '%d.%m.%Y %H:%M',
+    '%d-%b-%Y %H:%M:%S',
+    '%d-%b-%Y %H:%M',
+    '%d %b %Y %H:%M:%S',
+    '%d %b %Y %H:%M',
+    '%d %b %Y',
+    '%m/%d/%Y %I:%M:%S %p',
+    '%m/%d/%Y %I:%M %p',
+    '%m/%d/%Y %H:%M:%S',
+    '%m/%d/%Y %H:%M',
+    '%Y/%m/%d %H:%M:%S',
+    '%Y/%m/%d %H:%M',
+    '%Y/%m/%d',
+]
+SAMPLE_SIZE = 2000
+MONTH_ABBR = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+# Penanda bulan untuk tanggal tidak valid (konvensi lama kolom bulan_sort)
+UNKNOWN_MONTH = pd.Timestamp('1970-01-01')
+UNKNOWN_LABEL = 'Unknown'
+ISO_PREFIX = re.compile(r'\d{4}[-/]\d{1,2}[-/]\d{1,2}')
+
+
+def detect_date_formats(values, sample_size=SAMPLE_SIZE):
+    """
+    Deteksi format tanggal dari sampel nilai (sekali per file).
+    Return list format, urut dari yang paling banyak cocok.
+    """
+    sample = pd.Series(values).dropna()
+    sample = sample[sample.astype(str).str.strip() != '']
+    if len(sample) > sample_size:
+        sample = sample.sample(sample_size, random_state=0)
+    remaining = sample.astype(str).str.strip()
+
+    found = []
+    for fmt in CANDIDATE_FORMATS:
+        if remaining.empty:
+            break
+        parsed = pd.to_datetime(remaining, format=fmt, errors='coerce')
+        matched = parsed.notna()
+        if matched.any():
+            found.append((int(matched.sum()), fmt))
+            remaining = remaining[~matched]
+    return [fmt for _, fmt in sorted(found, key=lambda item: -item[0])]
+
+
+def parse_datetime_column(series, formats=None):
+    """
+    Parse kolom tanggal campuran format secara vektor.
+
+    Format dideteksi sekali dari sampel, lalu tiap kelompok format diparsing dengan
+    `format=` eksplisit (jalur cepat pandas). Sisa nilai yang tidak cocok dengan format
+    mana pun baru dilempar ke parser umum (dayfirst=True, kecuali nilai berawalan tahun),
+    jadi jalur lambat per elemen hanya dipakai untuk baris yang benar-benar aneh.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+
+    # Timestamp export sering berulang (resolusi menit / detik): strip & parsing cukup
+    # per nilai unik, tanpa salinan teks per baris
+    codes, uniques = pd.factorize(series)
+    text = pd.Series(np.asarray(uniques, dtype=object)).astype(str).str.strip()
+    values = text.to_numpy(dtype=object)
+    parsed_uniques = np.full(len(values), np.datetime64('NaT'), dtype='datetime64[ns]')
+    pending = np.flatnonzero((text != '').to_numpy())
+    if formats is None:
+        formats = detect_date_formats(values[pending])
+
+    for fmt in formats:
+        if len(pending) == 0:
+            break
+        parsed = pd.to_datetime(values[pending], format=fmt, errors='coerce')
+        matched = ~parsed.isna()
+        parsed_uniques[pending[matched]] = parsed[matched].to_numpy(dtype='datetime64[ns]')
+        pending = pending[~matched]
+
+    if len(pending) > 0:
+        # Nilai berawalan tahun (ISO) tidak boleh ikut dayfirst: 2024-03-04 tetap 4 Maret
+        iso = np.array([ISO_PREFIX.match(value) is not None for value in values[pending]], dtype=bool)
+        for group, dayfirst in ((pending[iso], False), (pending[~iso], True)):
+            if len(group) > 0:
+                parsed = pd.to_datetime(pd.Series(values[group]), dayfirst=dayfirst, errors='coerce')
+                parsed_uniques[group] = parsed.to_numpy(dtype='datetime64[ns]')
+
+    result = np.full(len(series), np.datetime64('NaT'), dtype='datetime64[ns]')
+    valid = codes >= 0
+    result[valid] = parsed_uniques[codes[valid]]
+    return pd.Series(result, index=series.index, name=series.name)
+
+
+def month_start(dt):
+    """Awal bulan (datetime) dari kolom datetime; NaT tetap NaT."""
+    months = dt.to_numpy(dtype='datetime64[ns]').astype('datetime64[M]')
+    return pd.Series(months.astype('datetime64[ns]'), index=dt.index, name=dt.name)
+
+
+def known_month(month_sort):
+    """Kolom bulan_sort dengan penanda UNKNOWN_MONTH dikembalikan jadi NaT."""
+    return month_sort.where(month_sort != UNKNOWN_MONTH)
+
+
+def month_labels(month_dt):
+    """
+    Label 'Jan 2024' dari kolom awal bulan, dibuat per bulan unik (bukan strftime per baris).
+    NaT menjadi 'Unknown'.
+    """
+    months = month_dt.to_numpy(dtype='datetime64[ns]').astype('datetime64[M]')
+    # Kunci bulan = jumlah bulan sejak Jan 1970 (numpy datetime64[M]); NaT jadi int64 minimum
+    keys = months.astype('int64')
+    nat_key = np.datetime64('NaT', 'M').astype('int64')
+    uniques, codes = np.unique(keys, return_inverse=True)
+    names = np.array([
+        UNKNOWN_LABEL if key == nat_key else f"{MONTH_ABBR[key % 12]} {1970 + key // 12}"
+        for key in uniques.tolist()
+    ], dtype=object)
+    return pd.Series(names[codes.ravel()], index=month_dt.index, name=month_dt.name)
+
+
+def month_abbr(month_dt):
+    """Nama bulan singkat ('Jan', ...) dari kolom datetime tanpa strftime per baris."""
+    names = np.array(MONTH_ABBR + [None], dtype=object)
+    months = month_dt.dt.month.to_numpy(dtype='float64', na_value=np.nan)
+    idx = np.where(np.isnan(months), 12, months - 1).astype('int64')
+    return pd.Series(names[idx], index=month_dt.index)
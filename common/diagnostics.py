@@ -0,0 +1,287 @@
+"""
+Instrumentasi per tahap pipeline: waktu, jumlah baris masuk/keluar dan delta puncak memori.
+
+Satu StageRecorder dibuat per rerun dashboard (atau per file di mode batch) lalu
+diaktifkan; kode di utils cukup membungkus langkahnya dengan `stage(...)` / `timed(...)`.
+Tanpa recorder aktif keduanya langsung menjalankan kode tanpa mengukur apa pun.
+
+Memori diukur dari RSS proses (kolom string pandas berbasis Arrow tidak tercatat
+oleh tracemalloc), jadi angkanya milik seluruh proses, bukan milik tahap itu saja:
+tahap yang berjalan bersamaan di thread lain (sesi Streamlit lain, job latar belakang)
+ikut menaikkan peak_delta_mb, dan tahap induk mencakup puncak tahap anaknya. Satu
+thread sampler dipakai bersama oleh semua tahap yang sedang berjalan.
+
+Setiap tahap yang selesai langsung ditulis satu baris JSON ke log. Default
+<folder aplikasi>/logs/diagnostics.jsonl (folder aplikasi didaftarkan lewat
+configure_log_dir dari utils/__init__.py, tidak bergantung folder kerja); bisa diganti
+lewat env DASHBOARD_DIAGNOSTICS_LOG, string kosong mematikan log.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+LOG_ENV = 'DASHBOARD_DIAGNOSTICS_LOG'
+LOG_NAME = os.path.join('logs', 'diagnostics.jsonl')
+# Log diputar (file lama jadi .1) setelah melewati ukuran ini
+LOG_MAX_BYTES = 20 * 1024 ** 2
+SAMPLE_INTERVAL = 0.01
+
+_ACTIVE = contextvars.ContextVar('diagnostics_recorder', default=None)
+_LOG_LOCK = threading.Lock()
+# Tanpa configure_log_dir (misal benchmark) log jatuh ke logs/ di root repo
+_log_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    _PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def current_rss_mb():
+    """RSS proses saat ini (MB). Di luar Linux jatuh ke ru_maxrss (puncak sejauh ini)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE / 2 ** 20
+    except OSError:
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux melaporkan KB, macOS melaporkan bytes
+        return maxrss / 2 ** 20 if maxrss > 2 ** 32 else maxrss / 1024
+
+
+def configure_log_dir(app_dir):
+    """Log default ditulis ke <app_dir>/logs/diagnostics.jsonl (dipanggil dari utils/__init__.py)."""
+    global _log_dir
+    _log_dir = app_dir
+
+
+def default_log_path():
+    """Env DASHBOARD_DIAGNOSTICS_LOG bila di-set, selain itu logs/diagnostics.jsonl di folder aplikasi."""
+    return os.environ.get(LOG_ENV, os.path.join(_log_dir, LOG_NAME))
+
+
+class PeakWindow:
+    """RSS awal & puncak satu blok yang sedang diukur."""
+
+    def __init__(self, start_mb):
+        self.start_mb = self.peak_mb = start_mb
+
+    def observe(self, rss_mb):
+        if rss_mb > self.peak_mb:
+            self.peak_mb = rss_mb
+
+
+class PeakSampler:
+    """
+    Satu thread sampler RSS untuk semua blok yang sedang diukur (juga tahap bersarang dan
+    tahap di thread lain). Thread dibuat saat pertama dipakai dan tidur selama tidak ada blok aktif.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self._windows = set()
+        self._lock = threading.Lock()
+        self._busy = threading.Event()
+        self._thread = None
+
+    @contextmanager
+    def track(self):
+        """Ukur blok `with`; yield PeakWindow yang start_mb / peak_mb-nya terisi."""
+        window = PeakWindow(current_rss_mb())
+        with self._lock:
+            self._windows.add(window)
+            self._busy.set()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='diagnostics-rss', daemon=True)
+                self._thread.start()
+        try:
+            yield window
+        finally:
+            with self._lock:
+                self._windows.discard(window)
+            window.observe(current_rss_mb())
+
+    def _run(self):
+        while True:
+            with self._lock:
+                windows = list(self._windows)
+                if not windows:
+                    self._busy.clear()
+            if not windows:
+                self._busy.wait()
+                continue
+            rss_mb = current_rss_mb()
+            for window in windows:
+                window.observe(rss_mb)
+            time.sleep(self.interval)
+
+
+_SAMPLER = PeakSampler()
+
+
+def track_peak():
+    """Puncak RSS proses selama blok `with` (memakai sampler bersama)."""
+    return _SAMPLER.track()
+
+
+def count_rows(value):
+    """Jumlah baris hasil tahap: DataFrame/Series pertama di dalam tuple/dict juga dihitung."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        for item in value:
+            rows = count_rows(item)
+            if rows is not None:
+                return rows
+    if isinstance(value, dict):
+        return count_rows(tuple(value.values()))
+    return None
+
+
+class StageRecorder:
+    """
+    Kumpulan hasil ukur satu rerun / satu file.
+
+    Tiap record: app, run_id, seq, stage, depth (tahap bersarang), status, seconds,
+    rows_in, rows_out, rss_before_mb, peak_delta_mb, error.
+    """
+
+    def __init__(self, app, log_path=None):
+        self.app = app
+        self.log_path = default_log_path() if log_path is None else log_path
+        self.run_id = uuid.uuid4().hex[:12]
+        self.records = []
+        self._depth = 0
+
+    def activate(self):
+        """Jadikan recorder ini tujuan `stage` / `timed` di thread (konteks) saat ini."""
+        _ACTIVE.set(self)
+        return self
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """Ukur blok `with`; isi record['rows_out'] di dalam blok bila jumlah baris hasil diketahui."""
+        record = {
+            'app': self.app,
+            'run_id': self.run_id,
+            'seq': len(self.records),
+            'stage': name,
+            'depth': self._depth,
+            'status': 'ok',
+            'seconds': None,
+            'rows_in': rows_in,
+            'rows_out': None,
+            'rss_before_mb': None,
+            'peak_delta_mb': None,
+            'error': None,
+        }
+        self.records.append(record)
+        self._depth += 1
+        window = None
+        start = time.perf_counter()
+        try:
+            with track_peak() as window:
+                yield record
+        except Exception as e:
+            record['status'] = 'error'
+            record['error'] = f"{type(e).__name__}: {e}"
+            raise
+        except BaseException:
+            # st.stop() / rerun Streamlit menghentikan skrip lewat BaseException
+            record['status'] = 'stopped'
+            raise
+        finally:
+            self._depth -= 1
+            record['seconds'] = round(time.perf_counter() - start, 4)
+            record['rss_before_mb'] = round(window.start_mb, 1)
+            record['peak_delta_mb'] = round(window.peak_mb - window.start_mb, 1)
+            self.write_log(record)
+
+    def run(self, name, fn, *args, rows_in=None, **kwargs):
+        """Jalankan fn(*args, **kwargs) sebagai satu tahap; rows_in default dari argumen pertama."""
+        if rows_in is None and args:
+            rows_in = count_rows(args[0])
+        with self.stage(name, rows_in) as record:
+            result = fn(*args, **kwargs)
+            record['rows_out'] = count_rows(result)
+        return result
+
+    def write_log(self, record):
+        """Tambahkan satu record ke log JSON lines (gagal tulis log tidak menghentikan dashboard)."""
+        if not self.log_path:
+            return
+        line = json.dumps({'timestamp': datetime.now().isoformat(timespec='milliseconds'), **record}, default=str)
+        try:
+            with _LOG_LOCK:
+                log_dir = os.path.dirname(self.log_path)
+                if log_dir:
+                    os.makedirs(log_dir, exist_ok=True)
+                if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > LOG_MAX_BYTES:
+                    os.replace(self.log_path, f"{self.log_path}.1")
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(line + '\n')
+        except OSError:
+            pass
+
+    def to_frame(self):
+        """Record sebagai DataFrame, nama tahap diindentasi sesuai kedalaman."""
+        table = pd.DataFrame(self.records, columns=[
+            'seq', 'stage', 'depth', 'status', 'seconds', 'rows_in', 'rows_out',
+            'rss_before_mb', 'peak_delta_mb', 'error'
+        ])
+        table['stage'] = [' ' * depth + name for depth, name in zip(table['depth'], table['stage'])]
+        return table.drop(columns=['seq', 'depth'])
+
+    def total_seconds(self):
+        """Total waktu tahap tingkat teratas (tahap bersarang sudah termasuk di induknya)."""
+        return sum(r['seconds'] or 0 for r in self.records if r['depth'] == 0)
+
+
+def active_recorder():
+    return _ACTIVE.get()
+
+
+@contextmanager
+def stage(name, rows_in=None):
+    """`StageRecorder.stage` milik recorder aktif; tanpa recorder aktif hanya menjalankan blok."""
+    recorder = _ACTIVE.get()
+    if recorder is None:
+        yield {}
+        return
+    with recorder.stage(name, rows_in) as record:
+        yield record
+
+
+def timed(name, fn, *args, rows_in=None, **kwargs):
+    """`StageRecorder.run` milik recorder aktif; tanpa recorder aktif hanya memanggil fn."""
+    recorder = _ACTIVE.get()
+    if recorder is None:
+        return fn(*args, **kwargs)
+    return recorder.run(name, fn, *args, rows_in=rows_in, **kwargs)
+
+
+def show_diagnostics(recorder, expanded=False):
+    """Panel diagnostik (expander Streamlit): tabel tahap rerun ini + tahap paling lambat."""
+    import streamlit as st
+
+    with st.expander("⏱️ Diagnostik Performa", expanded=expanded):
+        if not recorder.records:
+            st.info("Belum ada tahap yang tercatat.")
+            return
+        table = recorder.to_frame()
+        top = [r for r in recorder.records if r['depth'] == 0 and r['seconds'] is not None]
+        slowest = max(top, key=lambda r: r['seconds']) if top else None
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Total waktu", f"{recorder.total_seconds():.2f} s")
+        col2.metric("Tahap terlambat", slowest['stage'] if slowest else "-",
+                    f"{slowest['seconds']:.2f} s" if slowest else None, delta_color="off")
+        col3.metric("RSS proses", f"{current_rss_mb():.0f} MB")
+        st.dataframe(table, use_container_width=True, hide_index=True)
+        st.caption(f"Run ID `{recorder.run_id}` — log: `{recorder.log_path or 'nonaktif'}`")
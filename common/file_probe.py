@@ -0,0 +1,277 @@
+import codecs
+import csv
+import io
+import re
+from collections import Counter
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+SAMPLE_SIZE = 64 * 1024
+# Ukuran blok saat memvalidasi encoding seluruh file
+VALIDATE_BLOCK_SIZE = 1024 * 1024
+# Jumlah baris per chunk untuk read_csv_compact
+CHUNK_ROWS = 200_000
+CANDIDATE_ENCODINGS = ['utf-8', 'cp1252']
+CANDIDATE_DELIMITERS = [',', ';', '\t', '|']
+DECIMAL_COMMA_RE = re.compile(r'^-?\d+,\d+$')
+
+
+def _read_samples(source, sample_size=SAMPLE_SIZE):
+    """Ambil potongan awal dan akhir file (bytes). `source` bisa path atau file-like."""
+    if hasattr(source, 'read'):
+        source.seek(0, io.SEEK_END)
+        total = source.tell()
+        source.seek(0)
+        head = source.read(sample_size)
+        tail = b''
+        if total > sample_size:
+            source.seek(max(sample_size, total - sample_size))
+            tail = source.read(sample_size)
+        source.seek(0)
+    else:
+        with open(source, 'rb') as f:
+            head = f.read(sample_size)
+            f.seek(0, io.SEEK_END)
+            total = f.tell()
+            tail = b''
+            if total > sample_size:
+                f.seek(max(sample_size, total - sample_size))
+                tail = f.read(sample_size)
+    if isinstance(head, str):
+        head, tail = head.encode('utf-8'), tail.encode('utf-8')
+    return head, tail
+
+
+def _complete_lines(head, tail):
+    # Potong di batas baris supaya karakter multi-byte tidak terbelah
+    if b'\n' in head:
+        head = head[:head.rfind(b'\n') + 1]
+    if b'\n' in tail:
+        tail = tail[tail.find(b'\n') + 1:]
+    return head, tail
+
+
+def detect_encoding(head, tail=b''):
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    head, tail = _complete_lines(head, tail)
+    for encoding in CANDIDATE_ENCODINGS:
+        try:
+            head.decode(encoding)
+            tail.decode(encoding)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return 'latin1'
+
+
+def fallback_encodings(encoding):
+    """`encoding` lalu kandidat berikutnya, diakhiri latin1 (selalu bisa men-decode byte apa pun)."""
+    chain = [encoding]
+    if encoding in CANDIDATE_ENCODINGS:
+        chain += CANDIDATE_ENCODINGS[CANDIDATE_ENCODINGS.index(encoding) + 1:]
+    elif encoding == 'utf-8-sig':
+        chain += CANDIDATE_ENCODINGS[1:]
+    return chain + ([] if encoding == 'latin1' else ['latin1'])
+
+
+def _iter_blocks(source, block_size=VALIDATE_BLOCK_SIZE):
+    if hasattr(source, 'read'):
+        source.seek(0)
+        while True:
+            block = source.read(block_size)
+            if not block:
+                break
+            yield block
+        source.seek(0)
+    else:
+        with open(source, 'rb') as f:
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    break
+                yield block
+
+
+def decodes_fully(source, encoding, block_size=VALIDATE_BLOCK_SIZE):
+    """True bila seluruh isi file valid untuk `encoding` (decode strict per blok, tanpa parsing)."""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        for block in _iter_blocks(source, block_size):
+            if isinstance(block, str):
+                # Sumber teks sudah di-decode oleh pemanggil
+                return True
+            decoder.decode(block)
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return False
+    finally:
+        if hasattr(source, 'seek'):
+            source.seek(0)
+    return True
+
+
+def full_file_encoding(source, encoding):
+    """Encoding pertama dari fallback_encodings(encoding) yang valid untuk seluruh file."""
+    for candidate in fallback_encodings(encoding)[:-1]:
+        if decodes_fully(source, candidate):
+            return candidate
+    return 'latin1'
+
+
+def detect_delimiter(lines):
+    sample = '\n'.join(lines)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=''.join(CANDIDATE_DELIMITERS)).delimiter
+    except csv.Error:
+        pass
+    # Fallback: delimiter yang jumlahnya paling konsisten di setiap baris
+    best, best_score = ',', 0
+    for delimiter in CANDIDATE_DELIMITERS:
+        counts = [line.count(delimiter) for line in lines]
+        modal, freq = Counter(counts).most_common(1)[0]
+        score = freq if modal > 0 else 0
+        if score > best_score:
+            best, best_score = delimiter, score
+    return best
+
+
+def detect_header_row(lines, delimiter):
+    """Index baris header: baris pertama yang jumlah kolomnya sama dengan modus (lewati baris judul/preamble)."""
+    field_counts = [len(row) for row in csv.reader(lines, delimiter=delimiter)]
+    non_blank = [count for count in field_counts if count > 0]
+    if not non_blank:
+        return 0
+    modal = Counter(non_blank).most_common(1)[0][0]
+    if modal <= 1:
+        return 0
+    return next(i for i, count in enumerate(field_counts) if count == modal)
+
+
+def detect_decimal(lines, delimiter, header_row):
+    """Desimal koma hanya bisa dipakai parser jika delimiter bukan koma."""
+    if delimiter == ',':
+        return '.'
+    rows = list(csv.reader(lines[header_row + 1:], delimiter=delimiter))
+    comma_numbers = sum(1 for row in rows for value in row if DECIMAL_COMMA_RE.match(value.strip()))
+    return ',' if comma_numbers > 0 else '.'
+
+
+def probe_csv(source, sample_size=SAMPLE_SIZE):
+    """
+    Deteksi setelan parsing CSV dari sampel awal + akhir file (sekali baca).
+
+    Return dict siap dipakai pd.read_csv:
+    {'encoding': ..., 'sep': ..., 'skiprows': ..., 'decimal': ...}
+    """
+    head, tail = _read_samples(source, sample_size)
+    encoding = detect_encoding(head, tail)
+    complete_head, _ = _complete_lines(head, tail)
+    text = (complete_head or head).decode(encoding, errors='replace')
+    # `lines` tetap memuat baris kosong supaya index header sama dengan nomor baris di file
+    lines = text.splitlines()[:200]
+    non_blank = [line for line in lines if line.strip()]
+    if not non_blank:
+        return {'encoding': encoding, 'sep': ',', 'skiprows': 0, 'decimal': '.'}
+
+    delimiter = detect_delimiter(non_blank)
+    header_row = detect_header_row(lines, delimiter)
+    decimal = detect_decimal(lines, delimiter, header_row)
+    return {'encoding': encoding, 'sep': delimiter, 'skiprows': header_row, 'decimal': decimal}
+
+
+def read_csv_fast(source, probe=None, **kwargs):
+    """
+    pd.read_csv dengan setelan hasil probe_csv dan engine C (bukan engine python + sep=None).
+
+    Encoding dari probe hanya ditebak dari sampel awal + akhir file, jadi decode tetap strict
+    (byte tak valid tidak pernah diganti diam-diam). Baca sekaligus: UnicodeDecodeError
+    dibaca ulang dengan encoding berikutnya (utf-8 -> cp1252 -> latin1). Baca per chunk
+    (chunksize / iterator): chunk yang sudah dikembalikan tidak bisa ditarik lagi, jadi
+    seluruh file divalidasi dulu per blok lalu dibaca dengan encoding yang lolos.
+    Parameter tambahan (chunksize, usecols, nrows, ...) diteruskan ke pd.read_csv.
+    """
+    if probe is None:
+        probe = probe_csv(source)
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    options = {
+        'sep': probe['sep'],
+        'encoding': probe['encoding'],
+        'skiprows': probe['skiprows'] or None,
+        'decimal': probe['decimal'],
+        'engine': 'c',
+    }
+    options.update(kwargs)
+    if options.get('chunksize') or options.get('iterator'):
+        options['encoding'] = full_file_encoding(source, options['encoding'])
+        return pd.read_csv(source, **options)
+
+    encodings = fallback_encodings(options.pop('encoding'))
+    for encoding in encodings:
+        try:
+            return pd.read_csv(source, encoding=encoding, **options)
+        except UnicodeDecodeError:
+            if encoding == encodings[-1]:
+                raise
+            if hasattr(source, 'seek'):
+                source.seek(0)
+
+
+def read_csv_compact(source, category_columns=(), columns=None, probe=None, chunksize=CHUNK_ROWS):
+    """
+    Baca CSV per chunk dan simpan kolom label langsung sebagai category.
+
+    Nama kolom dicocokkan setelah strip + lowercase. Tiap chunk hanya menyimpan kode
+    integer + daftar nilai unik, jadi puncak memori tidak lagi memuat seluruh kolom
+    teks sekaligus. `columns`: kalau diisi, kolom lain tidak dibaca sama sekali.
+    """
+    wanted = {col.lower() for col in columns} if columns is not None else None
+    labels = {col.lower() for col in category_columns}
+
+    def normalized(col):
+        return str(col).strip().lower()
+
+    usecols = (lambda col: normalized(col) in wanted) if wanted is not None else None
+    chunks = []
+    for chunk in read_csv_fast(source, probe=probe, chunksize=chunksize, usecols=usecols):
+        for col in chunk.columns:
+            if normalized(col) in labels:
+                chunk[col] = chunk[col].astype('category')
+        chunks.append(chunk)
+    if not chunks:
+        return read_csv_fast(source, probe=probe, usecols=usecols)
+
+    # Gabung kategori antar chunk (concat biasa mengubah category berbeda jadi teks lagi)
+    merged = {}
+    for i, col in enumerate(chunks[0].columns):
+        parts = [chunk.iloc[:, i] for chunk in chunks]
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            merged[i] = pd.Series(union_categoricals(_align_categories(parts), sort_categories=True), name=col)
+        else:
+            merged[i] = pd.concat(parts, ignore_index=True)
+    df = pd.concat(merged.values(), axis=1, ignore_index=True)
+    df.columns = chunks[0].columns
+    return df
+
+
+def _align_categories(parts):
+    """
+    Samakan tipe kategori antar chunk sebelum union_categoricals.
+
+    Chunk yang kolomnya kosong semua punya kategori float64 (kosong), dan chunk yang
+    isinya angka semua punya kategori int64; union_categoricals menolak campuran tipe.
+    Chunk kosong ikut tipe chunk lain, sedangkan campuran tipe dijadikan teks.
+    """
+    dtypes = {part.cat.categories.dtype for part in parts if len(part.cat.categories)}
+    if not dtypes:
+        return parts
+    if len(dtypes) > 1:
+        parts = [part.astype(object).map(str, na_action='ignore').astype('category') for part in parts]
+        dtypes = {part.cat.categories.dtype for part in parts if len(part.cat.categories)}
+    dtype = dtypes.pop()
+    return [
+        part if len(part.cat.categories) else part.cat.set_categories(pd.Index([], dtype=dtype))
+        for part in parts
+    ]
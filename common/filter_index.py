@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+
+class FilterIndex:
+    """
+    Index kode per kolom untuk filter bertingkat (cascading multiselect).
+
+    Dibangun sekali per dataset: tiap kolom disimpan sebagai array kode integer
+    (kode category langsung dipakai, kolom lain di-factorize). Pilihan filter
+    diubah jadi mask boolean lewat lookup table, mask digabung dengan operasi
+    vektor, dan daftar opsi diambil dari kode yang muncul di mask (bincount),
+    bukan dari scan ulang string.
+
+    Posisi baris mengikuti dataframe saat index dibangun; pakai mask dengan
+    df[mask] pada dataframe yang urutan barisnya sama.
+    """
+
+    def __init__(self, df, columns, order_by=None):
+        """order_by: dict kolom -> kolom kunci urutan opsi (misal bulan_label -> bulan_label_dt)."""
+        order_by = order_by or {}
+        self.n_rows = len(df)
+        self._codes = {}
+        self._values = {}
+        self._display_order = {}
+        for col in columns:
+            if col not in df.columns:
+                continue
+            series = df[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes = series.cat.codes.to_numpy()
+                values = series.cat.categories
+            else:
+                codes, values = pd.factorize(series)
+            self._codes[col] = codes
+            self._values[col] = pd.Index(values)
+
+            order_col = order_by.get(col)
+            if order_col in df.columns:
+                # Urutkan opsi berdasarkan nilai minimum kolom kunci per kode (NaN/NaT di akhir)
+                valid = codes >= 0
+                keys = pd.Series(df[order_col].to_numpy()[valid]).groupby(codes[valid]).min()
+                keys = keys.reindex(range(len(values)))
+                self._display_order[col] = keys.sort_values(na_position='last').index.to_numpy()
+            else:
+                self._display_order[col] = np.argsort(np.asarray(values, dtype=object), kind='stable')
+
+    def has(self, col):
+        return col in self._codes
+
+    def all_rows(self):
+        return np.ones(self.n_rows, dtype=bool)
+
+    def options(self, col, mask=None):
+        """Nilai unik (tanpa NaN) kolom `col` di baris yang lolos `mask`, terurut."""
+        codes = self._codes[col]
+        if mask is not None:
+            codes = codes[mask]
+        present = np.bincount(codes[codes >= 0], minlength=len(self._values[col])) > 0
+        values = self._values[col]
+        return [values[code] for code in self._display_order[col] if present[code]]
+
+    def mask(self, col, selected):
+        """Mask baris yang nilainya termasuk `selected` (NaN tidak pernah lolos)."""
+        values = self._values[col]
+        lookup = np.zeros(len(values) + 1, dtype=bool)
+        lookup[:-1] = values.isin(list(selected))
+        # Kode -1 (NaN) jatuh ke slot terakhir yang selalu False
+        return lookup[self._codes[col]]
@@ -0,0 +1,219 @@
+"""
+Job training di latar belakang: fit model berjalan di thread sendiri, jadi chart &
+tabel tetap langsung tampil dan bagian model terisi saat job selesai.
+
+Setiap job punya ID dan status (pending / running / done / failed / cancelled).
+Satu sesi Streamlit memegang satu job per slot (misal 'rca_model'); jika filter
+berubah (signature beda), job lama dibatalkan dan job baru langsung jalan di thread
+baru, tidak mengantre di belakang job basi. Pembatalan bersifat kooperatif: kode
+training memanggil `check_cancelled()` / `fit_forest_in_steps()` di antara tahap.
+"""
+import contextvars
+import hashlib
+import json
+import threading
+import time
+import uuid
+
+from .diagnostics import StageRecorder, timed
+
+MAX_FINISHED_JOBS = 32
+POLL_SECONDS = 1.0
+# Jumlah pohon per tahap saat RandomForest dilatih bertahap (titik cek pembatalan)
+FOREST_STEP = 10
+
+_CURRENT_JOB = contextvars.ContextVar('training_job', default=None)
+
+
+class JobCancelled(Exception):
+    """Job dibatalkan (filter berubah) sebelum training selesai."""
+
+
+class TrainingJob:
+    def __init__(self, name, signature):
+        self.id = uuid.uuid4().hex[:8]
+        self.name = name
+        self.signature = signature
+        self.status = 'pending'
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    def done(self):
+        return self.status in ('done', 'failed', 'cancelled')
+
+    def elapsed(self):
+        start = self.started_at or self.submitted_at
+        return (self.finished_at or time.time()) - start
+
+
+def current_job():
+    return _CURRENT_JOB.get()
+
+
+def check_cancelled():
+    """Raise JobCancelled jika job yang sedang berjalan di thread ini sudah dibatalkan."""
+    job = _CURRENT_JOB.get()
+    if job is not None and job.cancel_requested:
+        raise JobCancelled(job.id)
+
+
+def fit_forest_in_steps(forest, X, y, step=FOREST_STEP):
+    """
+    Latih RandomForest bertahap (warm_start, `step` pohon per tahap) dengan cek pembatalan
+    di antara tahap. Hasilnya identik dengan fit sekali jalan; di luar job cukup fit biasa.
+    """
+    if _CURRENT_JOB.get() is None:
+        return forest.fit(X, y)
+    total = forest.n_estimators
+    forest.set_params(warm_start=True)
+    for n_estimators in range(min(step, total), total + step, step):
+        check_cancelled()
+        forest.set_params(n_estimators=min(n_estimators, total))
+        forest.fit(X, y)
+    forest.set_params(warm_start=False)
+    return forest
+
+
+def job_signature(*parts):
+    """Hash pendek dari semua input yang menentukan hasil job (data, filter, opsi)."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class TrainingExecutor:
+    """Jalankan job training di thread latar belakang dan simpan statusnya per ID."""
+
+    def __init__(self, app, max_finished=MAX_FINISHED_JOBS):
+        self.app = app
+        self.max_finished = max_finished
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+        if job is not None:
+            job.cancel()
+            if job.status == 'pending':
+                job.finished_at = time.time()
+                job.status = 'cancelled'
+        return job
+
+    def submit(self, name, signature, fn, *args, previous=None, **kwargs):
+        """
+        Mulai fn(*args, **kwargs) sebagai job baru.
+        previous: ID job yang sedang dipegang pemanggil; dipakai ulang jika signature sama
+        (dan belum gagal / batal), jika tidak job itu dibatalkan.
+        """
+        old = self.get(previous) if previous else None
+        if old is not None:
+            if old.signature == signature and old.status not in ('failed', 'cancelled'):
+                return old
+            self.cancel(old.id)
+
+        job = TrainingJob(name, signature)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        thread = threading.Thread(
+            target=self._run, args=(job, fn, args, kwargs), name=f"train-{job.id}", daemon=True
+        )
+        thread.start()
+        return job
+
+    def _prune(self):
+        finished = sorted((j for j in self._jobs.values() if j.done()), key=lambda j: j.finished_at or 0)
+        for job in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job.id]
+
+    def _run(self, job, fn, args, kwargs):
+        _CURRENT_JOB.set(job)
+        # Tahap di dalam job tercatat di log diagnostik dengan app '<app>/job'
+        StageRecorder(f"{self.app}/job").activate()
+        job.started_at = time.time()
+        job.status = 'running'
+        try:
+            check_cancelled()
+            result = timed(f"job:{job.name}", fn, *args, **kwargs)
+            check_cancelled()
+        except JobCancelled:
+            status = 'cancelled'
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            status = 'failed'
+        else:
+            job.result = result
+            status = 'done'
+        # finished_at diisi sebelum status: job yang sudah done() selalu punya finished_at
+        job.finished_at = time.time()
+        job.status = status
+
+
+_EXECUTORS = {}
+_EXECUTORS_LOCK = threading.Lock()
+
+
+def get_executor(app):
+    """Satu executor per aplikasi untuk semua sesi di proses ini."""
+    with _EXECUTORS_LOCK:
+        if app not in _EXECUTORS:
+            _EXECUTORS[app] = TrainingExecutor(app)
+        return _EXECUTORS[app]
+
+
+def session_job(executor, slot, signature, fn, *args, **kwargs):
+    """
+    Job untuk `slot` di sesi Streamlit ini: dipakai ulang selama signature sama,
+    dibatalkan & diganti job baru saat signature berubah (misal filter diganti).
+    """
+    import streamlit as st
+
+    jobs = st.session_state.setdefault('_training_jobs', {})
+    job = executor.submit(slot, signature, fn, *args, previous=jobs.get(slot), **kwargs)
+    jobs[slot] = job.id
+    return job
+
+
+def cancel_session_job(executor, slot):
+    """Batalkan job `slot` milik sesi ini (misal hasilnya ternyata sudah ada di registry)."""
+    import streamlit as st
+
+    job_id = st.session_state.get('_training_jobs', {}).pop(slot, None)
+    if job_id is not None:
+        executor.cancel(job_id)
+
+
+def wait_for_job(job, label, poll_seconds=POLL_SECONDS):
+    """
+    Tampilkan status job yang belum selesai. Fragment ini dicek ulang tiap poll_seconds
+    tanpa merender ulang halaman; saat job selesai seluruh app di-rerun sekali supaya
+    hasil model (dan export yang memakainya) ikut terisi.
+    """
+    import streamlit as st
+
+    @st.fragment(run_every=poll_seconds)
+    def poll():
+        if job.done():
+            st.rerun()
+        st.info(f"⏳ {label} berjalan di latar belakang (job `{job.id}`, {job.status}, {job.elapsed():.0f} s)...")
+
+    poll()
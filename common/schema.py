@@ -0,0 +1,36 @@
+import pandas as pd
+
+# Kolom label berulang: disimpan sebagai category (kode integer + daftar nilai unik)
+CATEGORY_COLUMNS = [
+    'circle', 'severity', 'rca', 'subrootcause', 'sitename',
+    'slastatus', 'bulan_label', 'siteregion', 'mccluster'
+]
+FLOAT32_COLUMNS = ['mttr']
+
+
+def apply_schema(df):
+    """
+    Ubah kolom label ke dtype category dan mttr ke float32 (in-place, kolom yang tidak ada dilewati).
+
+    isin / groupby / pivot pada category bekerja dengan kode integer, bukan hash string per baris.
+    """
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns and df[col].dtype != 'float32':
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
+    return df
+
+
+def drop_unused_categories(df):
+    """
+    Buang kategori yang tidak muncul lagi setelah filter, supaya value_counts / chart
+    tidak menampilkan nilai dengan jumlah 0. Return dataframe baru.
+    """
+    unused = {
+        col: df[col].cat.remove_unused_categories()
+        for col in df.columns
+        if isinstance(df[col].dtype, pd.CategoricalDtype)
+    }
+    return df.assign(**unused) if unused else df
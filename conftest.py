@@ -0,0 +1,51 @@
+"""
+Konfigurasi pytest untuk seluruh repo.
+
+Tiap dashboard punya package `utils` (dan `visualization`) sendiri dan dijalankan dari
+foldernya, jadi test di <app>/tests mengimpor `utils` milik app itu (script di program/
+juga mengimpor modul tetangganya langsung, misal `merge_sinks`). Sebelum modul test
+dikumpulkan / dijalankan, folder app dipasang di depan sys.path dan modul `utils` app
+lain dilepas dari sys.modules (disimpan, dipasang lagi saat app itu aktif kembali).
+Test modul bersama ada di tests/ dan cukup mengimpor `common`.
+"""
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIRS = ['program', 'rca_dashboard', 'rca_dashboard_cluster', 'tt-inc_dashboard']
+APP_PACKAGES = ('utils', 'visualization')
+
+_modules_by_app = {}
+_active_app = None
+
+
+def _app_for(path):
+    top = os.path.relpath(str(path), ROOT_DIR).split(os.sep)[0]
+    return top if top in APP_DIRS else None
+
+
+def _app_modules():
+    return {name: module for name, module in sys.modules.items() if name.split('.')[0] in APP_PACKAGES}
+
+
+def _activate(app):
+    global _active_app
+    if app is None or app == _active_app:
+        return
+    if _active_app is not None:
+        _modules_by_app[_active_app] = _app_modules()
+    for name in _app_modules():
+        del sys.modules[name]
+    sys.modules.update(_modules_by_app.get(app, {}))
+    app_paths = {os.path.join(ROOT_DIR, d) for d in APP_DIRS}
+    sys.path[:] = [p for p in sys.path if p not in app_paths]
+    sys.path.insert(0, os.path.join(ROOT_DIR, app))
+    _active_app = app
+
+
+def pytest_collectstart(collector):
+    _activate(_app_for(collector.path))
+
+
+def pytest_runtest_setup(item):
+    _activate(_app_for(item.path))
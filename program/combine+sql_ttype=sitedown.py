@@ -1,21 +1,41 @@
 import streamlit as st
 import pandas as pd
-import math
 import io
-import zipfile
-import sqlite3
 import tempfile
 import os
 import re
+import sys
+from merge_sinks import write_parquet, write_sqlite, export_zip_stream, write_xlsx_stream, spooled_bytes, EXCEL_MAX_ROWS
+from ttype_filter import TTTypeClassifier, load_patterns, read_columns, read_filtered
+
+# Modul bersama (common/) ada di root repo, satu tingkat di atas program/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.file_probe import read_csv_fast
 
 st.set_page_config(page_title="Gabung File Excel/CSV", layout="centered")
 
 st.title("📊 Gabung File Excel / CSV dengan kondisi hanya pada Kolom TT Type = Baris Site Down")
-st.markdown("Unggah beberapa file `.xlsx` atau `.csv`, lalu gabungkan dan unduh hasilnya.")
+st.markdown("Unggah beberapa file `.xlsx`, `.csv` atau `.parquet`, lalu gabungkan dan unduh hasilnya.")
 
 # --- Sidebar options ---
 st.sidebar.header("⚙️ Opsi Ekspor")
-output_format = st.sidebar.radio("Format Output", ["Excel (.xlsx)", "CSV (.csv)", "SQLite Database (.db)"])
+output_format = st.sidebar.radio("Format Output", ["Excel (.xlsx)", "CSV (.csv)", "Parquet (.parquet)", "SQLite Database (.db)"])
+
+# --- Pola filter TT Type (bawaan dari ttype_patterns.json, bisa diubah tanpa edit kode) ---
+st.sidebar.header("🔎 Filter TT Type")
+default_include, default_exclude = load_patterns()
+include_text = st.sidebar.text_area("Pola include (regex, satu per baris)", "\n".join(default_include))
+exclude_text = st.sidebar.text_area("Pola exclude (regex, satu per baris)", "\n".join(default_exclude))
+try:
+    ttype_classifier = TTTypeClassifier(include_text.splitlines(), exclude_text.splitlines())
+except re.error as e:
+    st.sidebar.error(f"Pola regex tidak valid: {e}")
+    st.stop()
+
+pushdown = st.sidebar.checkbox(
+    "Mode hemat memori (filter TT Type saat membaca file)", value=True,
+    help="Baris yang bukan Site Down dibuang per chunk saat file dibaca, jadi tidak pernah dimuat utuh."
+)
 
 # --- Fungsi Membaca File ---
 def read_uploaded_files(uploaded_files):
@@ -23,7 +43,9 @@ def read_uploaded_files(uploaded_files):
     for uploaded_file in uploaded_files:
         try:
             if uploaded_file.name.endswith(".csv"):
-                df = pd.read_csv(uploaded_file)
+                df = read_csv_fast(uploaded_file)
+            elif uploaded_file.name.endswith(".parquet"):
+                df = pd.read_parquet(uploaded_file)
             else:
                 df = pd.read_excel(uploaded_file)
             dataframes.append(df)
@@ -31,46 +53,39 @@ def read_uploaded_files(uploaded_files):
             st.error(f"Gagal membaca file: {uploaded_file.name}\n{e}")
     return dataframes
 
+# --- Fungsi Membaca File dengan Filter TT Type per Chunk (predicate pushdown) ---
+def read_uploaded_files_filtered(uploaded_files, classifier, columns=None):
+    dataframes = []
+    for uploaded_file in uploaded_files:
+        try:
+            df = read_filtered(uploaded_file, classifier, columns)
+            if df is None:
+                st.warning(f"⚠️ Kolom 'TT Type' tidak ditemukan di {uploaded_file.name}. File dilewati.")
+                continue
+            dataframes.append(df)
+        except Exception as e:
+            st.error(f"Gagal membaca file: {uploaded_file.name}\n{e}")
+    return dataframes
+
 # --- Fungsi Ekspor ke ZIP Excel/CSV ---
 def export_to_excel_zip(df, output_format):
-    max_rows = 1048576
-    total_rows = df.shape[0]
-    num_parts = math.ceil(total_rows / max_rows)
-
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, "a", zipfile.ZIP_DEFLATED) as zip_file:
-        for i in range(num_parts):
-            start = i * max_rows
-            end = min(start + max_rows, total_rows)
-            chunk = df.iloc[start:end]
-            part_buffer = io.BytesIO()
-            filename = f"gabungan_part_{i+1}"
-
-            if output_format == "Excel (.xlsx)":
-                chunk.to_excel(part_buffer, index=False, engine='openpyxl')
-                zip_file.writestr(f"{filename}.xlsx", part_buffer.getvalue())
-            else:
-                chunk.to_csv(part_buffer, index=False)
-                zip_file.writestr(f"{filename}.csv", part_buffer.getvalue())
-
-    zip_buffer.seek(0)
-    return zip_buffer
+    # Tiap part ditulis langsung ke entry ZIP (xlsxwriter constant_memory),
+    # ZIP otomatis dipindah ke file sementara jika ukurannya besar; hasilnya bytes
+    file_format = 'xlsx' if output_format == "Excel (.xlsx)" else 'csv'
+    return export_zip_stream(df, file_format)
 
 # --- Fungsi Ekspor ke SQLite ---
 def export_to_sqlite(df):
+    # Bulk load bertipe + index (lihat merge_sinks.SqliteSink) ke folder sementara.
+    # st.download_button tetap memuat seluruh isi file ke memori, jadi file langsung
+    # dibaca sebagai bytes lalu folder sementara dihapus (juga di Windows, koneksi
+    # SQLite sudah ditutup write_sqlite) sehingga tidak ada file / handle yang tertinggal.
     try:
-        with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmpfile:
-            tmpfile_path = tmpfile.name
-
-        conn = sqlite3.connect(tmpfile_path)
-        df.to_sql('data_gabungan', conn, if_exists='replace', index=False)
-        conn.close()
-
-        with open(tmpfile_path, "rb") as f:
-            db_data = f.read()
-
-        os.remove(tmpfile_path)
-        return db_data
+        with tempfile.TemporaryDirectory(prefix="gabung_sqlite_") as tmp_dir:
+            tmpfile_path = os.path.join(tmp_dir, "hasil_gabungan.db")
+            write_sqlite(df, tmpfile_path)
+            with open(tmpfile_path, "rb") as f:
+                return f.read()
 
     except Exception as e:
         st.error(f"Gagal mengekspor ke SQLite: {e}")
@@ -80,39 +95,42 @@ def export_to_sqlite(df):
 
 uploaded_files = st.file_uploader(
     "📁 Unggah File",
-    type=["xlsx", "csv"],
+    type=["xlsx", "csv", "parquet"],
     accept_multiple_files=True
 )
 
 if uploaded_files:
     st.info(f"{len(uploaded_files)} file berhasil diunggah.")
-    dataframes = read_uploaded_files(uploaded_files)
+
+    if pushdown:
+        # Pilih kolom yang diekspor dari header file (tanpa memuat data)
+        all_columns = []
+        for uploaded_file in uploaded_files:
+            try:
+                for col in read_columns(uploaded_file):
+                    if col not in all_columns:
+                        all_columns.append(col)
+            except Exception as e:
+                st.error(f"Gagal membaca header: {uploaded_file.name}\n{e}")
+        export_columns = st.multiselect("Kolom yang diekspor", options=all_columns, default=all_columns)
+        dataframes = read_uploaded_files_filtered(uploaded_files, ttype_classifier, export_columns or None)
+    else:
+        dataframes = read_uploaded_files(uploaded_files)
 
     if dataframes:
         combined_df = pd.concat(dataframes, ignore_index=True)
 
-        if 'TT Type' in combined_df.columns:
-            # Pola dasar yang kita cari
-            positive_pattern = r'\bsite[\s\-_]?down\b'
-
-            # Pola untuk baris negatif yang ingin kita buang
-            negative_pattern = r'\b(non|not)[\s\-_]?site[\s\-_]?down\b'
-
-            # Cek yang mengandung 'site down' (positif)
-            positive_mask = combined_df['TT Type'].astype(str).str.contains(
-                positive_pattern, flags=re.IGNORECASE, na=False, regex=True
-            )
-
-            # Cek dan buang yang mengandung frasa negatif
-            negative_mask = combined_df['TT Type'].astype(str).str.contains(
-                negative_pattern, flags=re.IGNORECASE, na=False, regex=True
-            )
-
-            # Hanya ambil baris yang cocok positif tapi tidak cocok negatif
-            filtered_df = combined_df[positive_mask & ~negative_mask]
+        if pushdown:
+            # Filter TT Type sudah diterapkan saat membaca
+            if export_columns:
+                combined_df = combined_df[[col for col in export_columns if col in combined_df.columns]]
+            st.success(f"✅ Filter selesai! Ditemukan {len(combined_df)} baris dengan 'TT Type' sesuai pola filter (default: variasi 'Site Down' tanpa 'Non/Not').")
+        elif 'TT Type' in combined_df.columns:
+            # Regex dijalankan sekali per nilai unik TT Type, hasilnya disebar ke semua baris
+            filtered_df = ttype_classifier.filter(combined_df, 'TT Type')
 
             # ✅ Tampilkan hasil filter
-            st.success(f"✅ Filter selesai! Ditemukan {len(filtered_df)} baris dengan 'TT Type' mengandung variasi 'Site Down' (tanpa 'Non/Not').")
+            st.success(f"✅ Filter selesai! Ditemukan {len(filtered_df)} baris dengan 'TT Type' sesuai pola filter (default: variasi 'Site Down' tanpa 'Non/Not').")
             # st.write(f"✅ Preview Hasil Filter (TT Type = Site Down): {len(filtered_df)} baris")
             # st.write(filtered_df.head(20))  # Preview 20 baris pertama
 
@@ -123,22 +141,21 @@ if uploaded_files:
 
         # --- Ekspor data hasil filter ---
         if output_format == "Excel (.xlsx)":
-            if len(combined_df) <= 1048576:
-                output_buffer = io.BytesIO()
-                combined_df.to_excel(output_buffer, index=False, engine="openpyxl")
-                output_buffer.seek(0)
+            if len(combined_df) < EXCEL_MAX_ROWS:
+                # xlsxwriter menulis ke file sementara, tombol download menerima bytes-nya
+                xlsx_data = spooled_bytes(lambda output: write_xlsx_stream(combined_df, output))
 
                 st.download_button(
                     label="⬇️ Unduh Hasil Gabungan (.xlsx)",
-                    data=output_buffer,
+                    data=xlsx_data,
                     file_name="hasil_gabungan.xlsx",
                     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
                 )
             else:
-                zip_buffer = export_to_excel_zip(combined_df, output_format)
+                zip_data = export_to_excel_zip(combined_df, output_format)
                 st.download_button(
                     label="⬇️ Unduh Hasil Gabungan (ZIP - Excel)",
-                    data=zip_buffer,
+                    data=zip_data,
                     file_name="hasil_gabungan.zip",
                     mime="application/zip"
                 )
@@ -155,6 +172,19 @@ if uploaded_files:
                 mime="text/csv"
             )
 
+        elif output_format == "Parquet (.parquet)":
+            # Parquet tidak punya batas baris, jadi tidak perlu dipecah ke ZIP
+            output_buffer = io.BytesIO()
+            write_parquet(combined_df, output_buffer)
+            output_buffer.seek(0)
+
+            st.download_button(
+                label="⬇️ Unduh Hasil Gabungan (.parquet)",
+                data=output_buffer,
+                file_name="hasil_gabungan.parquet",
+                mime="application/vnd.apache.parquet"
+            )
+
         elif output_format == "SQLite Database (.db)":
             db_data = export_to_sqlite(combined_df)
             if db_data:
@@ -1,6 +1,13 @@
+import os
+import sys
 import streamlit as st
 import pandas as pd
 from io import BytesIO
+from merge_sinks import write_parquet
+
+# Modul bersama (common/) ada di root repo, satu tingkat di atas program/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.file_probe import read_csv_fast
 
 # Ubah batas upload size Streamlit (max 1GB)
 st.set_option('server.maxUploadSize', 1024)
@@ -8,8 +15,8 @@ st.set_option('server.maxUploadSize', 1024)
 st.title("📊 Gabungkan dan Rapihkan Beberapa File Excel / CSV (Ukuran Besar Didukung)")
 
 uploaded_files = st.file_uploader(
-    "Pilih satu atau beberapa file Excel (.xlsx, .xls) atau CSV (.csv)",
-    type=["xlsx", "xls", "csv"],
+    "Pilih satu atau beberapa file Excel (.xlsx, .xls), CSV (.csv) atau Parquet (.parquet)",
+    type=["xlsx", "xls", "csv", "parquet"],
     accept_multiple_files=True
 )
 
@@ -26,21 +33,22 @@ def clean_dataframe(df):
 @st.cache_data(show_spinner=False)
 def read_large_csv(file):
     # Pakai chunksize agar efisien
+    # Encoding & delimiter dideteksi sekali dari sampel file (tanpa retry parsing ulang)
     chunk_list = []
-    try:
-        chunks = pd.read_csv(file, chunksize=100_000, encoding='utf-8')
-        for chunk in chunks:
-            cleaned = clean_dataframe(chunk)
-            chunk_list.append(cleaned)
-    except UnicodeDecodeError:
-        file.seek(0)
-        chunks = pd.read_csv(file, chunksize=100_000, encoding='latin1')
-        for chunk in chunks:
-            cleaned = clean_dataframe(chunk)
-            chunk_list.append(cleaned)
+    chunks = read_csv_fast(file, chunksize=100_000)
+    for chunk in chunks:
+        cleaned = clean_dataframe(chunk)
+        chunk_list.append(cleaned)
     df = pd.concat(chunk_list, ignore_index=True)
     return df
 
+@st.cache_data(show_spinner=False)
+def read_parquet(file):
+    file.seek(0)
+    df = pd.read_parquet(file)
+    df = clean_dataframe(df)
+    return df
+
 @st.cache_data(show_spinner=False)
 def read_large_excel(file):
     # Streamlit uploads file-like object, reset pointer
@@ -59,6 +67,8 @@ if uploaded_files:
             st.write(f"📂 Memproses file: `{file.name}` ({file.size / (1024 * 1024):.2f} MB)")
             if file.name.endswith('.csv'):
                 df = read_large_csv(file)
+            elif file.name.endswith('.parquet'):
+                df = read_parquet(file)
             else:
                 df = read_large_excel(file)
             df['Sumber_File'] = file.name
@@ -83,8 +93,14 @@ if uploaded_files:
         combined_df.to_csv(output_csv, index=False, encoding='utf-8-sig')
         output_csv.seek(0)
 
+        # Export ke Parquet (tipe datetime & mttr tetap terjaga)
+        output_parquet = BytesIO()
+        write_parquet(combined_df, output_parquet)
+        output_parquet.seek(0)
+
         st.download_button("💾 Unduh Excel (.xlsx)", data=output_excel, file_name="data_gabungan.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
         st.download_button("💾 Unduh CSV (.csv)", data=output_csv, file_name="data_gabungan.csv", mime="text/csv")
+        st.download_button("💾 Unduh Parquet (.parquet)", data=output_parquet, file_name="data_gabungan.parquet", mime="application/vnd.apache.parquet")
 
 else:
     st.info("⬆️ Silakan unggah file terlebih dahulu.")
@@ -1,20 +1,24 @@
 import streamlit as st
 import pandas as pd
-import math
 import io
-import zipfile
 import sqlite3
 import tempfile
 import os
+import sys
+from merge_sinks import write_parquet, write_sqlite, export_zip_stream
+
+# Modul bersama (common/) ada di root repo, satu tingkat di atas program/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.file_probe import read_csv_fast
 
 st.set_page_config(page_title="Gabung File Excel/CSV", layout="centered")
 
 st.title("📊 Gabung File Excel / CSV")
-st.markdown("Unggah beberapa file `.xlsx` atau `.csv`, lalu gabungkan dan unduh hasilnya.")
+st.markdown("Unggah beberapa file `.xlsx`, `.csv` atau `.parquet`, lalu gabungkan dan unduh hasilnya.")
 
 # --- Sidebar options ---
 st.sidebar.header("⚙️ Opsi Ekspor")
-output_format = st.sidebar.radio("Format Output", ["Excel (.xlsx)", "CSV (.csv)", "SQLite Database (.db)"])
+output_format = st.sidebar.radio("Format Output", ["Excel (.xlsx)", "CSV (.csv)", "Parquet (.parquet)", "SQLite Database (.db)"])
 
 # --- Fungsi Membaca File ---
 def read_uploaded_files(uploaded_files):
@@ -22,7 +26,9 @@ def read_uploaded_files(uploaded_files):
     for uploaded_file in uploaded_files:
         try:
             if uploaded_file.name.endswith(".csv"):
-                df = pd.read_csv(uploaded_file)
+                df = read_csv_fast(uploaded_file)
+            elif uploaded_file.name.endswith(".parquet"):
+                df = pd.read_parquet(uploaded_file)
             else:
                 df = pd.read_excel(uploaded_file)
             dataframes.append(df)
@@ -33,28 +39,10 @@ def read_uploaded_files(uploaded_files):
 
 # --- Fungsi Ekspor ke ZIP Excel/CSV ---
 def export_to_excel_zip(df, output_format):
-    max_rows = 1048576
-    total_rows = df.shape[0]
-    num_parts = math.ceil(total_rows / max_rows)
-
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, "a", zipfile.ZIP_DEFLATED) as zip_file:
-        for i in range(num_parts):
-            start = i * max_rows
-            end = min(start + max_rows, total_rows)
-            chunk = df.iloc[start:end]
-            part_buffer = io.BytesIO()
-            filename = f"gabungan_part_{i+1}"
-
-            if output_format == "Excel (.xlsx)":
-                chunk.to_excel(part_buffer, index=False, engine='openpyxl')
-                zip_file.writestr(f"{filename}.xlsx", part_buffer.getvalue())
-            else:
-                chunk.to_csv(part_buffer, index=False)
-                zip_file.writestr(f"{filename}.csv", part_buffer.getvalue())
-
-    zip_buffer.seek(0)
-    return zip_buffer
+    # Tiap part ditulis langsung ke entry ZIP (xlsxwriter constant_memory),
+    # ZIP otomatis dipindah ke file sementara jika ukurannya besar; hasilnya bytes
+    file_format = 'xlsx' if output_format == "Excel (.xlsx)" else 'csv'
+    return export_zip_stream(df, file_format)
 
 
 # --- Fungsi Ekspor ke SQLite ---
@@ -86,20 +74,16 @@ def export_to_excel_zip(df, output_format):
 
 #  ---  Fungsi ini untuk langsung menulis ke file SQLite tanpa melalui memory-to-disk dump, untuk menghindari batas query string ---
 def export_to_sqlite(df):
+    # Bulk load bertipe + index (lihat merge_sinks.SqliteSink) ke folder sementara.
+    # st.download_button tetap memuat seluruh isi file ke memori, jadi file langsung
+    # dibaca sebagai bytes lalu folder sementara dihapus (juga di Windows, koneksi
+    # SQLite sudah ditutup write_sqlite) sehingga tidak ada file / handle yang tertinggal.
     try:
-        with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmpfile:
-            tmpfile_path = tmpfile.name
-
-        # Langsung simpan ke SQLite di disk (bukan di memori)
-        conn = sqlite3.connect(tmpfile_path)
-        df.to_sql('data_gabungan', conn, if_exists='replace', index=False)
-        conn.close()
-
-        with open(tmpfile_path, "rb") as f:
-            db_data = f.read()
-
-        os.remove(tmpfile_path)
-        return db_data
+        with tempfile.TemporaryDirectory(prefix="gabung_sqlite_") as tmp_dir:
+            tmpfile_path = os.path.join(tmp_dir, "hasil_gabungan.db")
+            write_sqlite(df, tmpfile_path)
+            with open(tmpfile_path, "rb") as f:
+                return f.read()
 
     except Exception as e:
         st.error(f"Gagal mengekspor ke SQLite: {e}")
@@ -109,7 +93,7 @@ def export_to_sqlite(df):
 
 uploaded_files = st.file_uploader(
     "📁 Unggah File",
-    type=["xlsx", "csv"],
+    type=["xlsx", "csv", "parquet"],
     accept_multiple_files=True
 )
 
@@ -123,15 +107,28 @@ if uploaded_files:
         st.success(f"✅ Gabungan selesai! Total: {len(combined_df)} baris, {combined_df.shape[1]} kolom.")
 
         if output_format in ["Excel (.xlsx)", "CSV (.csv)"]:
-            zip_buffer = export_to_excel_zip(combined_df, output_format)
+            zip_data = export_to_excel_zip(combined_df, output_format)
 
             st.download_button(
                 label="⬇️ Unduh Hasil Gabungan (ZIP)",
-                data=zip_buffer,
+                data=zip_data,
                 file_name="hasil_gabungan.zip",
                 mime="application/zip"
             )
 
+        elif output_format == "Parquet (.parquet)":
+            # Parquet tidak punya batas baris, jadi tidak perlu dipecah ke ZIP
+            output_buffer = io.BytesIO()
+            write_parquet(combined_df, output_buffer)
+            output_buffer.seek(0)
+
+            st.download_button(
+                label="⬇️ Unduh Hasil Gabungan (.parquet)",
+                data=output_buffer,
+                file_name="hasil_gabungan.parquet",
+                mime="application/vnd.apache.parquet"
+            )
+
         elif output_format == "SQLite Database (.db)":
             db_data = export_to_sqlite(combined_df)
             if db_data:
@@ -1,12 +1,19 @@
+import os
+import sys
 import streamlit as st
 import pandas as pd
 from io import BytesIO
+from merge_sinks import write_parquet
+
+# Modul bersama (common/) ada di root repo, satu tingkat di atas program/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.file_probe import read_csv_fast
 
 st.title("📊 Gabungkan dan Rapihkan Beberapa File Excel / CSV by Salachudin Emir")
 
 uploaded_files = st.file_uploader(
-    "Pilih satu atau beberapa file Excel (.xlsx, .xls) atau CSV (.csv)",
-    type=["xlsx", "xls", "csv"],
+    "Pilih satu atau beberapa file Excel (.xlsx, .xls), CSV (.csv) atau Parquet (.parquet)",
+    type=["xlsx", "xls", "csv", "parquet"],
     accept_multiple_files=True
 )
 
@@ -29,11 +36,10 @@ if uploaded_files:
     for file in uploaded_files:
         try:
             if file.name.endswith('.csv'):
-                # Coba beberapa encoding
-                try:
-                    df = pd.read_csv(file, sep=None, engine='python', encoding='utf-8')
-                except UnicodeDecodeError:
-                    df = pd.read_csv(file, sep=None, engine='python', encoding='latin1')
+                # Encoding & delimiter dideteksi dari sampel file, parsing pakai engine C
+                df = read_csv_fast(file)
+            elif file.name.endswith('.parquet'):
+                df = pd.read_parquet(file)
             else:
                 df = pd.read_excel(file)
 
@@ -58,6 +64,11 @@ if uploaded_files:
         combined_df.to_csv(output_csv, index=False, encoding='utf-8-sig')
         output_csv.seek(0)
 
+        # Parquet: tipe datetime & mttr tetap terjaga, ditulis per row group
+        output_parquet = BytesIO()
+        write_parquet(combined_df, output_parquet)
+        output_parquet.seek(0)
+
         st.download_button(
             label="💾 Unduh Gabungan sebagai Excel (.xlsx)",
             data=output_excel,
@@ -71,5 +82,12 @@ if uploaded_files:
             file_name="data_gabungan.csv",
             mime="text/csv"
         )
+
+        st.download_button(
+            label="💾 Unduh Gabungan sebagai Parquet (.parquet)",
+            data=output_parquet,
+            file_name="data_gabungan.parquet",
+            mime="application/vnd.apache.parquet"
+        )
 else:
     st.info("⬆️ Unggah file Excel atau CSV terlebih dahulu untuk mulai.")
@@ -1,9 +1,22 @@
 import pandas as pd
 import os
+import sys
 import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 
+from merge_sinks import SINKS, ParquetSink, open_sinks, iter_parquet_chunks, read_parquet_columns, parquet_sample
+from merge_manifest import load_manifest, save_manifest, plan_sources, remove_piece, piece_name_for
+
+# Modul bersama (common/) ada di root repo, satu tingkat di atas program/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.file_probe import probe_csv, read_csv_fast
+
+CHUNK_SIZE = 100_000
+DEFAULT_FORMATS = ['xlsx', 'csv']
+CACHE_DIR_NAME = '.gabung_cache'
+
 def clean_dataframe(df):
     df.columns = df.columns.str.strip()
     for col in ['dt_id', 'createfaultfirstoccurtime', 'faultrecoverytime']:
@@ -17,14 +30,9 @@ def clean_dataframe(df):
 def read_csv_large(file_path):
     print(f"📥 Membaca CSV besar: {file_path}")
     chunks = []
-    try:
-        for chunk in pd.read_csv(file_path, chunksize=100_000, encoding='utf-8'):
-            chunk = clean_dataframe(chunk)
-            chunks.append(chunk)
-    except UnicodeDecodeError:
-        for chunk in pd.read_csv(file_path, chunksize=100_000, encoding='latin1'):
-            chunk = clean_dataframe(chunk)
-            chunks.append(chunk)
+    for chunk in read_csv_fast(file_path, chunksize=100_000):
+        chunk = clean_dataframe(chunk)
+        chunks.append(chunk)
     df = pd.concat(chunks, ignore_index=True)
     return df
 
@@ -34,44 +42,351 @@ def read_excel(file_path):
     df = clean_dataframe(df)
     return df
 
-def process_files(folder_path):
-    all_data = []
-    files = list(Path(folder_path).glob("*.xlsx")) + list(Path(folder_path).glob("*.xls")) + list(Path(folder_path).glob("*.csv"))
+def read_parquet(file_path):
+    print(f"📥 Membaca Parquet: {file_path}")
+    df = pd.read_parquet(file_path)
+    df = clean_dataframe(df)
+    return df
+
+def read_header(file_path, probe=None):
+    """Baca nama kolom saja (tanpa memuat data)."""
+    if file_path.suffix.lower() == '.csv':
+        columns = read_csv_fast(file_path, probe, nrows=0).columns
+    elif file_path.suffix.lower() == '.parquet':
+        columns = read_parquet_columns(file_path)
+    elif file_path.suffix.lower() == '.xlsx':
+        from openpyxl import load_workbook
+        wb = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            first_row = next(wb.active.iter_rows(max_row=1, values_only=True), ())
+        finally:
+            wb.close()
+        columns = pd.Index(['' if v is None else str(v) for v in first_row])
+    else:
+        columns = pd.read_excel(file_path, nrows=0).columns
+    return [str(c).strip() for c in columns]
+
+def iter_csv_chunks(file_path, probe, chunksize=CHUNK_SIZE):
+    for chunk in read_csv_fast(file_path, probe, chunksize=chunksize):
+        yield clean_dataframe(chunk)
+
+def iter_parquet_file_chunks(file_path, chunksize=CHUNK_SIZE):
+    for chunk in iter_parquet_chunks(file_path, chunksize):
+        yield clean_dataframe(chunk)
+
+def iter_excel_chunks(file_path, chunksize=CHUNK_SIZE):
+    if file_path.suffix.lower() != '.xlsx':
+        # .xls tidak bisa dibaca per baris, baca utuh lalu potong
+        df = clean_dataframe(pd.read_excel(file_path))
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+        return
+
+    from openpyxl import load_workbook
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = ['' if v is None else str(v) for v in header]
+        buffer = []
+        for row in rows:
+            buffer.append(row[:len(columns)])
+            if len(buffer) >= chunksize:
+                yield clean_dataframe(pd.DataFrame(buffer, columns=columns))
+                buffer = []
+        if buffer:
+            yield clean_dataframe(pd.DataFrame(buffer, columns=columns))
+    finally:
+        wb.close()
+
+def iter_file_chunks(file_path, probe=None, chunksize=CHUNK_SIZE):
+    if file_path.suffix.lower() == '.csv':
+        return iter_csv_chunks(file_path, probe or probe_csv(file_path), chunksize)
+    if file_path.suffix.lower() == '.parquet':
+        return iter_parquet_file_chunks(file_path, chunksize)
+    return iter_excel_chunks(file_path, chunksize)
+
+def find_files(folder_path):
+    # Diurutkan supaya urutan hasil gabungan selalu sama di setiap run
+    return sorted(Path(folder_path).glob("*.xlsx")) + sorted(Path(folder_path).glob("*.xls")) + sorted(Path(folder_path).glob("*.csv")) + sorted(Path(folder_path).glob("*.parquet"))
+
+def stream_files(folder_path, formats, chunksize=CHUNK_SIZE):
+    """
+    Mode streaming: setiap chunk yang sudah dibersihkan langsung ditulis ke semua sink
+    (CSV / Parquet / SQLite) lalu dibuang, sehingga memori hanya sebesar satu chunk.
+    File yang gagal dibaca di tengah jalan dibatalkan utuh dari semua output (rollback
+    per file), jadi output tidak pernah berisi sebagian baris dari satu file sumber.
+    """
+    files = find_files(folder_path)
 
     if not files:
         print("⚠️ Tidak ada file Excel atau CSV ditemukan.")
         return
 
+    # Kumpulkan gabungan kolom dari header semua file terlebih dahulu
+    sources = []
+    columns = []
     for f in files:
         try:
-            if f.suffix.lower() == '.csv':
-                df = read_csv_large(f)
-            else:
-                df = read_excel(f)
-            df['Sumber_File'] = f.name
-            all_data.append(df)
-            print(f"✅ Berhasil: {f.name}")
+            probe = probe_csv(f) if f.suffix.lower() == '.csv' else None
+            for col in read_header(f, probe):
+                if col not in columns:
+                    columns.append(col)
+            sources.append((f, probe))
         except Exception as e:
-            print(f"❌ Gagal membaca {f.name}: {e}")
+            print(f"❌ Gagal membaca header {f.name}: {e}")
+
+    if not sources:
+        print("⚠️ Tidak ada data berhasil dibaca.")
+        return
+    columns.append('Sumber_File')
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    sinks = open_sinks(formats, f"data_gabungan_{timestamp}", columns)
+
+    total_rows = 0
+    try:
+        for f, probe in sources:
+            print(f"📥 Streaming: {f}")
+            file_rows = 0
+            for _, sink in sinks:
+                sink.begin_file()
+            try:
+                for chunk in iter_file_chunks(f, probe, chunksize):
+                    chunk = chunk.reindex(columns=columns)
+                    chunk['Sumber_File'] = f.name
+                    for _, sink in sinks:
+                        sink.write(chunk)
+                    file_rows += len(chunk)
+            except Exception as e:
+                for _, sink in sinks:
+                    sink.rollback_file()
+                print(f"❌ Gagal membaca {f.name} setelah {file_rows} baris, semua baris file ini dibatalkan: {e}")
+                continue
+            for _, sink in sinks:
+                sink.commit_file()
+            print(f"✅ Berhasil: {f.name} ({file_rows} baris)")
+            total_rows += file_rows
+    finally:
+        for _, sink in sinks:
+            sink.close()
+
+    paths = '\n'.join(f" - {path}" for path, _ in sinks)
+    print(f"💾 {total_rows} baris disimpan sebagai:\n{paths}")
+
+def build_piece(file_path, piece_path, chunksize=CHUNK_SIZE):
+    """Parse satu file sumber dan simpan hasil bersihnya sebagai piece Parquet di cache."""
+    probe = probe_csv(file_path) if file_path.suffix.lower() == '.csv' else None
+    columns = read_header(file_path, probe)
+    columns = list(dict.fromkeys(columns)) + ['Sumber_File']
+    tmp_path = f"{piece_path}.tmp"
+    rows = 0
+    sink = ParquetSink(tmp_path, columns)
+    try:
+        for chunk in iter_file_chunks(file_path, probe, chunksize):
+            chunk = chunk.loc[:, ~chunk.columns.duplicated()].reindex(columns=columns)
+            chunk['Sumber_File'] = file_path.name
+            sink.write(chunk)
+            rows += len(chunk)
+    finally:
+        sink.close()
+    os.replace(tmp_path, piece_path)
+    return rows
+
+def incremental_merge(folder_path, formats, cache_dir=None, workers=1, chunksize=CHUNK_SIZE):
+    """
+    Mode incremental: hanya file baru/berubah yang di-parse ulang.
+
+    Hasil bersih tiap file disimpan sebagai piece Parquet di cache_dir dan dicatat di
+    manifest (path, ukuran, mtime, hash isi). Output gabungan dibangun ulang dari
+    piece-piece tersebut secara streaming; sumber yang sudah dihapus ikut hilang.
+    """
+    files = find_files(folder_path)
+    cache_dir = Path(cache_dir) if cache_dir else Path(folder_path) / CACHE_DIR_NAME
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    entries = load_manifest(cache_dir)
+    unchanged, changed, removed = plan_sources(files, entries, cache_dir)
+    print(f"🗂️ {len(unchanged)} file tidak berubah, {len(changed)} baru/berubah, {len(removed)} dihapus.")
+
+    for entry in removed.values():
+        remove_piece(cache_dir, entry)
+
+    new_entries = dict(unchanged)
+    jobs = []
+    for f, fingerprint in changed:
+        old_entry = entries.get(str(f.resolve()))
+        if old_entry is not None:
+            remove_piece(cache_dir, old_entry)
+        piece_name = piece_name_for(f, fingerprint)
+        jobs.append((f, fingerprint, piece_name))
+
+    def record(f, fingerprint, piece_name, rows):
+        new_entries[str(f.resolve())] = {**fingerprint, 'cache_file': piece_name, 'rows': rows}
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(build_piece, f, str(cache_dir / piece_name), chunksize): (f, fingerprint, piece_name)
+                for f, fingerprint, piece_name in jobs
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                f, fingerprint, piece_name = futures[future]
+                try:
+                    record(f, fingerprint, piece_name, future.result())
+                    print(f"✅ [{done}/{len(jobs)}] Berhasil: {f.name}")
+                except Exception as e:
+                    print(f"❌ [{done}/{len(jobs)}] Gagal membaca {f.name}: {e}")
+    else:
+        for f, fingerprint, piece_name in jobs:
+            try:
+                print(f"📥 Membaca: {f}")
+                record(f, fingerprint, piece_name, build_piece(f, str(cache_dir / piece_name), chunksize))
+                print(f"✅ Berhasil: {f.name}")
+            except Exception as e:
+                print(f"❌ Gagal membaca {f.name}: {e}")
+
+    save_manifest(cache_dir, new_entries)
+
+    # Urutan piece mengikuti urutan file sumber supaya hasil deterministik
+    pieces = [cache_dir / new_entries[str(f.resolve())]['cache_file'] for f in files if str(f.resolve()) in new_entries]
+    if not pieces:
+        print("⚠️ Tidak ada data berhasil dibaca.")
+        return
+
+    columns = []
+    for piece in pieces:
+        for col in read_parquet_columns(piece):
+            if col != 'Sumber_File' and col not in columns:
+                columns.append(col)
+    columns.append('Sumber_File')
+
+    print("🔗 Membangun ulang output gabungan dari cache...")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Tipe kolom output dari gabungan schema semua piece, bukan hanya chunk pertama
+    sinks = open_sinks(formats, f"data_gabungan_{timestamp}", columns, sample=parquet_sample(pieces, columns))
+    total_rows = 0
+    try:
+        for piece in pieces:
+            for chunk in iter_parquet_chunks(piece, chunksize):
+                chunk = chunk.reindex(columns=columns)
+                for _, sink in sinks:
+                    sink.write(chunk)
+                total_rows += len(chunk)
+    finally:
+        for _, sink in sinks:
+            sink.close()
+
+    paths = '\n'.join(f" - {path}" for path, _ in sinks)
+    print(f"💾 {total_rows} baris disimpan sebagai:\n{paths}")
+
+def load_file(file_path):
+    """Baca dan bersihkan satu file (dipanggil langsung atau di dalam worker process)."""
+    if file_path.suffix.lower() == '.csv':
+        df = read_csv_large(file_path)
+    elif file_path.suffix.lower() == '.parquet':
+        df = read_parquet(file_path)
+    else:
+        df = read_excel(file_path)
+    df['Sumber_File'] = file_path.name
+    return df
+
+def load_files_parallel(files, workers):
+    """
+    Parsing file di process pool. clean_dataframe berjalan di dalam worker,
+    hasil dikembalikan sesuai urutan `files` (bukan urutan selesai).
+    """
+    results = [None] * len(files)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(load_file, f): idx for idx, f in enumerate(files)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            idx = futures[future]
+            f = files[idx]
+            try:
+                results[idx] = future.result()
+                print(f"✅ [{done}/{len(files)}] Berhasil: {f.name}")
+            except Exception as e:
+                print(f"❌ [{done}/{len(files)}] Gagal membaca {f.name}: {e}")
+    return [df for df in results if df is not None]
+
+def write_outputs(combined, formats, base_name, chunksize=CHUNK_SIZE):
+    """Simpan hasil gabungan ke setiap format; Parquet/CSV/SQLite ditulis per potongan."""
+    paths = []
+    if 'xlsx' in formats:
+        output_excel = f"{base_name}.xlsx"
+        combined.to_excel(output_excel, index=False)
+        paths.append(output_excel)
+
+    sinks = open_sinks([fmt for fmt in formats if fmt != 'xlsx'], base_name, combined.columns, sample=combined)
+    try:
+        for start in range(0, len(combined), chunksize):
+            part = combined.iloc[start:start + chunksize]
+            for _, sink in sinks:
+                sink.write(part)
+    finally:
+        for _, sink in sinks:
+            sink.close()
+    paths.extend(path for path, _ in sinks)
+    return paths
+
+def process_files(folder_path, workers=1, formats=DEFAULT_FORMATS):
+    all_data = []
+    files = find_files(folder_path)
+
+    if not files:
+        print("⚠️ Tidak ada file Excel atau CSV ditemukan.")
+        return
+
+    if workers > 1 and len(files) > 1:
+        print(f"⚙️ Memproses {len(files)} file dengan {workers} worker...")
+        all_data = load_files_parallel(files, workers)
+    else:
+        for f in files:
+            try:
+                all_data.append(load_file(f))
+                print(f"✅ Berhasil: {f.name}")
+            except Exception as e:
+                print(f"❌ Gagal membaca {f.name}: {e}")
 
     if all_data:
         combined = pd.concat(all_data, ignore_index=True)
         print("🔗 Menggabungkan semua data...")
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_excel = f"data_gabungan_{timestamp}.xlsx"
-        output_csv = f"data_gabungan_{timestamp}.csv"
+        paths = write_outputs(combined, formats, f"data_gabungan_{timestamp}")
 
-        combined.to_excel(output_excel, index=False)
-        combined.to_csv(output_csv, index=False, encoding='utf-8-sig')
-
-        print(f"💾 Disimpan sebagai:\n - {output_excel}\n - {output_csv}")
+        print("💾 Disimpan sebagai:\n" + '\n'.join(f" - {path}" for path in paths))
     else:
         print("⚠️ Tidak ada data berhasil dibaca.")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Gabungkan file Excel/CSV besar dalam satu folder.")
     parser.add_argument("folder", help="Path folder yang berisi file Excel/CSV")
+    parser.add_argument("--stream", action="store_true",
+                        help="Mode streaming hemat memori: tiap chunk langsung ditulis ke output")
+    parser.add_argument("--format", nargs="+", choices=sorted(SINKS) + ['xlsx'], default=None, dest="formats",
+                        help="Format output (default: xlsx csv; mode streaming: csv). "
+                             "xlsx tidak tersedia di mode streaming")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE,
+                        help=f"Jumlah baris per chunk pada mode streaming (default: {CHUNK_SIZE})")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Mode incremental: hanya file baru/berubah yang di-parse, sisanya dari cache")
+    parser.add_argument("--cache-dir", default=None,
+                        help=f"Folder cache untuk mode incremental (default: <folder>/{CACHE_DIR_NAME})")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Jumlah worker process untuk parsing file secara paralel, "
+                             "mode non-streaming / incremental (default: 1)")
     args = parser.parse_args()
 
-    process_files(args.folder)
+    if args.stream or args.incremental:
+        formats = args.formats or ['csv']
+        if 'xlsx' in formats:
+            parser.error("Format xlsx tidak didukung pada mode --stream / --incremental.")
+        if args.incremental:
+            incremental_merge(args.folder, formats, args.cache_dir, args.workers, args.chunksize)
+        else:
+            stream_files(args.folder, formats, args.chunksize)
+    else:
+        process_files(args.folder, args.workers, args.formats or DEFAULT_FORMATS)
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+
+def hash_file(path, block_size=1024 * 1024):
+    """SHA-256 isi file, dibaca per blok supaya hemat memori."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(cache_dir):
+    """Baca manifest dari cache_dir. Manifest rusak / versi lain dianggap kosong."""
+    manifest_path = Path(cache_dir) / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {}
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('version') != MANIFEST_VERSION:
+        return {}
+    return data.get('files', {})
+
+
+def save_manifest(cache_dir, entries):
+    """Simpan manifest secara atomik (tulis ke file sementara lalu rename)."""
+    manifest_path = Path(cache_dir) / MANIFEST_NAME
+    tmp_path = manifest_path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION, 'files': entries}, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+
+
+def plan_sources(files, entries, cache_dir):
+    """
+    Bandingkan file sumber dengan manifest.
+
+    Kunci tiap sumber: path, ukuran, mtime dan hash isi. Hash hanya dihitung
+    ulang jika ukuran/mtime berubah, jadi file yang tidak disentuh tidak dibaca sama sekali.
+
+    Return (unchanged, changed, removed):
+    - unchanged: dict path -> entry manifest (piece cache masih valid)
+    - changed: list of (file, fingerprint) yang perlu di-parse ulang
+    - removed: dict path -> entry untuk sumber yang sudah dihapus
+    """
+    unchanged = {}
+    changed = []
+    current = set()
+    for f in files:
+        key = str(Path(f).resolve())
+        current.add(key)
+        stat = os.stat(f)
+        entry = entries.get(key)
+        piece_exists = entry is not None and (Path(cache_dir) / entry['cache_file']).exists()
+
+        if piece_exists and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+            unchanged[key] = entry
+            continue
+
+        content_hash = hash_file(f)
+        fingerprint = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'sha256': content_hash}
+        if piece_exists and entry['sha256'] == content_hash:
+            # Hanya mtime yang berubah (misal file di-copy ulang), isi sama
+            unchanged[key] = {**entry, **fingerprint}
+        else:
+            changed.append((f, fingerprint))
+
+    removed = {key: entry for key, entry in entries.items() if key not in current}
+    return unchanged, changed, removed
+
+
+def piece_name_for(path, fingerprint):
+    """Nama piece unik per path + isi (dua file identik di path berbeda tidak berbagi piece)."""
+    path_hash = hashlib.sha256(str(Path(path).resolve()).encode('utf-8')).hexdigest()[:16]
+    return f"{path_hash}_{fingerprint['sha256'][:16]}.parquet"
+
+
+def remove_piece(cache_dir, entry):
+    piece = Path(cache_dir) / entry['cache_file']
+    if piece.exists():
+        piece.unlink()
@@ -0,0 +1,554 @@
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import zipfile
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow opsional, hanya dibutuhkan untuk output Parquet
+    pa = None
+    pq = None
+
+DATETIME_COLUMNS = ['dt_id', 'createfaultfirstoccurtime', 'faultrecoverytime']
+NUMERIC_COLUMNS = ['mttr']
+ROW_GROUP_SIZE = 100_000
+# Batas baris Excel termasuk 1 baris header
+EXCEL_MAX_ROWS = 1_048_576
+# Buffer output di RAM sampai ukuran ini, setelah itu otomatis pindah ke file sementara
+SPILL_THRESHOLD = 256 * 1024 * 1024
+
+
+class CsvSink:
+    """
+    Tulis chunk DataFrame ke satu file CSV secara bertahap (header hanya sekali).
+
+    begin_file / commit_file / rollback_file (sama di semua sink): chunk satu file sumber
+    yang gagal di tengah jalan dibuang lagi dari output, di sini dengan memotong file CSV
+    kembali ke posisi sebelum file sumber itu. `sample` tidak dipakai (CSV tidak bertipe).
+    """
+
+    def __init__(self, path, columns, sample=None):
+        self.path = path
+        self.columns = list(columns)
+        # utf-8-sig: BOM hanya ditulis sekali di awal file oleh codec
+        self._file = open(path, 'w', encoding='utf-8-sig', newline='')
+        self._header_written = False
+        self._mark = None
+
+    def write(self, df):
+        df.to_csv(self._file, index=False, header=not self._header_written, columns=self.columns)
+        self._header_written = True
+
+    def begin_file(self):
+        self._file.flush()
+        self._mark = (self._file.tell(), self._header_written)
+
+    def commit_file(self):
+        self._mark = None
+
+    def rollback_file(self):
+        position, self._header_written = self._mark
+        self._file.seek(position)
+        self._file.truncate()
+        self._mark = None
+
+    def close(self):
+        if not self._header_written:
+            pd.DataFrame(columns=self.columns).to_csv(self._file, index=False)
+        self._file.close()
+
+
+class ParquetSink:
+    """
+    Tulis chunk DataFrame ke file Parquet, satu row group per chunk.
+
+    Schema ditetapkan dari chunk pertama lalu dipakai semua chunk (lihat build_arrow_schema):
+    - kolom tanggal (DATETIME_COLUMNS) -> timestamp
+    - kolom numerik (NUMERIC_COLUMNS) -> float64
+    - kolom lain mengikuti dtype `sample` bila diberikan, jika tidak dtype chunk pertama
+      (bool / int64 / float64 / timestamp, selain itu string)
+    Chunk berikutnya yang nilainya tidak muat (misal teks di kolom int64) melebarkan tipe
+    kolom itu (int -> float -> string, lihat widen_schema); row group yang sudah ditulis
+    ditulis ulang sekali dengan schema baru, jadi tidak ada baris yang dibuang.
+
+    `path` boleh berupa path file atau file-like object (misal BytesIO untuk download).
+    Di antara begin_file dan commit_file chunk ditulis ke file Parquet sementara dulu;
+    commit_file menyalin row group-nya ke output, rollback_file membuangnya.
+    """
+
+    def __init__(self, path, columns, sample=None):
+        if pa is None:
+            raise ImportError("Output Parquet membutuhkan paket 'pyarrow' (pip install pyarrow).")
+        self.path = path
+        self.columns = list(columns)
+        self.schema = build_arrow_schema(self.columns, sample) if sample is not None else None
+        self._file = None
+        self._file_start = 0
+        self._writer = None
+        self._in_file = False
+        self._staging = None
+
+    def _output_writer(self):
+        if self._writer is None:
+            # File dibuka sendiri (bukan lewat path) supaya bisa ditulis ulang saat schema melebar
+            self._file = open(self.path, 'w+b') if isinstance(self.path, (str, bytes, os.PathLike)) else self.path
+            self._file_start = self._file.tell()
+            self._writer = pq.ParquetWriter(self._file, self.schema, compression='snappy')
+        return self._writer
+
+    def _widen(self, df):
+        schema = widen_schema(self.schema, df)
+        if self._writer is not None:
+            self._writer = rewrite_parquet(self._file, self._file_start, self._writer, schema)
+        if self._staging is not None:
+            staging_file, staging_writer = self._staging
+            self._staging = (staging_file, rewrite_parquet(staging_file, 0, staging_writer, schema))
+        self.schema = schema
+
+    def write(self, df):
+        if self.schema is None:
+            self.schema = build_arrow_schema(self.columns, df)
+        try:
+            table = to_arrow_table(df, self.schema)
+        except ValueError:
+            self._widen(df)
+            table = to_arrow_table(df, self.schema)
+        if not self._in_file:
+            self._output_writer().write_table(table)
+            return
+        if self._staging is None:
+            staging_file = tempfile.TemporaryFile()
+            self._staging = (staging_file, pq.ParquetWriter(staging_file, self.schema, compression='snappy'))
+        self._staging[1].write_table(table)
+
+    def begin_file(self):
+        self._in_file = True
+
+    def commit_file(self):
+        self._in_file = False
+        if self._staging is None:
+            return
+        staging_file, staging_writer = self._staging
+        self._staging = None
+        try:
+            staging_writer.close()
+            staging_file.seek(0)
+            staged = pq.ParquetFile(staging_file)
+            for i in range(staged.num_row_groups):
+                self._output_writer().write_table(staged.read_row_group(i).cast(self.schema))
+        finally:
+            staging_file.close()
+
+    def rollback_file(self):
+        self._in_file = False
+        if self._staging is not None:
+            staging_file, staging_writer = self._staging
+            self._staging = None
+            staging_writer.close()
+            staging_file.close()
+        if self._writer is None:
+            # Belum ada data yang masuk output: schema ditebak ulang dari file sumber berikutnya
+            self.schema = None
+
+    def close(self):
+        if self._staging is not None:
+            self.rollback_file()
+        if self.schema is None:
+            self.schema = build_arrow_schema(self.columns)
+        self._output_writer().close()
+        if self._file is not self.path:
+            self._file.close()
+
+
+class SqliteSink:
+    """
+    Bulk load chunk DataFrame ke tabel SQLite.
+
+    - Schema bertipe: kolom tanggal sebagai TEXT ISO-8601, mttr sebagai REAL,
+      kolom lain mengikuti dtype `sample` bila diberikan, jika tidak dtype chunk pertama
+      (INTEGER / REAL / TEXT).
+    - Semua chunk dimasukkan dengan executemany di dalam satu transaksi,
+      dengan PRAGMA synchronous dimatikan dan journal di memori selama load.
+      Journal tetap dibutuhkan untuk SAVEPOINT per file sumber (rollback_file).
+    - Index (INDEX_COLUMNS yang tersedia) dibuat setelah semua data masuk.
+    """
+
+    INDEX_COLUMNS = ['TT Type', 'circle', 'severity', 'rca', 'createfaultfirstoccurtime']
+
+    def __init__(self, path, columns, table_name='data_gabungan', batch_size=10_000, sample=None):
+        self.path = path
+        self.columns = list(columns)
+        self.table_name = table_name
+        self.batch_size = batch_size
+        self.sample = sample
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=MEMORY')
+        self._conn.execute('PRAGMA synchronous=OFF')
+        self._conn.execute('PRAGMA temp_store=MEMORY')
+        self._conn.execute('PRAGMA cache_size=-200000')
+        self._insert_sql = None
+        self._conn.execute('BEGIN')
+
+    def _create_table(self, df):
+        col_defs = ', '.join(
+            f"{quote_identifier(col)} {sqlite_type(col, df[col] if col in df.columns else None)}"
+            for col in self.columns
+        )
+        self._conn.execute(f"DROP TABLE IF EXISTS {quote_identifier(self.table_name)}")
+        self._conn.execute(f"CREATE TABLE {quote_identifier(self.table_name)} ({col_defs})")
+        placeholders = ', '.join('?' for _ in self.columns)
+        self._insert_sql = f"INSERT INTO {quote_identifier(self.table_name)} VALUES ({placeholders})"
+
+    def write(self, df):
+        if self._insert_sql is None:
+            self._create_table(self.sample if self.sample is not None else df)
+        df = df.reindex(columns=self.columns)
+        for start in range(0, len(df), self.batch_size):
+            rows = to_sqlite_rows(df.iloc[start:start + self.batch_size])
+            self._conn.executemany(self._insert_sql, rows)
+
+    def begin_file(self):
+        self._table_existed = self._insert_sql is not None
+        self._conn.execute('SAVEPOINT source_file')
+
+    def commit_file(self):
+        self._conn.execute('RELEASE source_file')
+
+    def rollback_file(self):
+        self._conn.execute('ROLLBACK TO source_file')
+        self._conn.execute('RELEASE source_file')
+        if not self._table_existed:
+            # CREATE TABLE ikut dibatalkan: tabel dibuat ulang dari chunk file berikutnya
+            self._insert_sql = None
+
+    def close(self):
+        try:
+            if self._insert_sql is None:
+                self._create_table(pd.DataFrame(columns=self.columns))
+            for col in self.INDEX_COLUMNS:
+                if col in self.columns:
+                    index_name = quote_identifier(f"idx_{self.table_name}_{col}".replace(' ', '_'))
+                    self._conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS {index_name} "
+                        f"ON {quote_identifier(self.table_name)} ({quote_identifier(col)})"
+                    )
+            self._conn.execute('COMMIT')
+        finally:
+            self._conn.close()
+
+
+SINKS = {
+    'csv': (CsvSink, '.csv'),
+    'parquet': (ParquetSink, '.parquet'),
+    'sqlite': (SqliteSink, '.db'),
+}
+
+
+def open_sinks(formats, base_name, columns, sample=None):
+    """Buka satu sink per format. `sample`: DataFrame acuan tipe kolom (opsional). Return list of (path, sink)."""
+    opened = []
+    try:
+        for fmt in formats:
+            sink_cls, ext = SINKS[fmt]
+            path = f"{base_name}{ext}"
+            opened.append((path, sink_cls(path, columns, sample=sample)))
+    except Exception:
+        for _, sink in opened:
+            sink.close()
+        raise
+    return opened
+
+
+def write_parquet(df, target, row_group_size=ROW_GROUP_SIZE):
+    """Tulis DataFrame utuh ke Parquet secara bertahap, satu row group per potongan."""
+    sink = ParquetSink(target, df.columns, sample=df)
+    try:
+        for start in range(0, len(df), row_group_size):
+            sink.write(df.iloc[start:start + row_group_size])
+    finally:
+        sink.close()
+
+
+def write_sqlite(df, path, table_name='data_gabungan', chunksize=ROW_GROUP_SIZE):
+    """Tulis DataFrame utuh ke file SQLite lewat SqliteSink (bulk load + index)."""
+    sink = SqliteSink(path, df.columns, table_name, sample=df)
+    try:
+        for start in range(0, len(df), chunksize):
+            sink.write(df.iloc[start:start + chunksize])
+    finally:
+        sink.close()
+    return path
+
+
+def quote_identifier(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def sqlite_type(col, series=None):
+    if col in DATETIME_COLUMNS:
+        return 'TEXT'
+    if col in NUMERIC_COLUMNS:
+        return 'REAL'
+    if series is None:
+        return 'TEXT'
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(series):
+        return 'REAL'
+    return 'TEXT'
+
+
+def to_sqlite_rows(df):
+    """Konversi chunk ke list of tuple: datetime -> teks ISO, NaN/NaT -> NULL."""
+    columns = []
+    for col in df.columns:
+        series = df[col]
+        if col in DATETIME_COLUMNS and not pd.api.types.is_datetime64_any_dtype(series):
+            series = pd.to_datetime(series, errors='coerce')
+        if pd.api.types.is_datetime64_any_dtype(series):
+            series = series.dt.strftime('%Y-%m-%d %H:%M:%S')
+        elif col in NUMERIC_COLUMNS:
+            series = pd.to_numeric(series, errors='coerce')
+        mask = series.isna()
+        values = series.astype(object).tolist()
+        if mask.any():
+            for idx in mask.to_numpy().nonzero()[0]:
+                values[idx] = None
+        columns.append(values)
+    return list(zip(*columns))
+
+
+def write_xlsx_stream(df, target, sheet_name='Sheet1', block_size=ROW_GROUP_SIZE):
+    """
+    Tulis DataFrame ke xlsx dengan xlsxwriter mode constant_memory.
+
+    Baris ditulis per blok dan langsung di-flush ke disk, jadi tidak ada salinan
+    workbook openpyxl di memori. `target` boleh path atau stream (misal entry ZIP).
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(target, {
+        'constant_memory': True,
+        'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+        'remove_timezone': True,
+        'nan_inf_to_errors': True,
+    })
+    try:
+        worksheet = workbook.add_worksheet(sheet_name)
+        worksheet.write_row(0, 0, [str(col) for col in df.columns])
+        row_idx = 1
+        for start in range(0, len(df), block_size):
+            block = df.iloc[start:start + block_size].astype(object)
+            block = block.where(block.notna(), None)
+            for values in block.itertuples(index=False, name=None):
+                worksheet.write_row(row_idx, 0, values)
+                row_idx += 1
+    finally:
+        workbook.close()
+
+
+def spooled_bytes(write, spill_threshold=SPILL_THRESHOLD):
+    """
+    Jalankan write(file) ke SpooledTemporaryFile (pindah ke disk setelah `spill_threshold`)
+    lalu return isinya sebagai bytes; file sementara langsung ditutup & dihapus.
+    st.download_button hanya menerima str / bytes / BytesIO / file biner biasa,
+    bukan SpooledTemporaryFile, dan tetap membaca seluruh isinya ke memori.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=spill_threshold) as output:
+        write(output)
+        output.seek(0)
+        return output.read()
+
+
+def export_zip_stream(df, file_format, part_name='gabungan_part', max_rows=EXCEL_MAX_ROWS - 1,
+                      spill_threshold=SPILL_THRESHOLD):
+    """
+    Pecah DataFrame per `max_rows` baris dan tulis tiap part langsung ke entry ZIP.
+
+    file_format: 'xlsx' atau 'csv'. Tidak ada BytesIO per part; ZIP ditulis lewat
+    spooled_bytes (pindah ke disk setelah melewati `spill_threshold`).
+    Return isi ZIP sebagai bytes, siap untuk st.download_button.
+    """
+    return spooled_bytes(lambda output: _write_zip_parts(df, file_format, part_name, max_rows, output),
+                         spill_threshold)
+
+
+def _write_zip_parts(df, file_format, part_name, max_rows, output):
+    total_rows = len(df)
+    num_parts = max(1, -(-total_rows // max_rows))
+
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for i in range(num_parts):
+            chunk = df.iloc[i * max_rows:(i + 1) * max_rows]
+            entry_name = f"{part_name}_{i + 1}.{file_format}"
+            with zip_file.open(entry_name, 'w', force_zip64=True) as entry:
+                if file_format == 'xlsx':
+                    write_xlsx_stream(chunk, entry)
+                else:
+                    with io.TextIOWrapper(entry, encoding='utf-8', newline='') as text_entry:
+                        for start in range(0, len(chunk), ROW_GROUP_SIZE):
+                            chunk.iloc[start:start + ROW_GROUP_SIZE].to_csv(
+                                text_entry, index=False, header=start == 0
+                            )
+
+
+def iter_parquet_chunks(path, chunksize=ROW_GROUP_SIZE):
+    """Baca file Parquet per batch tanpa memuat seluruh isi file."""
+    if pq is None:
+        raise ImportError("Input Parquet membutuhkan paket 'pyarrow' (pip install pyarrow).")
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=chunksize):
+        yield batch.to_pandas()
+
+
+def read_parquet_columns(path):
+    if pq is None:
+        raise ImportError("Input Parquet membutuhkan paket 'pyarrow' (pip install pyarrow).")
+    return list(pq.read_schema(path).names)
+
+
+def arrow_type(col, series=None):
+    """
+    Tipe kolom Parquet, aturannya sama dengan sqlite_type: tanggal & mttr tetap,
+    kolom lain dari dtype series. Kolom tanpa sampel atau berisi kosong semua -> string.
+    """
+    if col in DATETIME_COLUMNS:
+        return pa.timestamp('ns')
+    if col in NUMERIC_COLUMNS:
+        return pa.float64()
+    if series is None or (len(series) and series.isna().all()):
+        return pa.string()
+    if pd.api.types.is_bool_dtype(series):
+        return pa.bool_()
+    if pd.api.types.is_integer_dtype(series):
+        return pa.int64()
+    if pd.api.types.is_float_dtype(series):
+        return pa.float64()
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return pa.timestamp('ns')
+    return pa.string()
+
+
+def build_arrow_schema(columns, sample=None):
+    """Schema Parquet untuk `columns`; tipe kolom biasa ditebak dari DataFrame `sample` (chunk pertama)."""
+    fields = []
+    for col in columns:
+        series = sample[col] if sample is not None and col in sample.columns else None
+        if isinstance(series, pd.DataFrame):
+            # Nama kolom dobel: pakai kolom pertama
+            series = series.iloc[:, 0]
+        fields.append(pa.field(col, arrow_type(col, series)))
+    return pa.schema(fields)
+
+
+def parquet_sample(paths, columns):
+    """
+    DataFrame kosong dengan tipe gabungan kolom beberapa file Parquet (untuk `sample` sink):
+    tipe sama dipakai apa adanya, campuran int & float jadi float64, selain itu string.
+    """
+    types = {}
+    for path in paths:
+        for field in pq.read_schema(path):
+            types.setdefault(field.name, set()).add(field.type)
+    fields = []
+    for col in columns:
+        found = types.get(col, set())
+        if len(found) == 1:
+            field_type = next(iter(found))
+        elif found and all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in found):
+            field_type = pa.float64()
+        else:
+            field_type = pa.string()
+        fields.append(pa.field(col, field_type))
+    return pa.schema(fields).empty_table().to_pandas()
+
+
+def _cast_column(series, field, dtype):
+    """astype yang gagal dengan pesan jelas: nilai yang tidak cocok tidak pernah diganti null diam-diam."""
+    try:
+        return series.astype(dtype)
+    except (TypeError, ValueError) as e:
+        raise ValueError(
+            f"Kolom '{field.name}' berisi nilai yang tidak cocok dengan tipe Parquet {field.type}: {e}"
+        ) from e
+
+
+def _column(df, name):
+    if name in df.columns:
+        return df[name]
+    return pd.Series([None] * len(df), index=df.index, dtype='object')
+
+
+def to_arrow_array(series, field):
+    """Konversi satu kolom ke pyarrow.Array bertipe field.type (ValueError bila nilainya tidak muat)."""
+    if pa.types.is_timestamp(field.type):
+        series = pd.to_datetime(series, errors='coerce')
+        if getattr(series.dt, 'tz', None) is not None:
+            series = series.dt.tz_localize(None)
+        series = series.astype('datetime64[ns]')
+    elif field.name in NUMERIC_COLUMNS:
+        series = pd.to_numeric(series, errors='coerce').astype('float64')
+    elif pa.types.is_floating(field.type):
+        series = _cast_column(series, field, 'float64')
+    elif pa.types.is_integer(field.type):
+        series = _cast_column(series, field, 'Int64')
+    elif pa.types.is_boolean(field.type):
+        series = _cast_column(series, field, 'boolean')
+    else:
+        series = series.astype('string')
+    return pa.Array.from_pandas(series, type=field.type)
+
+
+def to_arrow_table(df, schema):
+    """Konversi DataFrame ke pyarrow.Table sesuai schema (kolom yang hilang diisi null)."""
+    arrays = [to_arrow_array(_column(df, field.name), field) for field in schema]
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def widen_schema(schema, df):
+    """
+    Schema baru yang muat untuk chunk `df`: kolom yang nilainya tidak cocok dilebarkan
+    bool / int -> float64 -> string (string selalu muat). Kolom lain tidak berubah.
+    """
+    fields = []
+    for field in schema:
+        series = _column(df, field.name)
+        candidates = [field.type]
+        if pa.types.is_boolean(field.type) or pa.types.is_integer(field.type):
+            candidates.append(pa.float64())
+        if not pa.types.is_timestamp(field.type):
+            candidates.append(pa.string())
+        for field_type in candidates:
+            try:
+                to_arrow_array(series, pa.field(field.name, field_type))
+            except ValueError:
+                continue
+            break
+        fields.append(pa.field(field.name, field_type))
+    return pa.schema(fields)
+
+
+def rewrite_parquet(file, start, writer, schema):
+    """
+    Tutup `writer`, lalu tulis ulang isi Parquet di `file` (mulai posisi `start`) dengan
+    `schema` yang lebih lebar. Return ParquetWriter baru yang melanjutkan ke file yang sama.
+    Row group lama dikonversi lewat to_arrow_table (bukan cast arrow) supaya teksnya sama
+    dengan chunk baru, misal True -> 'True' dan 2.0 -> '2.0'.
+    """
+    writer.close()
+    with tempfile.TemporaryFile() as old:
+        file.seek(start)
+        shutil.copyfileobj(file, old)
+        old.seek(0)
+        file.seek(start)
+        file.truncate()
+        writer = pq.ParquetWriter(file, schema, compression='snappy')
+        written = pq.ParquetFile(old)
+        for i in range(written.num_row_groups):
+            writer.write_table(to_arrow_table(written.read_row_group(i).to_pandas(integer_object_nulls=True), schema))
+    return writer
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from gabung_excel_cli import incremental_merge
+
+
+def _write_csv(path, values):
+    path.write_text('no,val\n' + ''.join(f"{i},{val}\n" for i, val in enumerate(values)))
+
+
+def _output(tmp_path, ext):
+    (path,) = tmp_path.glob(f"data_gabungan_*.{ext}")
+    return path
+
+
+def test_csv_output_keeps_file_with_mixed_chunk_types(tmp_path, monkeypatch):
+    source = tmp_path / 'src'
+    source.mkdir()
+    values = [str(i) for i in range(10)] + [f"x{i}" for i in range(10)]
+    _write_csv(source / 'a.csv', values)
+    monkeypatch.chdir(tmp_path)
+
+    incremental_merge(str(source), ['csv'], chunksize=5)
+
+    df = pd.read_csv(_output(tmp_path, 'csv'), dtype={'val': str})
+    assert df['val'].tolist() == values
+    assert df['Sumber_File'].unique().tolist() == ['a.csv']
+
+
+def test_pieces_with_different_types_merge_to_text(tmp_path, monkeypatch):
+    source = tmp_path / 'src'
+    source.mkdir()
+    _write_csv(source / 'a.csv', ['1', '2', '3'])
+    _write_csv(source / 'b.csv', ['4', 'x', '6'])
+    monkeypatch.chdir(tmp_path)
+
+    incremental_merge(str(source), ['parquet'], chunksize=2)
+
+    df = pd.read_parquet(_output(tmp_path, 'parquet'))
+    assert df['val'].tolist() == ['1', '2', '3', '4', 'x', '6']
+    assert df['Sumber_File'].tolist() == ['a.csv'] * 3 + ['b.csv'] * 3
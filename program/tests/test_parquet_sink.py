@@ -0,0 +1,95 @@
+import io
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from gabung_excel_cli import stream_files
+from merge_sinks import ParquetSink
+
+
+def _chunk(values, source='a.csv'):
+    return pd.DataFrame({'id': range(len(values)), 'val': values, 'Sumber_File': source})
+
+
+def _write_file(sink, chunks, fail=False):
+    sink.begin_file()
+    for chunk in chunks:
+        sink.write(chunk)
+    if fail:
+        sink.rollback_file()
+    else:
+        sink.commit_file()
+
+
+def test_text_after_int_chunk_widens_to_string(tmp_path):
+    path = tmp_path / 'out.parquet'
+    sink = ParquetSink(str(path), ['id', 'val', 'Sumber_File'])
+    _write_file(sink, [_chunk([0, 1, 2]), _chunk(['x0', 'x1'])])
+    sink.close()
+
+    table = pq.read_table(path)
+    assert str(table.schema.field('val').type) == 'string'
+    assert table.column('val').to_pylist() == ['0', '1', '2', 'x0', 'x1']
+
+
+def test_float_after_int_chunk_widens_to_float(tmp_path):
+    path = tmp_path / 'out.parquet'
+    sink = ParquetSink(str(path), ['id', 'val', 'Sumber_File'])
+    sink.write(_chunk([1, 2]))
+    sink.write(_chunk([2.5, None]))
+    sink.close()
+
+    table = pq.read_table(path)
+    assert str(table.schema.field('val').type) == 'double'
+    assert table.column('val').to_pylist() == [1.0, 2.0, 2.5, None]
+
+
+def test_widening_rewrites_rows_of_committed_files(tmp_path):
+    path = tmp_path / 'out.parquet'
+    sink = ParquetSink(str(path), ['id', 'val', 'Sumber_File'])
+    _write_file(sink, [_chunk([1, 2], 'a.csv')])
+    _write_file(sink, [_chunk([3], 'b.csv'), _chunk(['x'], 'b.csv')])
+    # File yang gagal tetap dibatalkan utuh, schema yang sudah melebar tetap dipakai
+    _write_file(sink, [_chunk([4.5], 'c.csv')], fail=True)
+    sink.close()
+
+    df = pd.read_parquet(path)
+    assert df['val'].tolist() == ['1', '2', '3', 'x']
+    assert df['Sumber_File'].tolist() == ['a.csv', 'a.csv', 'b.csv', 'b.csv']
+
+
+def test_widening_with_file_like_target():
+    buffer = io.BytesIO()
+    sink = ParquetSink(buffer, ['id', 'val', 'Sumber_File'])
+    sink.write(_chunk([True, False]))
+    sink.write(_chunk(['ya']))
+    sink.close()
+
+    buffer.seek(0)
+    assert pd.read_parquet(buffer)['val'].tolist() == ['True', 'False', 'ya']
+
+
+def test_stream_keeps_file_with_mixed_chunk_types(tmp_path, monkeypatch):
+    source = tmp_path / 'src'
+    source.mkdir()
+    rows = [str(i) for i in range(10)] + [f"x{i}" for i in range(10)]
+    (source / 'a.csv').write_text('no,val\n' + ''.join(f"{i},{val}\n" for i, val in enumerate(rows)))
+    monkeypatch.chdir(tmp_path)
+
+    stream_files(str(source), ['parquet', 'csv'], chunksize=5)
+
+    parquet = pd.read_parquet(next(tmp_path.glob('data_gabungan_*.parquet')))
+    csv = pd.read_csv(next(tmp_path.glob('data_gabungan_*.csv')), dtype={'val': str})
+    assert parquet['val'].tolist() == rows
+    assert csv['val'].tolist() == rows
+
+
+def test_widening_keeps_integer_text_for_nullable_ints(tmp_path):
+    path = tmp_path / 'out.parquet'
+    sample = pd.DataFrame({'val': pd.array([1, None], dtype='Int64')})
+    sink = ParquetSink(str(path), ['val'], sample=sample)
+    sink.write(sample)
+    sink.write(pd.DataFrame({'val': ['x']}))
+    sink.close()
+
+    assert pq.read_table(path).column('val').to_pylist() == ['1', None, 'x']
@@ -0,0 +1,168 @@
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Modul bersama (common/) ada di root repo, satu tingkat di atas program/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.file_probe import probe_csv, read_csv_fast
+
+PATTERNS_PATH = Path(__file__).with_name('ttype_patterns.json')
+
+# Pola bawaan: ambil variasi 'Site Down', buang 'Non/Not Site Down'
+DEFAULT_INCLUDE = [r'\bsite[\s\-_]?down\b']
+DEFAULT_EXCLUDE = [r'\b(non|not)[\s\-_]?site[\s\-_]?down\b']
+
+
+def load_patterns(path=PATTERNS_PATH):
+    """
+    Baca pola include/exclude dari file JSON: {"include": [...], "exclude": [...]}.
+    Jika file tidak ada, pakai pola bawaan.
+    """
+    path = Path(path)
+    if not path.exists():
+        return list(DEFAULT_INCLUDE), list(DEFAULT_EXCLUDE)
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return list(data.get('include', [])), list(data.get('exclude', []))
+
+
+def _compile(patterns):
+    patterns = [p for p in patterns if p and p.strip()]
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE)
+
+
+class TTTypeClassifier:
+    """
+    Klasifikasi nilai TT Type: cocok jika mengandung salah satu pola include
+    dan tidak mengandung pola exclude mana pun.
+
+    Regex hanya dijalankan sekali per nilai unik (hasilnya di-memo), lalu
+    disebar ke semua baris lewat kode factorize / categorical.
+    """
+
+    def __init__(self, include_patterns=None, exclude_patterns=None):
+        if include_patterns is None and exclude_patterns is None:
+            include_patterns, exclude_patterns = load_patterns()
+        self.include_patterns = list(include_patterns or [])
+        self.exclude_patterns = list(exclude_patterns or [])
+        self._include = _compile(self.include_patterns)
+        self._exclude = _compile(self.exclude_patterns)
+        self._cache = {}
+
+    def matches(self, value):
+        """Cek satu nilai TT Type (dengan memo)."""
+        result = self._cache.get(value)
+        if result is None:
+            text = str(value)
+            included = self._include is not None and self._include.search(text) is not None
+            excluded = self._exclude is not None and self._exclude.search(text) is not None
+            result = included and not excluded
+            self._cache[value] = result
+        return result
+
+    def mask(self, series):
+        """Boolean Series sejajar dengan `series`; nilai kosong (NaN) selalu False."""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            uniques = series.cat.categories
+        else:
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+
+        hits = np.fromiter((self.matches(u) for u in uniques), dtype=bool, count=len(uniques))
+        result = np.zeros(len(series), dtype=bool)
+        valid = codes >= 0
+        result[valid] = hits[codes[valid]]
+        return pd.Series(result, index=series.index)
+
+    def filter(self, df, column='TT Type'):
+        return df[self.mask(df[column])]
+
+
+def read_columns(uploaded_file):
+    """Baca nama kolom file (CSV / Excel / Parquet) tanpa memuat datanya."""
+    name = uploaded_file.name.lower()
+    uploaded_file.seek(0)
+    try:
+        if name.endswith('.csv'):
+            return list(read_csv_fast(uploaded_file, nrows=0).columns)
+        if name.endswith('.parquet'):
+            import pyarrow.parquet as pq
+            return list(pq.read_schema(uploaded_file).names)
+        from openpyxl import load_workbook
+        wb = load_workbook(uploaded_file, read_only=True, data_only=True)
+        try:
+            header = next(wb.active.iter_rows(max_row=1, values_only=True), ())
+        finally:
+            wb.close()
+        return [v for v in header if v is not None]
+    finally:
+        uploaded_file.seek(0)
+
+
+def _iter_excel_chunks(uploaded_file, columns, chunksize):
+    from openpyxl import load_workbook
+    wb = load_workbook(uploaded_file, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        positions = [i for i, col in enumerate(header) if col is not None and (columns is None or col in columns)]
+        names = [header[i] for i in positions]
+        buffer = []
+        for row in rows:
+            buffer.append(tuple(row[i] if i < len(row) else None for i in positions))
+            if len(buffer) >= chunksize:
+                yield pd.DataFrame(buffer, columns=names)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=names)
+    finally:
+        wb.close()
+
+
+def iter_file_chunks(uploaded_file, columns=None, chunksize=100_000):
+    """Baca file per chunk, hanya kolom `columns` (None = semua kolom)."""
+    name = uploaded_file.name.lower()
+    uploaded_file.seek(0)
+    if name.endswith('.csv'):
+        usecols = (lambda col: col in columns) if columns is not None else None
+        probe = probe_csv(uploaded_file)
+        yield from read_csv_fast(uploaded_file, probe, usecols=usecols, chunksize=chunksize)
+    elif name.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(uploaded_file)
+        if columns is not None:
+            columns = [col for col in parquet_file.schema_arrow.names if col in columns]
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from _iter_excel_chunks(uploaded_file, columns, chunksize)
+
+
+def read_filtered(uploaded_file, classifier, columns=None, ttype_column='TT Type', chunksize=100_000):
+    """
+    Baca satu file dengan filter TT Type diterapkan per chunk (predicate pushdown).
+
+    Baris yang tidak lolos filter langsung dibuang sebelum chunk berikutnya dibaca,
+    jadi memori hanya sebesar hasil filter + satu chunk. Jika `columns` diisi, hanya
+    kolom tersebut (ditambah kolom TT Type) yang dibaca.
+    Return DataFrame hasil filter, atau None jika file tidak punya kolom TT Type.
+    """
+    if columns is not None:
+        columns = set(columns) | {ttype_column}
+    parts = []
+    for chunk in iter_file_chunks(uploaded_file, columns, chunksize):
+        if ttype_column not in chunk.columns:
+            return None
+        parts.append(classifier.filter(chunk, ttype_column))
+    if not parts:
+        return pd.DataFrame(columns=sorted(columns) if columns else [])
+    return pd.concat(parts, ignore_index=True)
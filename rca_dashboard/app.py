@@ -1,8 +1,14 @@
 import streamlit as st
 import pandas as pd
-from utils.preprocessing import load_and_clean_data, fill_sub_root_cause
+from utils.preprocessing import load_and_clean_data
+from common.cache import load_cached, session_cached, file_content_hash
+from common.filter_index import FilterIndex
+from common.schema import drop_unused_categories
+from utils.pipeline import prepare_frame, compute_aggregates
+from common.cube import build_cube, slice_cube
 from utils.modeling import show_model_results
 from utils.exporter import generate_excel_output
+from common.diagnostics import StageRecorder, show_diagnostics, stage, timed
 from visualization.trend import show_trend
 from visualization.distribution import show_distribution
 from visualization.mttr import show_mttr_per_rca, show_mttr_per_severity, show_mttr_per_circle
@@ -14,6 +20,9 @@ from visualization.yoy import show_yoy
 st.set_page_config(page_title="RCA Dashboard", layout="wide")
 st.title("📊 Dashboard Root Cause Analysis (RCA) by Salachudin Emir")
 
+# Waktu, jumlah baris & memori tiap tahap rerun ini (panel diagnostik + log JSON lines)
+diagnostics = StageRecorder('rca_dashboard').activate()
+
 # Fungsi filter multiselect dengan opsi select all
 def multi_select_filter(label, options, default_all=True):
     select_all = st.checkbox(f"Pilih Semua {label}", value=default_all)
@@ -23,27 +32,33 @@ def multi_select_filter(label, options, default_all=True):
         selected = st.multiselect(f"Filter berdasarkan {label}:", options=options, default=[])
     return selected
 
-# Fungsi filter data berdasar kolom
-def filter_by_column(df, col_name, label):
-    if col_name in df.columns:
-        options = sorted(df[col_name].dropna().unique())
-        selected = multi_select_filter(label, options)
-        df_filtered = df[df[col_name].isin(selected)]
-        st.write(f"✅ Setelah filter {label}: {len(df_filtered)} baris")
-        if df_filtered.empty:
+# Fungsi filter data berdasar kolom: opsi diambil dari index, hasilnya digabung ke mask baris
+# Pilihan dicatat di `selections` supaya filter yang sama bisa diterapkan ke cube
+def filter_by_column(filter_index, mask, col_name, label, selections):
+    if filter_index.has(col_name):
+        with stage(f'filter:{col_name}', rows_in=int(mask.sum())) as timing:
+            options = filter_index.options(col_name, mask)
+            selected = multi_select_filter(label, options)
+            selections[col_name] = selected
+            mask = mask & filter_index.mask(col_name, selected)
+            row_count = timing['rows_out'] = int(mask.sum())
+        st.write(f"✅ Setelah filter {label}: {row_count} baris")
+        if row_count == 0:
             st.warning(f"⚠️ Tidak ada data setelah filter {label}. Silakan sesuaikan pilihan filter.")
-        return df_filtered
+        return mask
     else:
         st.warning(f"⚠️ Kolom '{col_name}' tidak ditemukan di data.")
-        return df
+        return mask
 
-uploaded_file = st.file_uploader("Unggah file data (CSV / Excel)", type=["csv", "xls", "xlsx"])
+uploaded_file = st.file_uploader("Unggah file data (CSV / Excel / Parquet)", type=["csv", "xls", "xlsx", "parquet", "feather"])
 
 if uploaded_file:
     try:
-        # Load dan bersihkan data
-        df, filtered_df, trend_bulanan, total_bulanan, avg_mttr_dummy, pivot = load_and_clean_data(
+        # Load dan bersihkan data (di-cache per isi file, klik filter tidak memparsing ulang)
+        df, filtered_df, trend_bulanan, total_bulanan, avg_mttr_dummy, pivot = timed(
+            'load', load_cached,
             uploaded_file,
+            load_and_clean_data,
             keep_all_columns=True,
             debug_log=True
         )
@@ -61,62 +76,73 @@ if uploaded_file:
 
         st.write(f"✅ Data awal dimuat: {len(df)} baris")
 
-        # Isi sub_root_cause yang kosong
-        filtered_df = fill_sub_root_cause(filtered_df)
-        st.write(f"✅ Setelah isi sub_root_cause: {len(filtered_df)} baris")
-
-        # Pastikan kolom 'bulan_label' ada
-        if 'bulan_label' not in filtered_df.columns:
+        # Isi sub_root_cause yang kosong, lalu turunkan kolom bulan_label_dt, tahun, bulan
+        try:
+            filtered_df = timed('prepare_frame', prepare_frame, filtered_df)
+        except ValueError:
             st.warning("⚠️ Kolom 'bulan_label' tidak ditemukan di data. Proses berhenti.")
             st.stop()
-
-        # Parsing 'bulan_label' ke datetime dan ekstrak tahun, bulan
-        filtered_df['bulan_label_dt'] = pd.to_datetime(filtered_df['bulan_label'], format='%b %Y', errors='coerce')
-        filtered_df['tahun'] = filtered_df['bulan_label_dt'].dt.year.astype('Int64')
-        filtered_df['bulan'] = filtered_df['bulan_label_dt'].dt.strftime('%b')
+        st.write(f"✅ Setelah isi sub_root_cause: {len(filtered_df)} baris")
 
         st.write("🗓️ Sampel parsing bulan_label:")
         st.dataframe(filtered_df[['bulan_label', 'bulan_label_dt', 'tahun', 'bulan']].head())
 
-        # Filter Tahun
-        available_tahun = sorted(filtered_df['tahun'].dropna().unique())
-        select_all_tahun = st.checkbox("Pilih Semua Tahun", value=True)
-        selected_tahun = st.multiselect(
-            "Filter berdasarkan Tahun:",
-            options=available_tahun,
-            default=available_tahun if select_all_tahun else []
-        )
-        filtered_df = filtered_df[filtered_df['tahun'].isin(selected_tahun)]
-        st.write(f"✅ Setelah filter Tahun: {len(filtered_df)} baris")
-
-        # Filter Bulan & Tahun
-        bulan_label_df = filtered_df[['bulan_label', 'bulan_label_dt']].drop_duplicates().sort_values('bulan_label_dt')
-        available_bulan_label = bulan_label_df['bulan_label'].tolist()
-
-        select_all_bulan = st.checkbox("Pilih Semua Bulan", value=True)
-        selected_bulan_label = st.multiselect(
-            "Filter berdasarkan Bulan & Tahun:",
-            options=available_bulan_label,
-            default=available_bulan_label if select_all_bulan else []
-        )
+        # Index filter & cube agregasi dibangun sekali per isi file (disimpan di session_state).
+        # Ganti filter cukup menggabung mask dan memotong cube, bukan groupby ulang data mentah.
+        filter_index = session_cached('filter_index', uploaded_file, lambda: timed(
+            'build_filter_index', FilterIndex,
+            filtered_df,
+            ['tahun', 'bulan_label', 'circle', 'severity', 'rca', 'subrootcause'],
+            order_by={'bulan_label': 'bulan_label_dt'}
+        ))
+        base_cube = session_cached('cube', uploaded_file, lambda: timed('build_cube', build_cube, filtered_df))
+        mask = filter_index.all_rows()
+        selections = {}
 
-        # Urutkan pilihan bulan sesuai tanggal asli
-        selected_bulan_label = [bl for bl in bulan_label_df['bulan_label'] if bl in selected_bulan_label]
-        filtered_df = filtered_df[filtered_df['bulan_label'].isin(selected_bulan_label)]
-        st.write(f"✅ Setelah filter Bulan & Tahun: {len(filtered_df)} baris")
+        # Filter Tahun
+        with stage('filter:tahun', rows_in=len(filtered_df)) as timing:
+            available_tahun = filter_index.options('tahun')
+            select_all_tahun = st.checkbox("Pilih Semua Tahun", value=True)
+            selected_tahun = st.multiselect(
+                "Filter berdasarkan Tahun:",
+                options=available_tahun,
+                default=available_tahun if select_all_tahun else []
+            )
+            selections['tahun'] = selected_tahun
+            mask &= filter_index.mask('tahun', selected_tahun)
+            timing['rows_out'] = int(mask.sum())
+        st.write(f"✅ Setelah filter Tahun: {timing['rows_out']} baris")
+
+        # Filter Bulan & Tahun (opsi sudah terurut sesuai tanggal asli)
+        with stage('filter:bulan_label', rows_in=timing['rows_out']) as timing:
+            available_bulan_label = filter_index.options('bulan_label', mask)
+
+            select_all_bulan = st.checkbox("Pilih Semua Bulan", value=True)
+            selected_bulan_label = st.multiselect(
+                "Filter berdasarkan Bulan & Tahun:",
+                options=available_bulan_label,
+                default=available_bulan_label if select_all_bulan else []
+            )
+
+            # Urutkan pilihan bulan sesuai tanggal asli
+            selected_bulan_label = [bl for bl in available_bulan_label if bl in selected_bulan_label]
+            selections['bulan_label'] = selected_bulan_label
+            mask &= filter_index.mask('bulan_label', selected_bulan_label)
+            timing['rows_out'] = int(mask.sum())
+        st.write(f"✅ Setelah filter Bulan & Tahun: {timing['rows_out']} baris")
 
         # Filter kolom RCA, circle, severity
         for col_name, label in [('circle', 'Circle'), ('severity', 'Severity'), ('rca', 'RCA')]:
-            filtered_df = filter_by_column(filtered_df, col_name, label)
-
-        # Pastikan kolom total_count ada sebelum digunakan
-        if 'total_count' not in filtered_df.columns:
-            filtered_df['total_count'] = 1
+            mask = filter_by_column(filter_index, mask, col_name, label, selections)
 
         # Filter kolom subrootcause
-        filtered_df = filter_by_column(filtered_df, 'subrootcause', 'Subrootcause')
+        mask = filter_by_column(filter_index, mask, 'subrootcause', 'Subrootcause', selections)
 
-        filtered_df['quarter'] = filtered_df['bulan_label_dt'].dt.to_period('Q').dt.to_timestamp()
+        # Semua filter digabung jadi satu seleksi baris; baris mentah hanya dipakai
+        # oleh tampilan yang memang butuh per baris (sitename, model, export data)
+        with stage('apply_filters', rows_in=len(filtered_df)) as timing:
+            filtered_df = filtered_df[mask]
+            timing['rows_out'] = len(filtered_df)
 
         st.write(f"📦 Data akhir setelah semua filter: {len(filtered_df)} baris")
         st.dataframe(filtered_df.head())
@@ -125,38 +151,47 @@ if uploaded_file:
             st.error("❌ Tidak ada data yang bisa divisualisasikan. Coba ubah filter.")
             st.stop()
 
-        # Hitung ulang agregasi untuk visualisasi
-        trend_bulanan = filtered_df.groupby(['bulan_label', 'rca']).size().reset_index(name='count')
-
-        avg_mttr_per_rca = filtered_df.groupby('rca')['mttr'].mean().sort_values(ascending=False)
-        avg_mttr_per_circle = filtered_df.groupby('circle')['mttr'].mean().sort_values(ascending=False)
-        avg_mttr_per_severity = filtered_df.groupby('severity')['mttr'].mean().sort_values(ascending=False)
-
-        pivot = filtered_df.pivot_table(index='rca', columns='severity', values='total_count', aggfunc='sum', fill_value=0)
-        pivot_circle = filtered_df.pivot_table(index='circle', columns='severity', values='total_count', aggfunc='sum', fill_value=0)
-        total_bulanan = filtered_df.groupby(['quarter', 'bulan_label']).agg({'total_count': 'sum'}).reset_index()
-
-        # Modeling dan prediksi (jika ada)
-        y_test, y_pred = show_model_results(filtered_df)
+        # Agregasi untuk visualisasi: potong cube sesuai filter lalu jumlahkan ulang
+        with stage('aggregate', rows_in=len(filtered_df)):
+            filtered_df = drop_unused_categories(filtered_df)
+            aggregates = compute_aggregates(filtered_df, cube=slice_cube(base_cube, selections))
+        trend_bulanan = aggregates['trend_bulanan']
+        avg_mttr_per_rca = aggregates['avg_mttr_per_rca']
+        avg_mttr_per_circle = aggregates['avg_mttr_per_circle']
+        avg_mttr_per_severity = aggregates['avg_mttr_per_severity']
+        pivot = aggregates['pivot']
+        pivot_circle = aggregates['pivot_circle']
+        total_bulanan = aggregates['total_bulanan']
+        cube = aggregates['cube']
+
+        # Modeling dan prediksi (jika ada); model dipakai ulang dari registry selama file & filter sama.
+        # Training baru berjalan sebagai job latar belakang: chart di bawah langsung tampil,
+        # y_test / y_pred bernilai None sampai job selesai (app di-rerun otomatis)
+        y_test, y_pred = timed(
+            'model_fit', show_model_results, filtered_df,
+            dataset_fingerprint=file_content_hash(uploaded_file), filter_spec=selections
+        )
 
         # Fungsi untuk menampilkan semua visualisasi
-        def show_visualizations(filtered_df, trend_bulanan, avg_mttr_per_rca, avg_mttr_per_severity, avg_mttr_per_circle, pivot, pivot_circle, total_bulanan):
-            show_trend(filtered_df)                             # Menampilkan trend dengan pilihan
-            show_distribution(filtered_df)                      # Menampilkan distribution dengan pilihan
-            show_mttr_per_rca(avg_mttr_per_rca)                 # Menampilkan MTTR per RCA
-            show_mttr_per_severity(avg_mttr_per_severity)       # Menampilkan MTTR per Severity
-            show_mttr_per_circle(avg_mttr_per_circle)           # Menampilkan MTTR per Circle
-            show_heatmap_rca_vs_severity(pivot)                 # Menampilkan heatmap RCA vs Severity
-            show_heatmap_circle_vs_severity(pivot_circle)       # Menampilkan heatmap Circle vs Severity
-            show_sitename(filtered_df)                          # Menampilkan sitename dengan pilihan
-            show_qoq(total_bulanan)                             # Menampilkan QoQ
-            show_yoy(total_bulanan)                             # Menampilkan YoY
+        def show_visualizations(filtered_df, cube, trend_bulanan, avg_mttr_per_rca, avg_mttr_per_severity, avg_mttr_per_circle, pivot, pivot_circle, total_bulanan):
+            # Tiap chart diukur sebagai tahap sendiri (chart:<nama>) di panel diagnostik
+            timed('chart:trend', show_trend, cube)                                          # Menampilkan trend dengan pilihan (dari cube)
+            timed('chart:distribution', show_distribution, cube)                            # Menampilkan distribution dengan pilihan (dari cube)
+            timed('chart:mttr_rca', show_mttr_per_rca, avg_mttr_per_rca)                    # Menampilkan MTTR per RCA
+            timed('chart:mttr_severity', show_mttr_per_severity, avg_mttr_per_severity)     # Menampilkan MTTR per Severity
+            timed('chart:mttr_circle', show_mttr_per_circle, avg_mttr_per_circle)           # Menampilkan MTTR per Circle
+            timed('chart:heatmap_rca_severity', show_heatmap_rca_vs_severity, pivot)        # Menampilkan heatmap RCA vs Severity
+            timed('chart:heatmap_circle_severity', show_heatmap_circle_vs_severity, pivot_circle)  # Menampilkan heatmap Circle vs Severity
+            timed('chart:sitename', show_sitename, filtered_df)                             # Menampilkan sitename dengan pilihan
+            timed('chart:qoq', show_qoq, total_bulanan)                                     # Menampilkan QoQ
+            timed('chart:yoy', show_yoy, total_bulanan)                                     # Menampilkan YoY
 
         # Tampilkan visualisasi
-        show_visualizations(filtered_df, trend_bulanan, avg_mttr_per_rca, avg_mttr_per_severity, avg_mttr_per_circle, pivot, pivot_circle, total_bulanan)
+        show_visualizations(filtered_df, cube, trend_bulanan, avg_mttr_per_rca, avg_mttr_per_severity, avg_mttr_per_circle, pivot, pivot_circle, total_bulanan)
 
         # Export data ke Excel
-        excel_output = generate_excel_output(
+        excel_output = timed(
+            'export_excel', generate_excel_output,
             filtered_df, trend_bulanan, total_bulanan, avg_mttr_per_rca, pivot,
             y_test if y_test is not None else None,
             y_pred if y_pred is not None else None
@@ -169,8 +204,12 @@ if uploaded_file:
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )
 
+        show_diagnostics(diagnostics)
+
     except Exception as e:
         st.error(f"❌ Terjadi kesalahan saat memproses file: {e}")
+        # Tahap yang sempat berjalan (termasuk yang gagal) tetap ditampilkan
+        show_diagnostics(diagnostics, expanded=True)
         st.stop()
 
 else:
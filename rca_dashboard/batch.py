@@ -0,0 +1,113 @@
+import argparse
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from utils.pipeline import run_pipeline
+from common.diagnostics import StageRecorder
+from utils.model_registry import ModelRegistry
+from utils.training import MODEL_BACKENDS, RANDOM_FOREST, TRAINING_SAMPLE_ROWS
+
+OUTPUT_FORMATS = ['xlsx', 'parquet']
+
+
+def build_spec(args):
+    """Gabungkan filter dari file --spec (JSON) dengan argumen CLI (argumen CLI menang)."""
+    spec = {}
+    if args.spec:
+        with open(args.spec, 'r', encoding='utf-8') as f:
+            spec = json.load(f)
+    for col in ['tahun', 'bulan_label', 'circle', 'severity', 'rca', 'subrootcause']:
+        values = getattr(args, col)
+        if values:
+            spec[col] = values
+    return spec
+
+
+def expand_files(patterns):
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) or [pattern]
+        for path in matches:
+            if path not in files:
+                files.append(path)
+    return files
+
+
+def process_file(path, spec, output_dir, formats, with_model, registry_dir=None, model_backend=RANDOM_FOREST,
+                 model_max_rows=TRAINING_SAMPLE_ROWS):
+    # Satu recorder per file: tiap tahap tercatat di log diagnostik (juga di worker process)
+    StageRecorder('rca_batch').activate()
+    registry = ModelRegistry(registry_dir) if registry_dir else None
+    try:
+        return run_pipeline(path, spec, output_dir, formats, with_model, registry=registry,
+                            model_backend=model_backend, model_max_rows=model_max_rows)
+    except Exception as e:
+        return {'file': path, 'error': str(e)}
+
+
+def print_summary(summary):
+    if 'error' in summary:
+        print(f"❌ {summary['file']}: {summary['error']}")
+        return
+    print(f"✅ {summary['file']}: {summary['rows']} baris, model: {summary['model']}")
+    for path in summary['outputs']:
+        print(f"   📁 {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Jalankan analisis RCA tanpa Streamlit (batch / cron) untuk satu atau banyak file."
+    )
+    parser.add_argument("files", nargs="+", help="File data (CSV / Excel / Parquet / Feather), boleh pola glob")
+    parser.add_argument("--spec", default=None,
+                        help="File JSON berisi filter, misal {\"tahun\": [2024], \"circle\": [\"Jabo\"]}")
+    parser.add_argument("--tahun", nargs="+", type=int, help="Filter tahun")
+    parser.add_argument("--bulan", nargs="+", dest="bulan_label", help="Filter bulan, format 'Jan 2024'")
+    parser.add_argument("--circle", nargs="+", help="Filter circle")
+    parser.add_argument("--severity", nargs="+", help="Filter severity")
+    parser.add_argument("--rca", nargs="+", help="Filter RCA")
+    parser.add_argument("--subrootcause", nargs="+", help="Filter subrootcause")
+    parser.add_argument("--output-dir", default="output_rca", help="Folder output (default: output_rca)")
+    parser.add_argument("--format", nargs="+", choices=OUTPUT_FORMATS, default=OUTPUT_FORMATS, dest="formats",
+                        help="Format output (default: xlsx parquet)")
+    parser.add_argument("--no-model", action="store_true", help="Lewati pelatihan model RCA")
+    parser.add_argument("--model-registry", default=None, metavar="DIR",
+                        help="Folder registry model: model dipakai ulang bila file & filter sama dengan run sebelumnya")
+    parser.add_argument("--model-backend", choices=MODEL_BACKENDS, default=RANDOM_FOREST,
+                        help="Backend model RCA: random_forest (semua core) atau hist_gradient_boosting "
+                             "(kategori native, lebih cepat untuk data besar)")
+    parser.add_argument("--max-train-rows", type=int, default=TRAINING_SAMPLE_ROWS,
+                        help=f"Batas sampel training terstratifikasi per RCA (default: {TRAINING_SAMPLE_ROWS})")
+    parser.add_argument("--full-data", action="store_true", help="Latih model dengan seluruh data (tanpa sampling)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Jumlah worker process untuk memproses banyak file secara paralel (default: 1)")
+    args = parser.parse_args()
+
+    spec = build_spec(args)
+    files = expand_files(args.files)
+    with_model = not args.no_model
+    max_train_rows = None if args.full_data else args.max_train_rows
+    failed = 0
+
+    if args.workers > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = [
+                executor.submit(process_file, path, spec, args.output_dir, args.formats, with_model,
+                                args.model_registry, args.model_backend, max_train_rows)
+                for path in files
+            ]
+            for future in as_completed(futures):
+                summary = future.result()
+                failed += 'error' in summary
+                print_summary(summary)
+    else:
+        for path in files:
+            summary = process_file(path, spec, args.output_dir, args.formats, with_model, args.model_registry,
+                                   args.model_backend, max_train_rows)
+            failed += 'error' in summary
+            print_summary(summary)
+
+    sys.exit(1 if failed else 0)
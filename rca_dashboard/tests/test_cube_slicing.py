@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+from benchmark.synthetic import write_dataset
+from common.cube import build_cube, slice_cube
+from common.schema import drop_unused_categories
+from utils.pipeline import apply_filters, compute_aggregates, prepare_frame
+from utils.preprocessing import load_and_clean_data
+
+DERIVED = ['trend_bulanan', 'avg_mttr_per_rca', 'avg_mttr_per_circle', 'avg_mttr_per_severity',
+           'pivot', 'pivot_circle', 'total_bulanan']
+
+
+@pytest.fixture(scope='module')
+def frame(tmp_path_factory):
+    path = write_dataset('rca', 3000, tmp_path_factory.mktemp('rca') / 'rca.csv', seed=7)
+    _, df, *_ = load_and_clean_data(str(path), keep_all_columns=True)
+    return prepare_frame(df)
+
+
+def _normalize(value):
+    # Urutan baris / kolom dan kategori yang tidak terpakai bukan bagian dari hasil
+    if isinstance(value, pd.Series):
+        value = value.sort_index()
+        value.index = value.index.astype(object)
+        return value.astype('float64')
+    value = value.copy()
+    if isinstance(value.index, pd.RangeIndex):
+        value = value.sort_values(list(value.columns)).reset_index(drop=True)
+    else:
+        value = value.sort_index().sort_index(axis=1)
+        value.index = value.index.astype(object)
+        value.columns = value.columns.astype(object)
+    for col in value.columns:
+        if isinstance(value[col].dtype, pd.CategoricalDtype):
+            value[col] = value[col].astype(object)
+    return value.astype({col: 'float64' for col in value.select_dtypes('number').columns})
+
+
+def _assert_same_aggregates(actual, expected):
+    for key in DERIVED:
+        left, right = _normalize(actual[key]), _normalize(expected[key])
+        if isinstance(left, pd.Series):
+            pd.testing.assert_series_equal(left, right, check_names=False, obj=key)
+        else:
+            pd.testing.assert_frame_equal(left, right, check_names=False, obj=key)
+
+
+def _selections(frame):
+    months = frame['bulan_label'].dropna().unique().tolist()
+    circles = frame['circle'].dropna().unique().tolist()
+    severities = frame['severity'].dropna().unique().tolist()
+    rcas = frame['rca'].value_counts().index.tolist()
+    return [
+        {},
+        {'bulan_label': months[:2]},
+        {'circle': circles[:3], 'severity': severities[:1]},
+        {'tahun': [int(frame['tahun'].dropna().iloc[0])], 'rca': rcas[:4]},
+        {'circle': circles[:1], 'rca': rcas[:1], 'bulan_label': months[-1:]},
+    ]
+
+
+def test_sliced_cube_matches_aggregates_from_filtered_rows(frame):
+    base_cube = build_cube(frame)
+    for selections in _selections(frame):
+        filtered = drop_unused_categories(apply_filters(frame, selections))
+        assert not filtered.empty
+        expected = compute_aggregates(filtered)
+        actual = compute_aggregates(filtered, cube=slice_cube(base_cube, selections))
+        _assert_same_aggregates(actual, expected)
+
+
+def test_sliced_cube_keeps_row_totals(frame):
+    base_cube = build_cube(frame)
+    assert base_cube['rows'].sum() == len(frame)
+    circles = frame['circle'].dropna().unique().tolist()[:2]
+    sliced = slice_cube(base_cube, {'circle': circles, 'severity': None})
+    assert sliced['rows'].sum() == frame['circle'].isin(circles).sum()
+    assert sliced['mttr_count'].sum() == frame.loc[frame['circle'].isin(circles), 'mttr'].count()
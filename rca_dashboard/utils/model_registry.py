@@ -0,0 +1,149 @@
+"""
+Registry model RCA di disk: model yang sudah dilatih dipakai ulang selama kuncinya sama.
+
+Kunci = fingerprint dataset + filter spec + daftar fitur + hyperparameter (+ versi
+format registry & scikit-learn, karena pickle model tidak portabel antar versi).
+Tiap entry disimpan sebagai `<kunci>.joblib` (model, label encoder, label kelas,
+y_test/y_pred, metrik) ditambah `<kunci>.json` berisi metadata yang bisa dibaca manusia.
+Waktu pakai terakhir = mtime file model; entry paling lama tidak dipakai dibuang
+sampai total ukuran <= max_bytes.
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+import joblib
+import pandas as pd
+import sklearn
+
+from . import APP_DIR
+
+REGISTRY_VERSION = 1
+# Default di <folder aplikasi>/model_registry, sama dari folder mana pun aplikasi dijalankan
+REGISTRY_DIR = os.environ.get('RCA_MODEL_REGISTRY_DIR', os.path.join(APP_DIR, 'model_registry'))
+REGISTRY_MAX_BYTES = 1024 ** 3
+MODEL_SUFFIX = '.joblib'
+META_SUFFIX = '.json'
+
+
+def normalize_filter_spec(filter_spec):
+    """Filter spec dalam bentuk kanonik: nilai jadi string terurut, kolom tanpa filter jadi None."""
+    normalized = {}
+    for col, values in sorted((filter_spec or {}).items()):
+        normalized[col] = None if values is None else sorted(str(v) for v in values)
+    return normalized
+
+
+def frame_fingerprint(df):
+    """SHA-256 isi dataframe (nilai per kolom, nama & tipe kolom), tidak bergantung index."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(col), str(dtype)] for col, dtype in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def model_key(dataset_fingerprint, filter_spec, features, params):
+    """Kunci registry: hash dari semua hal yang menentukan hasil training."""
+    payload = {
+        'registry_version': REGISTRY_VERSION,
+        'sklearn_version': sklearn.__version__,
+        'dataset': dataset_fingerprint,
+        'filters': normalize_filter_spec(filter_spec),
+        'features': list(features),
+        'params': params,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+
+class ModelRegistry:
+    """Simpan / ambil hasil training berdasarkan kunci, dengan batas total ukuran di disk."""
+
+    def __init__(self, root=REGISTRY_DIR, max_bytes=REGISTRY_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, key, suffix):
+        return os.path.join(self.root, f"{key}{suffix}")
+
+    def get(self, key):
+        """Entry (dict) untuk kunci ini, atau None. File rusak / tidak terbaca dibuang."""
+        path = self._path(key, MODEL_SUFFIX)
+        if not os.path.exists(path):
+            return None
+        try:
+            entry = joblib.load(path)
+        except Exception:
+            self.remove(key)
+            return None
+        try:
+            os.utime(path)  # tandai baru dipakai (urutan LRU)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key, entry, meta=None):
+        """
+        Simpan entry (dict berisi model, le_dict, ...) lalu buang entry lama bila melewati batas.
+        Return metadata yang ditulis.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        meta = {
+            'key': key,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'registry_version': REGISTRY_VERSION,
+            'sklearn_version': sklearn.__version__,
+            **(meta or {}),
+        }
+        entry = {**entry, 'meta': meta}
+        path = self._path(key, MODEL_SUFFIX)
+        with self._lock:
+            # Tulis ke file sementara lalu rename: sesi lain tidak pernah membaca file setengah jadi
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            joblib.dump(entry, tmp_path, compress=3)
+            os.replace(tmp_path, path)
+            meta['size_bytes'] = os.path.getsize(path)
+            with open(self._path(key, META_SUFFIX), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, indent=2, default=str)
+            self.evict()
+        return meta
+
+    def remove(self, key):
+        for suffix in (MODEL_SUFFIX, META_SUFFIX):
+            try:
+                os.remove(self._path(key, suffix))
+            except OSError:
+                pass
+
+    def entries(self):
+        """List (kunci, ukuran bytes, waktu pakai terakhir), paling lama tidak dipakai di depan."""
+        if not os.path.isdir(self.root):
+            return []
+        items = []
+        for name in os.listdir(self.root):
+            if not name.endswith(MODEL_SUFFIX):
+                continue
+            key = name[:-len(MODEL_SUFFIX)]
+            try:
+                stat = os.stat(os.path.join(self.root, name))
+            except OSError:
+                continue
+            meta_path = self._path(key, META_SUFFIX)
+            meta_size = os.path.getsize(meta_path) if os.path.exists(meta_path) else 0
+            items.append((key, stat.st_size + meta_size, stat.st_mtime))
+        return sorted(items, key=lambda item: item[2])
+
+    def total_bytes(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """Buang entry paling lama tidak dipakai sampai total ukuran <= max_bytes."""
+        items = self.entries()
+        total = sum(size for _, size, _ in items)
+        for key, size, _ in items:
+            if total <= self.max_bytes:
+                break
+            self.remove(key)
+            total -= size
@@ -1,110 +1,158 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import (
     classification_report,
     confusion_matrix,
-    accuracy_score,
-    precision_score,
-    recall_score,
-    f1_score,
 )
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-
-def encode_categorical_columns(df):
-    """Encode semua kolom kategorikal dengan LabelEncoder dan kembalikan dict encoder."""
-    le_dict = {}
-    df_enc = df.copy()
-    for col in df_enc.columns:
-        if df_enc[col].dtype == 'object' or pd.api.types.is_categorical_dtype(df_enc[col]):
-            le = LabelEncoder()
-            df_enc[col] = le.fit_transform(df_enc[col].astype(str))
-            le_dict[col] = le
-    return df_enc, le_dict
-
-
-def validate_data_for_training(X, y):
-    """Validasi data sebelum training."""
-    if len(X) < 10:
-        st.warning("⚠️ Data terlalu sedikit untuk pelatihan model yang baik.")
-        return False
-    class_counts = y.value_counts()
-    if len(class_counts) < 2:
-        st.warning("⚠️ Data hanya memiliki satu kelas RCA.")
-        return False
-    if (class_counts < 2).any():
-        st.warning("❗ Beberapa kelas RCA hanya memiliki 1 data. Tidak cukup untuk stratifikasi.")
-        st.write(class_counts[class_counts < 2])
-        return False
-    return True
-
-
-def plot_confusion_matrix(y_test, y_pred, labels):
-    """Tampilkan confusion matrix dengan heatmap."""
+from .training import (
+    load_or_fit_rca_model,
+    lookup_rca_model,
+    learning_curve,
+    RANDOM_FOREST,
+    HIST_GRADIENT_BOOSTING,
+    TRAINING_SAMPLE_ROWS,
+)
+from .model_registry import ModelRegistry, frame_fingerprint, normalize_filter_spec
+from common.diagnostics import timed
+from common.jobs import get_executor, session_job, cancel_session_job, job_signature, wait_for_job
+
+# Slot job training model RCA di session_state (satu job aktif per sesi)
+MODEL_JOB_SLOT = 'rca_model'
+CURVE_JOB_SLOT = 'rca_learning_curve'
+# Pilihan backend training di UI
+BACKEND_LABELS = {
+    RANDOM_FOREST: "🌲 Random Forest (semua core)",
+    HIST_GRADIENT_BOOSTING: "⚡ HistGradientBoosting (kategori native, lebih cepat)",
+}
+# Nama singkat backend untuk judul chart
+BACKEND_NAMES = {
+    RANDOM_FOREST: "Random Forest",
+    HIST_GRADIENT_BOOSTING: "HistGradientBoosting",
+}
+
+
+@st.cache_resource
+def get_model_registry():
+    """Registry model di disk, satu objek untuk semua sesi."""
+    return ModelRegistry()
+
+
+def show_data_problem(problem):
+    """Tampilkan alasan data tidak layak dilatih (pesan + detail jumlah per kelas)."""
+    message, detail = problem
+    st.warning(message)
+    if detail is not None:
+        st.write(detail)
+
+
+def plot_confusion_matrix(y_test, y_pred, labels, backend=RANDOM_FOREST):
+    """Tampilkan confusion matrix dengan heatmap; judul menyebut backend model yang dipakai."""
     cm = confusion_matrix(y_test, y_pred)
     fig, ax = plt.subplots(figsize=(8, 6))
     sns.heatmap(cm, annot=True, fmt='d', cmap='YlGnBu', xticklabels=labels, yticklabels=labels, ax=ax)
     ax.set_xlabel('Predicted')
     ax.set_ylabel('Actual')
-    ax.set_title('Confusion Matrix - Random Forest')
+    ax.set_title(f"Confusion Matrix - {BACKEND_NAMES.get(backend, backend)}")
     st.pyplot(fig)
 
 
-def show_model_results(filtered_df):
-    if 'rca' not in filtered_df.columns:
-        st.error("Kolom 'rca' tidak ditemukan.")
-        return None, None
-
-    df_enc = filtered_df.dropna(subset=['rca']).copy()
-
-    # Drop kolom datetime jika ada
-    datetime_cols = df_enc.select_dtypes(include=['datetime64[ns]', 'datetime64[ns, UTC]']).columns.tolist()
-    if datetime_cols:
-        df_enc.drop(columns=datetime_cols, inplace=True)
+def show_model_results(filtered_df, dataset_fingerprint=None, filter_spec=None):
+    """
+    Tampilkan hasil model RCA. Model diambil dari registry bila data sumber
+    (dataset_fingerprint), filter, fitur & hyperparameter sama dengan training sebelumnya.
+    Jika belum ada, training berjalan sebagai job di latar belakang: bagian ini menampilkan
+    status job dan terisi saat job selesai; ganti filter membatalkan job yang basi.
+    Secara default model dilatih pada sampel terstratifikasi per rca (TRAINING_SAMPLE_ROWS);
+    seluruh data hanya dipakai bila dicentang. Return (y_test, y_pred), atau (None, None)
+    selama model belum tersedia.
+    """
+    backend = st.selectbox(
+        "⚙️ Mode training model RCA", options=list(BACKEND_LABELS), format_func=BACKEND_LABELS.get
+    )
+    full_data = st.checkbox(
+        f"🗄️ Latih dengan seluruh data (default: sampel terstratifikasi maks. {TRAINING_SAMPLE_ROWS:,} baris)",
+        value=False
+    )
+    with_curve = st.checkbox("📈 Hitung learning curve (akurasi per ukuran sampel)", value=False)
+    force_retrain = st.checkbox("🏋️‍♂️ Latih ulang model RCA", value=False)
+    max_rows = None if full_data else TRAINING_SAMPLE_ROWS
+
+    y_test, y_pred = show_model_section(filtered_df, dataset_fingerprint, filter_spec, backend, max_rows, force_retrain)
+    if with_curve:
+        show_learning_curve(filtered_df, dataset_fingerprint, filter_spec, backend)
+    return y_test, y_pred
 
-    # Encode kolom kategorikal
-    df_enc, le_dict = encode_categorical_columns(df_enc)
 
-    # Siapkan fitur dan target
-    X = df_enc.drop(columns=['rca', 'bulan_label'], errors='ignore')
-    y = df_enc['rca']
+def show_model_section(filtered_df, dataset_fingerprint, filter_spec, backend, max_rows, force_retrain):
+    """Model dari registry, atau status / hasil job training bila belum ada."""
+    registry = get_model_registry()
+    executor = get_executor('rca_dashboard')
+    try:
+        if dataset_fingerprint is None:
+            dataset_fingerprint = frame_fingerprint(filtered_df)
+        result = None if force_retrain else timed(
+            'registry_lookup', lookup_rca_model, filtered_df, registry,
+            dataset_fingerprint=dataset_fingerprint, filter_spec=filter_spec, backend=backend, max_rows=max_rows
+        )
+    except ValueError as e:
+        st.error(str(e))
+        return None, None
 
-    if not validate_data_for_training(X, y):
+    if result is not None:
+        cancel_session_job(executor, MODEL_JOB_SLOT)
+        return render_model_result(result, backend)
+
+    signature = job_signature(
+        dataset_fingerprint, normalize_filter_spec(filter_spec), list(filtered_df.columns),
+        backend, max_rows, force_retrain
+    )
+    job = session_job(
+        executor, MODEL_JOB_SLOT, signature, load_or_fit_rca_model, filtered_df.copy(deep=False),
+        registry=registry, dataset_fingerprint=dataset_fingerprint, filter_spec=filter_spec,
+        backend=backend, max_rows=max_rows, force_retrain=force_retrain
+    )
+    if not job.done():
+        wait_for_job(job, "Training model RCA")
+        return None, None
+    if job.status != 'done':
+        st.error(f"Gagal split data / melatih model (job `{job.id}`, {job.status}): {job.error}")
         return None, None
 
-    try:
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42, stratify=y
-        )
-    except Exception as e:
-        st.error(f"Gagal split data: {e}")
+    result, problem = job.result
+    if problem is not None:
+        show_data_problem(problem)
         return None, None
+    return render_model_result(result, backend)
+
+
+def render_model_result(result, backend=RANDOM_FOREST):
+    """Caption asal model, classification report, confusion matrix dan ringkasan metrik."""
+    if result['from_registry']:
+        st.caption(f"♻️ Model dimuat dari registry (dilatih {result['meta']['created_at']}), tanpa training ulang.")
+    else:
+        st.caption("🏋️ Model baru dilatih dan disimpan ke registry.")
+    if result.get('sample_rows', 0) < result.get('total_rows', 0):
+        st.caption(
+            f"🎯 Dilatih pada sampel terstratifikasi per RCA: {result['sample_rows']:,} dari "
+            f"{result['total_rows']:,} baris."
+        )
+    if result.get('caps'):
+        st.caption(f"✂️ Kolom berkardinalitas tinggi dipangkas ke nilai paling sering: {', '.join(sorted(result['caps']))}")
 
-    model = RandomForestClassifier(n_estimators=100, max_depth=8, random_state=42)
-    model.fit(X_train, y_train)
-    y_pred = model.predict(X_test)
+    y_test, y_pred, labels = result['y_test'], result['y_pred'], result['labels']
 
     st.subheader("📄 Classification Report")
     st.text(classification_report(y_test, y_pred))
 
-    # Ambil label asli jika ada encoder 'rca', jika tidak ambil langsung
-    labels = le_dict['rca'].classes_ if 'rca' in le_dict else sorted(filtered_df['rca'].unique())
-    plot_confusion_matrix(y_test, y_pred, labels)
-
-    # Hitung metrik tambahan
-    acc = accuracy_score(y_test, y_pred)
-    precision = precision_score(y_test, y_pred, average='weighted', zero_division=0)
-    recall = recall_score(y_test, y_pred, average='weighted', zero_division=0)
-    f1 = f1_score(y_test, y_pred, average='weighted', zero_division=0)
+    plot_confusion_matrix(y_test, y_pred, labels, backend)
 
     metrics_df = pd.DataFrame({
-        'Metrik': ['Accuracy', 'Precision (Weighted)', 'Recall (Weighted)', 'F1-Score (Weighted)'],
-        'Nilai': [acc, precision, recall, f1]
+        'Metrik': list(result['metrics'].keys()),
+        'Nilai': list(result['metrics'].values())
     })
     metrics_df['Nilai'] = metrics_df['Nilai'].apply(lambda x: f"{x:.2%}")
 
@@ -112,3 +160,29 @@ def show_model_results(filtered_df):
     st.table(metrics_df)
 
     return y_test, y_pred
+
+
+def show_learning_curve(filtered_df, dataset_fingerprint, filter_spec, backend):
+    """Learning curve (job latar belakang): metrik test set yang sama per ukuran sampel train."""
+    st.subheader("📈 Learning Curve")
+    signature = job_signature(
+        dataset_fingerprint, normalize_filter_spec(filter_spec), list(filtered_df.columns), backend
+    )
+    job = session_job(
+        get_executor('rca_dashboard'), CURVE_JOB_SLOT, signature, learning_curve,
+        filtered_df.copy(deep=False), backend=backend
+    )
+    if not job.done():
+        wait_for_job(job, "Learning curve")
+        return
+    if job.status != 'done':
+        st.error(f"Gagal menghitung learning curve (job `{job.id}`, {job.status}): {job.error}")
+        return
+
+    curve = job.result
+    st.line_chart(curve.set_index('train_rows')[['Accuracy', 'F1-Score (Weighted)']])
+    table = curve.copy()
+    for col in ['Accuracy', 'Precision (Weighted)', 'Recall (Weighted)', 'F1-Score (Weighted)']:
+        table[col] = table[col].map(lambda x: f"{x:.2%}")
+    st.dataframe(table, use_container_width=True, hide_index=True)
+    st.caption(f"Semua ukuran dinilai pada test set yang sama (20% data). Batas sampel default: {TRAINING_SAMPLE_ROWS:,} baris.")
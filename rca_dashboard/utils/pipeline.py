@@ -0,0 +1,165 @@
+"""
+Pipeline RCA tanpa Streamlit: load -> filter -> agregasi -> model -> export.
+
+Dipakai oleh app.py (mode interaktif) dan batch.py (mode headless / cron).
+"""
+import os
+
+import pandas as pd
+
+from .preprocessing import load_and_clean_data, fill_sub_root_cause
+from .training import load_or_fit_rca_model, RANDOM_FOREST, TRAINING_SAMPLE_ROWS
+from .exporter import generate_excel_output
+from common.schema import drop_unused_categories
+from common.dates import known_month, month_abbr
+from common.cube import build_cube, trend_bulanan, avg_mttr_by, pivot_by, total_bulanan
+from common.diagnostics import stage, timed
+
+# Kolom filter yang didukung spec, sesuai urutan filter di dashboard
+FILTER_COLUMNS = ['tahun', 'bulan_label', 'circle', 'severity', 'rca', 'subrootcause']
+
+
+def prepare_frame(filtered_df):
+    """Isi sub_root_cause dan turunkan kolom bulan_label_dt, tahun, bulan."""
+    filtered_df = fill_sub_root_cause(filtered_df)
+    if 'bulan_label' not in filtered_df.columns or 'bulan_sort' not in filtered_df.columns:
+        raise ValueError("Kolom 'bulan_label' tidak ditemukan di data.")
+    # Diturunkan dari kunci bulan_sort, bulan_label tidak diparsing ulang
+    filtered_df['bulan_label_dt'] = known_month(filtered_df['bulan_sort'])
+    filtered_df['tahun'] = filtered_df['bulan_label_dt'].dt.year.astype('Int64')
+    filtered_df['bulan'] = month_abbr(filtered_df['bulan_label_dt'])
+    return filtered_df
+
+
+def apply_filters(df, spec):
+    """
+    Terapkan filter spec ke dataframe.
+
+    spec: dict {kolom: list nilai}; kolom yang tidak ada / bernilai None berarti semua nilai.
+    Key 'tahun' (atau 'years') dan 'bulan_label' (atau 'months') juga diterima.
+    """
+    spec = normalize_spec(spec)
+    mask = pd.Series(True, index=df.index)
+    for col in FILTER_COLUMNS:
+        selected = spec.get(col)
+        if selected is None or col not in df.columns:
+            continue
+        if col == 'tahun':
+            selected = [int(v) for v in selected]
+        mask &= df[col].isin(selected)
+    return df[mask]
+
+
+def normalize_spec(spec):
+    spec = dict(spec or {})
+    aliases = {'years': 'tahun', 'months': 'bulan_label'}
+    for alias, col in aliases.items():
+        if alias in spec and col not in spec:
+            spec[col] = spec.pop(alias)
+    return spec
+
+
+def compute_aggregates(filtered_df, cube=None):
+    """
+    Hitung semua agregasi yang dipakai chart, tabel dan export.
+
+    Data mentah hanya di-scan sekali untuk membangun cube (lihat common/cube.py);
+    semua tabel turunan dihitung dari cube yang ukurannya sebanding jumlah grup.
+    """
+    # Kolom bantu untuk sheet 'Filtered Data' di export
+    if 'total_count' not in filtered_df.columns:
+        filtered_df['total_count'] = 1
+    filtered_df['quarter'] = filtered_df['bulan_label_dt'].dt.to_period('Q').dt.to_timestamp()
+
+    if cube is None:
+        cube = build_cube(filtered_df)
+
+    return {
+        'cube': cube,
+        'trend_bulanan': trend_bulanan(cube),
+        'avg_mttr_per_rca': avg_mttr_by(cube, 'rca'),
+        'avg_mttr_per_circle': avg_mttr_by(cube, 'circle'),
+        'avg_mttr_per_severity': avg_mttr_by(cube, 'severity'),
+        'pivot': pivot_by(cube, 'rca', 'severity'),
+        'pivot_circle': pivot_by(cube, 'circle', 'severity'),
+        'total_bulanan': total_bulanan(cube),
+    }
+
+
+def train_model(filtered_df, registry=None, filter_spec=None, backend=RANDOM_FOREST, max_rows=TRAINING_SAMPLE_ROWS):
+    """
+    Latih model RCA (atau ambil dari registry jika diberikan dan kuncinya cocok).
+    max_rows: batas sampel terstratifikasi per rca, None = seluruh data.
+    Return dict hasil load_or_fit_rca_model, atau None (+ pesan) jika data tidak layak.
+    """
+    result, problem = load_or_fit_rca_model(filtered_df, registry=registry, filter_spec=filter_spec,
+                                            backend=backend, max_rows=max_rows)
+    if problem is not None:
+        return None, problem[0]
+    return result, None
+
+
+def run_pipeline(data_path, spec=None, output_dir='.', formats=('xlsx', 'parquet'), with_model=True,
+                 registry=None, model_backend=RANDOM_FOREST, model_max_rows=TRAINING_SAMPLE_ROWS):
+    """
+    Jalankan pipeline RCA lengkap untuk satu file dan tulis output ke output_dir.
+    registry: ModelRegistry opsional, model dipakai ulang bila data & spec sama dengan run sebelumnya.
+    model_backend: RANDOM_FOREST atau HIST_GRADIENT_BOOSTING (lihat utils.training).
+    model_max_rows: batas sampel training terstratifikasi, None = seluruh data.
+    Return dict ringkasan (jumlah baris, path output, pesan model).
+    """
+    _, filtered_df, *_ = timed('load', load_and_clean_data, data_path, keep_all_columns=True)
+    filtered_df = timed('prepare_frame', prepare_frame, filtered_df)
+    filtered_df = drop_unused_categories(timed('filter', apply_filters, filtered_df, spec))
+    if filtered_df.empty:
+        raise ValueError("Tidak ada data setelah filter diterapkan.")
+
+    aggregates = timed('aggregate', compute_aggregates, filtered_df)
+
+    y_test = y_pred = None
+    model_message = None
+    if with_model:
+        result, model_message = timed('model_fit', train_model, filtered_df, registry=registry,
+                                      filter_spec=normalize_spec(spec), backend=model_backend,
+                                      max_rows=model_max_rows)
+        if result is not None:
+            y_test, y_pred = result['y_test'], result['y_pred']
+            if result['from_registry']:
+                model_message = 'dari registry'
+
+    os.makedirs(output_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(str(data_path)))[0]
+    outputs = []
+
+    if 'xlsx' in formats:
+        excel_path = os.path.join(output_dir, f"{stem}_output_analisis_rca.xlsx")
+        excel_bytes = timed(
+            'export_excel', generate_excel_output,
+            filtered_df, aggregates['trend_bulanan'], aggregates['total_bulanan'],
+            aggregates['avg_mttr_per_rca'], aggregates['pivot'], y_test, y_pred
+        )
+        with open(excel_path, 'wb') as f:
+            f.write(excel_bytes)
+        outputs.append(excel_path)
+
+    if 'parquet' in formats:
+        with stage('export_parquet', rows_in=len(filtered_df)):
+            tables = {
+                'filtered': filtered_df,
+                'trend_bulanan': aggregates['trend_bulanan'],
+                'total_bulanan': aggregates['total_bulanan'],
+                'avg_mttr_per_rca': aggregates['avg_mttr_per_rca'].rename('avg_mttr').reset_index(),
+                'pivot_severity': aggregates['pivot'].reset_index(),
+            }
+            for name, table in tables.items():
+                path = os.path.join(output_dir, f"{stem}_{name}.parquet")
+                table.columns = [str(col) for col in table.columns]
+                table.to_parquet(path, index=False)
+                outputs.append(path)
+
+    return {
+        'file': str(data_path),
+        'rows': len(filtered_df),
+        'outputs': outputs,
+        'model': model_message or ('dilatih' if y_test is not None else 'tidak dijalankan'),
+    }
@@ -1,54 +1,93 @@
+import numpy as np
 import pandas as pd
 import os
-import csv
-
-def sniff_delimiter(uploaded_file):
-    uploaded_file.seek(0)
-    sample = uploaded_file.read(1024).decode('utf-8', errors='ignore')
-    uploaded_file.seek(0)
-    try:
-        dialect = csv.Sniffer().sniff(sample)
-        return dialect.delimiter
-    except Exception:
-        return ','  # default fallback
+from common.file_probe import read_csv_compact
+from common.schema import apply_schema, CATEGORY_COLUMNS
+from common.dates import parse_datetime_column, month_start, month_labels, UNKNOWN_MONTH, UNKNOWN_LABEL
+from common.diagnostics import stage, timed
+
+# Nilai teks yang dianggap kosong setelah di-strip
+MISSING_TOKENS = ['', 'nan', 'NaN', 'None']
+SUBROOT_COLUMNS = ['sub_root_cause', 'subcause', 'subcause2']
+SELECTED_COLUMNS = [
+    'circle', 'createfaultfirstoccurtime', 'severity', 'mttr',
+    'sub_root_cause', 'subcause', 'slastatus', 'rca',
+    'sitename', 'subcause2', 'subrootcause'
+]
 
 def ensure_columns_exist(df, columns):
     for col in columns:
         if col not in df.columns:
             df[col] = None
 
-def normalize_subroot_cause_columns(df):
-    for col in ['sub_root_cause', 'subcause', 'subcause2']:
-        df[col] = df[col].astype(str).str.strip()
-        df[col] = df[col].replace({'': None, 'nan': None, 'NaN': None, 'None': None})
+def clean_label_column(series, fill=None):
+    """
+    Strip teks dan ubah token kosong ('', 'nan', 'None') jadi NaN (atau `fill`).
+
+    Dikerjakan per nilai unik lalu dipetakan lewat kode, jadi tidak ada salinan
+    string per baris; hasilnya langsung category dengan kategori terurut.
+    """
+    codes, uniques = pd.factorize(series)
+    cleaned = pd.Series(np.asarray(uniques, dtype=object)).astype(str).str.strip()
+    cleaned = cleaned.where(~cleaned.isin(MISSING_TOKENS)).astype(object)
+    # Slot terakhir untuk NaN asli (kode -1 dari factorize)
+    cleaned[len(cleaned)] = np.nan
+    if fill is not None:
+        cleaned = cleaned.fillna(fill)
+    new_codes, categories = pd.factorize(cleaned, sort=True)
+    return pd.Series(
+        pd.Categorical.from_codes(new_codes[codes], categories=categories),
+        index=series.index, name=series.name
+    )
 
-    df['sub_root_cause'] = df['sub_root_cause'].fillna(df['subcause']).fillna(df['subcause2']).fillna('Unknown')
+def normalize_subroot_cause_columns(df):
+    cleaned = [clean_label_column(df[col]) for col in SUBROOT_COLUMNS]
+    # Samakan kategori supaya fillna antar kolom cukup bekerja di level kode
+    categories = sorted(set().union(*(col.cat.categories for col in cleaned)) | {'Unknown'})
+    sub_root_cause, subcause, subcause2 = (col.cat.set_categories(categories) for col in cleaned)
+
+    df['sub_root_cause'] = (
+        sub_root_cause.fillna(subcause).fillna(subcause2).fillna('Unknown')
+        .cat.remove_unused_categories()
+    )
     df['subrootcause'] = df['sub_root_cause']
 
 def convert_dates_and_labels(df, debug_log=False):
-    df['createfaultfirstoccurtime'] = pd.to_datetime(df['createfaultfirstoccurtime'], dayfirst=True, errors='coerce')
+    # Format tanggal dideteksi sekali per file, lalu diparsing per kelompok format
+    df['createfaultfirstoccurtime'] = parse_datetime_column(df['createfaultfirstoccurtime'])
     mask_invalid_date = df['createfaultfirstoccurtime'].isna()
     if debug_log and mask_invalid_date.any():
         print(f"DEBUG: {mask_invalid_date.sum()} baris dengan tanggal tidak valid.")
 
-    df['bulan_label'] = df['createfaultfirstoccurtime'].dt.strftime('%b %Y')
-    df.loc[mask_invalid_date, 'bulan_label'] = 'Unknown'
-    df['bulan_sort'] = df['createfaultfirstoccurtime'].dt.to_period('M').dt.to_timestamp()
-    df.loc[mask_invalid_date, 'bulan_sort'] = pd.Timestamp('1970-01-01')
+    # bulan_sort adalah kunci bulan yang dipakai semua turunan; bulan_label hanya untuk tampilan
+    month_dt = month_start(df['createfaultfirstoccurtime'])
+    df['bulan_label'] = month_labels(month_dt)
+    df['bulan_sort'] = month_dt.fillna(UNKNOWN_MONTH)
 
 def convert_mttr_to_numeric(df):
+    if pd.api.types.is_numeric_dtype(df['mttr']):
+        return  # sudah numerik (misal dari Parquet), tidak perlu konversi string
     df['mttr'] = df['mttr'].astype(str).str.replace(',', '.', regex=False)
     df['mttr'] = pd.to_numeric(df['mttr'], errors='coerce')
 
+def fill_label(series, value):
+    """fillna yang juga aman untuk kolom category (kategori `value` ditambahkan bila belum ada)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        if not series.isna().any():
+            return series
+        if value not in series.cat.categories:
+            series = series.cat.add_categories([value])
+    return series.fillna(value)
+
 def fill_important_nans(df):
-    df['bulan_label'] = df['bulan_label'].fillna('Unknown')
-    df['bulan_sort'] = df['bulan_sort'].fillna(pd.Timestamp('1970-01-01'))
-    df['rca'] = df['rca'].fillna('Unknown')
-    df['severity'] = df['severity'].fillna('Unknown')
+    df['bulan_label'] = fill_label(df['bulan_label'], UNKNOWN_LABEL)
+    df['bulan_sort'] = df['bulan_sort'].fillna(UNKNOWN_MONTH)
+    df['rca'] = fill_label(df['rca'], 'Unknown')
+    df['severity'] = fill_label(df['severity'], 'Unknown')
 
 def calculate_trend_bulanan(df):
     return (
-        df.groupby(['bulan_label', 'bulan_sort', 'rca'])
+        df.groupby(['bulan_label', 'bulan_sort', 'rca'], observed=True)
           .size()
           .reset_index(name='count')
           .sort_values(by='bulan_sort')
@@ -74,7 +113,7 @@ def calculate_total_bulanan(df):
         (total_bulanan['total_count'] - total_bulanan['total_count_last_quarter']) /
         total_bulanan['total_count_last_quarter']
     ) * 100
-    total_bulanan['bulan_label'] = total_bulanan['bulan_sort'].dt.strftime('%b %Y')
+    total_bulanan['bulan_label'] = month_labels(total_bulanan['bulan_sort'])
     return total_bulanan
 
 def create_pivot_table(df):
@@ -83,79 +122,87 @@ def create_pivot_table(df):
         columns='severity',
         values='circle',
         aggfunc='count',
-        fill_value=0
+        fill_value=0,
+        observed=True
     )
 
 def load_and_clean_data(uploaded_file, keep_all_columns=False, debug_log=False):
-    file_ext = os.path.splitext(uploaded_file.name)[-1].lower()
-
-    if file_ext == ".csv":
-        delimiter = sniff_delimiter(uploaded_file)
-        uploaded_file.seek(0)
-        try:
-            df = pd.read_csv(uploaded_file, sep=delimiter, encoding='utf-8')
-        except Exception:
-            uploaded_file.seek(0)
-            try:
-                df = pd.read_csv(uploaded_file, sep=',', encoding='utf-8')
-            except Exception:
-                uploaded_file.seek(0)
-                df = pd.read_csv(uploaded_file, sep=';', encoding='utf-8')
-    else:
-        df = pd.read_excel(uploaded_file)
+    """
+    Load file lalu bersihkan di tempat (satu frame, tanpa salinan penuh).
+
+    `df` dan `filtered_df` yang dikembalikan adalah frame yang sama: kolom rca &
+    severity yang kosong sudah diisi 'Unknown', baris bertanggal tidak valid dikenali
+    lewat createfaultfirstoccurtime yang NaT.
+    """
+    # uploaded_file bisa objek upload Streamlit atau path file (mode batch)
+    file_name = getattr(uploaded_file, 'name', str(uploaded_file))
+    file_ext = os.path.splitext(file_name)[-1].lower()
+
+    with stage('read_file') as timing:
+        if file_ext == ".csv":
+            # Encoding, delimiter, baris header & desimal dideteksi sekali dari sampel file;
+            # dibaca per chunk dengan kolom label langsung jadi category
+            df = read_csv_compact(
+                uploaded_file,
+                category_columns=CATEGORY_COLUMNS + SUBROOT_COLUMNS,
+                columns=None if keep_all_columns else SELECTED_COLUMNS
+            )
+        elif file_ext == ".parquet":
+            df = pd.read_parquet(uploaded_file)
+        elif file_ext == ".feather":
+            df = pd.read_feather(uploaded_file)
+        else:
+            df = pd.read_excel(uploaded_file)
+        timing['rows_out'] = None if df is None else len(df)
 
     if df is None or df.empty:
         raise ValueError("❌ Data tidak berhasil dimuat atau kosong.")
 
+    df = timed('clean', clean_frame, df, keep_all_columns, debug_log)
+
+    with stage('initial_aggregates', rows_in=len(df)):
+        trend_bulanan = calculate_trend_bulanan(df)
+        total_bulanan = calculate_total_bulanan(df)
+        avg_mttr = df.groupby('rca', observed=True)['mttr'].mean().sort_values(ascending=False)
+        pivot = create_pivot_table(df)
+
+    # Hapus kolom sumber yang sudah tidak diperlukan
+    df.drop(columns=[col for col in SUBROOT_COLUMNS if col in df.columns], inplace=True)
+
+    filtered_df = df
+    return df, filtered_df, trend_bulanan, total_bulanan, avg_mttr, pivot
+
+def clean_frame(df, keep_all_columns=False, debug_log=False):
+    """Bersihkan hasil baca file di tempat: nama kolom, label, subrootcause, tanggal, mttr, schema."""
     # Bersihkan kolom
     df.columns = df.columns.str.strip().str.lower()
-    df = df.loc[:, ~df.columns.duplicated()]
+    if df.columns.duplicated().any():
+        df = df.loc[:, ~df.columns.duplicated()]
 
-    # Normalisasi kolom circle
-    df['circle'] = df['circle'].astype(str).str.strip()
-    df.loc[df['circle'].isin(['', 'nan', 'NaN', 'None']), 'circle'] = 'Unknown'
-    df['circle'] = df['circle'].fillna('Unknown')
+    # Normalisasi kolom circle (kosong -> 'Unknown')
+    df['circle'] = clean_label_column(df['circle'], fill='Unknown')
 
     # Pastikan semua kolom subrootcause ada
-    ensure_columns_exist(df, ['sub_root_cause', 'subcause', 'subcause2'])
+    ensure_columns_exist(df, SUBROOT_COLUMNS)
 
-    # Isi dan normalisasi subrootcause
+    # Isi dan normalisasi subrootcause (sekali saja)
     normalize_subroot_cause_columns(df)
 
-    selected_cols = [
-        'circle', 'createfaultfirstoccurtime', 'severity', 'mttr',
-        'sub_root_cause', 'subcause', 'slastatus', 'rca',
-        'sitename', 'subcause2', 'subrootcause'
-    ]
-    missing_cols = [col for col in selected_cols if col not in df.columns]
+    missing_cols = [col for col in SELECTED_COLUMNS if col not in df.columns]
     if missing_cols:
         raise ValueError(f"Kolom berikut tidak ditemukan: {missing_cols}")
 
+    # Pilih kolom tanpa .copy(): semua langkah berikut mengganti kolom di frame ini saja
     if not keep_all_columns:
-        df = df[selected_cols].copy()
-    else:
-        df = df.copy()
+        df = df[SELECTED_COLUMNS]
 
     convert_dates_and_labels(df, debug_log)
-    normalize_subroot_cause_columns(df)  # ulang normalisasi untuk memastikan bersih
-
     convert_mttr_to_numeric(df)
 
-    filtered_df = df.copy()
-
-    fill_important_nans(filtered_df)
-
-    trend_bulanan = calculate_trend_bulanan(filtered_df)
-    total_bulanan = calculate_total_bulanan(filtered_df)
-    avg_mttr = filtered_df.groupby('rca')['mttr'].mean().sort_values(ascending=False)
-    pivot = create_pivot_table(filtered_df)
-
-    # Hapus kolom sumber yang sudah tidak diperlukan
-    cols_to_drop = ['sub_root_cause', 'subcause', 'subcause2']
-    df = df.drop(columns=[col for col in cols_to_drop if col in df.columns])
-    filtered_df = filtered_df.drop(columns=[col for col in cols_to_drop if col in filtered_df.columns])
-
-    return df, filtered_df, trend_bulanan, total_bulanan, avg_mttr, pivot
+    fill_important_nans(df)
+    # Kolom label -> category, mttr -> float32 (setelah NaN diisi 'Unknown')
+    apply_schema(df)
+    return df
 
 def fill_sub_root_cause(df):
     ensure_columns_exist(df, ['sub_root_cause', 'subcause', 'subcause2'])
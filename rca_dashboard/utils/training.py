@@ -0,0 +1,353 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder
+from sklearn.metrics import (
+    accuracy_score,
+    precision_score,
+    recall_score,
+    f1_score,
+)
+
+from .model_registry import frame_fingerprint, model_key
+from common.jobs import check_cancelled, fit_forest_in_steps
+
+# Backend model RCA: RandomForest di atas label encoding (default) atau
+# HistGradientBoosting yang membaca kolom kategori secara native
+RANDOM_FOREST = 'random_forest'
+HIST_GRADIENT_BOOSTING = 'hist_gradient_boosting'
+MODEL_BACKENDS = (RANDOM_FOREST, HIST_GRADIENT_BOOSTING)
+
+# Hyperparameter per backend; ikut menjadi bagian kunci registry model.
+# n_jobs=-1: pohon RandomForest dilatih di semua core (HistGradientBoosting memakai semua core lewat OpenMP)
+RCA_MODEL_PARAMS = {'n_estimators': 100, 'max_depth': 8, 'random_state': 42, 'n_jobs': -1}
+HGB_MODEL_PARAMS = {'max_iter': 200, 'learning_rate': 0.1, 'random_state': 42}
+MODEL_PARAMS = {RANDOM_FOREST: RCA_MODEL_PARAMS, HIST_GRADIENT_BOOSTING: HGB_MODEL_PARAMS}
+
+# Kolom dengan nilai unik lebih dari ini (misal sitename) dipangkas: nilai paling sering
+# dipertahankan, sisanya jadi OTHER_CATEGORY. 255 = batas kategori HistGradientBoosting.
+MAX_CATEGORIES = 255
+OTHER_CATEGORY = '(lainnya)'
+TARGET_COLUMN = 'rca'
+
+# Batas baris training default: sampel terstratifikasi per rca (None = seluruh data).
+# Akurasi & F1 praktis tidak berubah di atas ~200 ribu baris (cek dengan learning_curve).
+TRAINING_SAMPLE_ROWS = int(os.environ.get('RCA_TRAINING_SAMPLE_ROWS', 200_000))
+# Ukuran data train untuk learning curve (ukuran train penuh selalu ikut dihitung)
+LEARNING_CURVE_SIZES = (10_000, 25_000, 50_000, 100_000, 200_000, 400_000)
+
+
+def is_categorical_column(series):
+    return series.dtype == 'object' or isinstance(series.dtype, pd.CategoricalDtype) \
+        or pd.api.types.is_string_dtype(series)
+
+
+def fit_label_encoder(series):
+    """
+    Sama dengan LabelEncoder().fit_transform(series.astype(str)) (urutan kelas & kode identik),
+    tapi lewat hash pd.factorize alih-alih mengurutkan seluruh kolom string.
+    Return (kode, encoder).
+    """
+    codes, classes = pd.factorize(series.astype(str), sort=True, use_na_sentinel=False)
+    le = LabelEncoder()
+    le.classes_ = np.asarray(classes, dtype=object)
+    return codes, le
+
+
+def encode_categorical_columns(df):
+    """Encode semua kolom kategorikal dengan LabelEncoder dan kembalikan dict encoder."""
+    le_dict = {}
+    df_enc = df.copy()
+    for col in df_enc.columns:
+        if is_categorical_column(df_enc[col]):
+            df_enc[col], le_dict[col] = fit_label_encoder(df_enc[col])
+    return df_enc, le_dict
+
+
+def cap_categories(df, columns, max_categories=MAX_CATEGORIES):
+    """
+    Pangkas kolom kategorikal berkardinalitas tinggi: simpan max_categories - 1 nilai paling
+    sering, sisanya diganti OTHER_CATEGORY (nilai kosong tetap kosong).
+    Return (df, caps) dengan caps = {kolom: nilai yang dipertahankan} untuk kolom yang dipangkas.
+    """
+    caps = {}
+    if max_categories is None:
+        return df, caps
+    for col in columns:
+        if not is_categorical_column(df[col]):
+            continue
+        counts = df[col].value_counts()
+        if len(counts) <= max_categories:
+            continue
+        keep = counts.index[:max_categories - 1]
+        values = df[col].astype(object)
+        df[col] = values.where(values.isin(keep) | values.isna(), OTHER_CATEGORY)
+        caps[col] = [str(value) for value in keep]
+    return df, caps
+
+
+def to_native_categories(X):
+    """Kolom kategorikal jadi dtype category (tanpa kategori kosong) untuk HistGradientBoosting."""
+    for col in X.columns:
+        if is_categorical_column(X[col]):
+            X[col] = X[col].astype('category').cat.remove_unused_categories()
+    return X
+
+
+def stratified_sample_positions(y, max_rows, random_state=42):
+    """
+    Posisi baris sampel terstratifikasi: tiap kelas y diambil sebanding porsinya, minimal
+    2 baris per kelas (atau semuanya bila kurang) supaya split 80/20 tetap bisa distratifikasi.
+    Return array posisi terurut; semua posisi bila max_rows None atau len(y) <= max_rows.
+    """
+    n = len(y)
+    if max_rows is None or n <= max_rows:
+        return np.arange(n)
+    codes, _ = pd.factorize(pd.Series(y), use_na_sentinel=False)
+    counts = np.bincount(codes)
+    quota = np.maximum((counts * (max_rows / n)).astype(int), np.minimum(counts, 2))
+    # Acak sekali, lalu ambil `quota` baris pertama tiap kelas dalam urutan acak itu
+    order = np.random.default_rng(random_state).permutation(n)
+    shuffled = codes[order]
+    rank = pd.Series(shuffled).groupby(shuffled).cumcount().to_numpy()
+    return np.sort(order[rank < quota[shuffled]])
+
+
+def feature_columns(filtered_df):
+    """
+    Kolom fitur model RCA: semua kolom kecuali target, bulan_label dan kolom datetime.
+    Raise ValueError jika kolom 'rca' tidak ada.
+    """
+    if TARGET_COLUMN not in filtered_df.columns:
+        raise ValueError("Kolom 'rca' tidak ditemukan.")
+    datetime_cols = set(filtered_df.select_dtypes(
+        include=['datetime64[ns]', 'datetime64[ns, UTC]', 'datetime64']
+    ).columns)
+    return [
+        col for col in filtered_df.columns
+        if col not in datetime_cols and col not in (TARGET_COLUMN, 'bulan_label')
+    ]
+
+
+def prepare_training_data(filtered_df, backend=RANDOM_FOREST, max_categories=MAX_CATEGORIES):
+    """
+    Siapkan fitur dan target untuk model RCA (tanpa Streamlit).
+
+    Kolom berkardinalitas tinggi dipangkas ke max_categories (None = tanpa batas).
+    RandomForest: semua kolom kategorikal di-label-encode. HistGradientBoosting:
+    fitur kategorikal tetap dtype category (dibaca native), hanya target yang di-encode.
+
+    Return (X, y, labels, le_dict, caps). Raise ValueError jika kolom 'rca' tidak ada.
+    """
+    features = feature_columns(filtered_df)
+
+    # Hanya kolom fitur + target yang disalin & di-encode (kolom datetime tidak ikut)
+    df_enc = filtered_df.dropna(subset=[TARGET_COLUMN])[features + [TARGET_COLUMN]]
+    df_enc, caps = cap_categories(df_enc, features, max_categories)
+
+    if backend == HIST_GRADIENT_BOOSTING:
+        le_dict = {}
+        y, le_dict[TARGET_COLUMN] = fit_label_encoder(df_enc[TARGET_COLUMN])
+        y = pd.Series(y, index=df_enc.index, name=TARGET_COLUMN)
+        X = to_native_categories(df_enc[features])
+    else:
+        # Encode kolom kategorikal
+        df_enc, le_dict = encode_categorical_columns(df_enc)
+        X = df_enc[features]
+        y = df_enc[TARGET_COLUMN]
+
+    # Ambil label asli jika ada encoder 'rca', jika tidak ambil langsung
+    labels = le_dict['rca'].classes_ if 'rca' in le_dict else sorted(filtered_df['rca'].dropna().unique())
+    return X, y, labels, le_dict, caps
+
+
+def training_data_problem(X, y):
+    """
+    Cek kelayakan data untuk training.
+    Return None jika data layak, atau (pesan, detail) jika tidak.
+    """
+    if len(X) < 10:
+        return "⚠️ Data terlalu sedikit untuk pelatihan model yang baik.", None
+    class_counts = y.value_counts()
+    if len(class_counts) < 2:
+        return "⚠️ Data hanya memiliki satu kelas RCA.", None
+    if (class_counts < 2).any():
+        return "❗ Beberapa kelas RCA hanya memiliki 1 data. Tidak cukup untuk stratifikasi.", class_counts[class_counts < 2]
+    return None
+
+
+def compute_metrics(y_test, y_pred):
+    return {
+        'Accuracy': accuracy_score(y_test, y_pred),
+        'Precision (Weighted)': precision_score(y_test, y_pred, average='weighted', zero_division=0),
+        'Recall (Weighted)': recall_score(y_test, y_pred, average='weighted', zero_division=0),
+        'F1-Score (Weighted)': f1_score(y_test, y_pred, average='weighted', zero_division=0),
+    }
+
+
+def check_backend(backend):
+    if backend not in MODEL_BACKENDS:
+        raise ValueError(f"Backend model tidak dikenal: {backend} (pilihan: {', '.join(MODEL_BACKENDS)})")
+
+
+def fit_estimator(X_train, y_train, backend, params):
+    """Latih estimator backend; RandomForest bertahap (bisa dibatalkan) bila berjalan sebagai job."""
+    if backend == HIST_GRADIENT_BOOSTING:
+        model = HistGradientBoostingClassifier(categorical_features='from_dtype', **params)
+        return model.fit(X_train, y_train)
+    return fit_forest_in_steps(RandomForestClassifier(**params), X_train, y_train)
+
+
+def fit_rca_model(X, y, backend=RANDOM_FOREST, **params):
+    """
+    Split 80/20 terstratifikasi lalu latih model backend (default hyperparameter dari
+    MODEL_PARAMS). RandomForest dilatih bertahap bila berjalan sebagai job, supaya bisa
+    dibatalkan. Return dict: model, y_test, y_pred, metrics.
+    """
+    check_backend(backend)
+    params = {**MODEL_PARAMS[backend], **params}
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=params['random_state'], stratify=y
+    )
+
+    model = fit_estimator(X_train, y_train, backend, params)
+    y_pred = model.predict(X_test)
+
+    return {
+        'model': model,
+        'y_test': y_test,
+        'y_pred': y_pred,
+        'metrics': compute_metrics(y_test, y_pred),
+    }
+
+
+def model_options(backend=RANDOM_FOREST, max_categories=MAX_CATEGORIES, params=None, max_rows=TRAINING_SAMPLE_ROWS):
+    """Semua opsi yang menentukan hasil training: backend, batas kategori, batas sampel & hyperparameter."""
+    check_backend(backend)
+    return {
+        'backend': backend, 'max_categories': max_categories, 'max_rows': max_rows,
+        **MODEL_PARAMS[backend], **(params or {}),
+    }
+
+
+def estimator_params(options):
+    return {k: v for k, v in options.items() if k not in ('backend', 'max_categories', 'max_rows')}
+
+
+def _registry_key(filtered_df, features, dataset_fingerprint, filter_spec, options):
+    if dataset_fingerprint is None:
+        dataset_fingerprint = frame_fingerprint(filtered_df[features + [TARGET_COLUMN]])
+    return model_key(dataset_fingerprint, filter_spec, features, options), dataset_fingerprint
+
+
+def lookup_rca_model(filtered_df, registry, dataset_fingerprint=None, filter_spec=None,
+                     backend=RANDOM_FOREST, max_categories=MAX_CATEGORIES, params=None,
+                     max_rows=TRAINING_SAMPLE_ROWS):
+    """Hasil training dari registry untuk data + filter + opsi ini (tanpa melatih), atau None."""
+    options = model_options(backend, max_categories, params, max_rows)
+    key, _ = _registry_key(filtered_df, feature_columns(filtered_df), dataset_fingerprint, filter_spec, options)
+    entry = registry.get(key)
+    return None if entry is None else {**entry, 'from_registry': True}
+
+
+def load_or_fit_rca_model(filtered_df, registry=None, dataset_fingerprint=None, filter_spec=None,
+                          backend=RANDOM_FOREST, max_categories=MAX_CATEGORIES, params=None,
+                          max_rows=TRAINING_SAMPLE_ROWS, force_retrain=False):
+    """
+    Ambil model RCA dari registry bila kuncinya cocok, jika tidak latih lalu simpan.
+
+    dataset_fingerprint: hash isi data sumber (misal hash file upload); jika None
+    dihitung dari kolom fitur + target filtered_df. filter_spec: dict filter yang
+    menghasilkan filtered_df dari data sumber. backend: RANDOM_FOREST atau
+    HIST_GRADIENT_BOOSTING; max_categories: batas nilai unik per kolom (None = tanpa batas);
+    params: hyperparameter yang menimpa MODEL_PARAMS[backend]. max_rows: model dilatih &
+    dinilai pada sampel terstratifikasi per rca sebesar ini; None = seluruh data.
+
+    Return (result, problem). result: dict model, le_dict, caps, labels, y_test, y_pred,
+    metrics, sample_rows, total_rows, meta, from_registry. problem: (pesan, detail) jika
+    data tidak layak dilatih.
+    """
+    options = model_options(backend, max_categories, params, max_rows)
+    features = feature_columns(filtered_df)
+    key = None
+    if registry is not None:
+        key, dataset_fingerprint = _registry_key(filtered_df, features, dataset_fingerprint, filter_spec, options)
+        if not force_retrain:
+            entry = registry.get(key)
+            if entry is not None:
+                return {**entry, 'from_registry': True}, None
+
+    positions = stratified_sample_positions(filtered_df[TARGET_COLUMN], max_rows, options['random_state'])
+    training_df = filtered_df.iloc[positions] if len(positions) < len(filtered_df) else filtered_df
+
+    X, y, labels, le_dict, caps = prepare_training_data(training_df, backend, max_categories)
+    problem = training_data_problem(X, y)
+    if problem is not None:
+        return None, problem
+
+    check_cancelled()
+    result = fit_rca_model(X, y, backend=backend, **estimator_params(options))
+    result.update({
+        'labels': labels, 'le_dict': le_dict, 'caps': caps, 'features': features, 'params': options,
+        'sample_rows': len(training_df), 'total_rows': len(filtered_df),
+    })
+    if registry is not None:
+        result['meta'] = registry.put(key, result, meta={
+            'dataset': dataset_fingerprint,
+            'filters': filter_spec,
+            'features': features,
+            'params': options,
+            'capped_columns': sorted(caps),
+            'train_rows': len(X) - len(result['y_test']),
+            'total_rows': len(filtered_df),
+            'metrics': result['metrics'],
+        })
+    result['from_registry'] = False
+    return result, None
+
+
+def _score_train_size(X_train, y_train, X_test, y_test, size, backend, params):
+    positions = stratified_sample_positions(y_train, size, params['random_state'])
+    start = time.perf_counter()
+    model = fit_estimator(X_train.iloc[positions], y_train.iloc[positions], backend, params)
+    fit_seconds = time.perf_counter() - start
+    metrics = compute_metrics(y_test, model.predict(X_test))
+    return {'train_rows': len(positions), **metrics, 'fit_seconds': round(fit_seconds, 2)}
+
+
+def learning_curve(filtered_df, sizes=LEARNING_CURVE_SIZES, backend=RANDOM_FOREST,
+                   max_categories=MAX_CATEGORIES, params=None, n_jobs=-1):
+    """
+    Metrik model per ukuran data train untuk membuktikan batas sampel tidak menurunkan metrik.
+
+    Data penuh di-split 80/20 terstratifikasi sekali; tiap ukuran dilatih pada sampel
+    terstratifikasi dari bagian train dan dinilai pada test set yang sama. Ukuran-ukuran
+    dilatih paralel (proses joblib, n_jobs); RandomForest di tiap proses memakai satu core.
+    Return DataFrame: train_rows, metrik (seperti compute_metrics), fit_seconds.
+    Raise ValueError jika data tidak layak dilatih.
+    """
+    options = model_options(backend, max_categories, params, max_rows=None)
+    params = estimator_params(options)
+    if backend == RANDOM_FOREST:
+        params['n_jobs'] = 1
+
+    X, y, _, _, _ = prepare_training_data(filtered_df, backend, max_categories)
+    problem = training_data_problem(X, y)
+    if problem is not None:
+        raise ValueError(problem[0])
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=params['random_state'], stratify=y
+    )
+
+    train_sizes = sorted({size for size in sizes if size < len(X_train)} | {len(X_train)})
+    check_cancelled()
+    rows = Parallel(n_jobs=n_jobs)(
+        delayed(_score_train_size)(X_train, y_train, X_test, y_test, size, backend, params)
+        for size in train_sizes
+    )
+    return pd.DataFrame(rows)
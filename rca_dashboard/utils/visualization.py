@@ -34,21 +34,21 @@ def show_visualizations(filtered_df, trend_bulanan, avg_mttr, pivot, total_bulan
     def show_combined_trend(filtered_df):
         # Prepare data untuk ketiga tipe trend
         trend_rca = (
-            filtered_df.groupby(['bulan_label', 'bulan_sort', 'rca'])
+            filtered_df.groupby(['bulan_label', 'bulan_sort', 'rca'], observed=True)
             .size().reset_index(name='count')
             .sort_values('bulan_sort')
         )
         trend_rca['date'] = pd.to_datetime(trend_rca['bulan_label'], format='%b %Y')
 
         trend_circle = (
-            filtered_df.groupby(['bulan_label', 'bulan_sort', 'circle'])
+            filtered_df.groupby(['bulan_label', 'bulan_sort', 'circle'], observed=True)
             .size().reset_index(name='count')
             .sort_values('bulan_sort')
         )
         trend_circle['date'] = pd.to_datetime(trend_circle['bulan_label'], format='%b %Y')
 
         trend_severity = (
-            filtered_df.groupby(['bulan_label', 'bulan_sort', 'severity'])
+            filtered_df.groupby(['bulan_label', 'bulan_sort', 'severity'], observed=True)
             .size().reset_index(name='count')
             .sort_values('bulan_sort')
         )
@@ -188,7 +188,7 @@ def show_visualizations(filtered_df, trend_bulanan, avg_mttr, pivot, total_bulan
         sitename_counts.columns = ['Sitename', 'Jumlah Kejadian']
 
         # Buat mapping sitename ke circle (ambil circle pertama dari data yang sudah difilter)
-        sitename_to_circle = circle_filtered_df.groupby('sitename')['circle'].first().to_dict()
+        sitename_to_circle = circle_filtered_df.groupby('sitename', observed=True)['circle'].first().to_dict()
 
         # Tambahkan kolom 'Sitename (Circle)'
         sitename_counts['Sitename (Circle)'] = sitename_counts['Sitename'].apply(
@@ -199,6 +199,7 @@ def show_visualizations(filtered_df, trend_bulanan, avg_mttr, pivot, total_bulan
         def bulan_label_dengan_count(sitename):
             df_site = circle_filtered_df[circle_filtered_df['sitename'] == sitename]
             bulan_counts = df_site['bulan_label'].value_counts()
+            bulan_counts = bulan_counts[bulan_counts > 0]  # category: bulan lain ikut muncul dengan 0
             sorted_bulan = sorted(bulan_counts.index, key=lambda b: pd.to_datetime(b, format='%b %Y'))
             labels = [f"{bulan} ({bulan_counts[bulan]})" for bulan in sorted_bulan]
             return ', '.join(labels)
@@ -3,13 +3,14 @@
 import streamlit as st
 import matplotlib.pyplot as plt
 import seaborn as sns
+from common.cube import count_by
 
-def show_distribution(filtered_df):
+def show_distribution(cube):
     """
-    Menampilkan distribusi RCA, Circle, atau Severity dari dataframe yang telah difilter.
+    Menampilkan distribusi RCA, Circle, atau Severity dari data yang telah difilter.
 
     Parameters:
-    - filtered_df: pd.DataFrame, dataframe yang sudah difilter
+    - cube: pd.DataFrame, cube agregasi hasil common.cube.build_cube (bukan data mentah)
     """
 
     st.subheader("📌 Distribusi RCA, Circle, atau Severity")
@@ -23,9 +24,11 @@ def show_distribution(filtered_df):
 
     fig, ax = plt.subplots(figsize=(10, 5))
 
-    order = filtered_df[kolom].value_counts().index
+    counts = count_by(cube, kolom)
+    counts = counts[counts > 0]
+    order = [str(value) for value in counts.index]
 
-    countplot = sns.countplot(data=filtered_df, x=kolom, order=order, ax=ax)
+    countplot = sns.barplot(x=order, y=counts.to_numpy(), order=order, ax=ax)
     ax.set_xlabel(kolom.capitalize())
     ax.set_ylabel("Jumlah Kasus")
     ax.set_title(f"Distribusi {pilihan}")
@@ -30,26 +30,22 @@ def show_sitename(filtered_df):
         st.info("Tidak ada site dengan kejadian ≥ 3.")
         return
 
-    sitename_to_circle = circle_filtered_df.groupby('sitename')['circle'].first().to_dict()
+    sitename_to_circle = circle_filtered_df.groupby('sitename', observed=True)['circle'].first().to_dict()
 
     sitename_counts['Sitename (Circle)'] = sitename_counts['Sitename'].apply(
         lambda x: f"{x} ({sitename_to_circle.get(x, '-')})"
     )
 
-    def bulan_label_dengan_count(sitename):
-        df_site = circle_filtered_df[circle_filtered_df['sitename'] == sitename]
-        bulan_counts = df_site['bulan_label'].value_counts()
-        try:
-            sorted_bulan = sorted(
-                bulan_counts.index,
-                key=lambda b: pd.to_datetime(b, format='%b %Y', errors='coerce') or pd.Timestamp('1970-01-01')
-            )
-        except Exception:
-            sorted_bulan = list(bulan_counts.index)
-        labels = [f"{bulan} ({bulan_counts[bulan]})" for bulan in sorted_bulan]
-        return ', '.join(labels)
-
-    sitename_counts['Bulan Label'] = sitename_counts['Sitename'].apply(bulan_label_dengan_count)
+    # Rincian bulan per site dalam satu groupby, diurutkan lewat kunci bulan_sort
+    site_rows = circle_filtered_df[circle_filtered_df['sitename'].isin(sitename_counts['Sitename'])]
+    bulan_counts = (
+        site_rows.groupby(['sitename', 'bulan_sort', 'bulan_label'], observed=True)
+        .size().reset_index(name='count')
+        .sort_values(['sitename', 'bulan_sort'])
+    )
+    bulan_counts['teks'] = bulan_counts['bulan_label'].astype(str) + ' (' + bulan_counts['count'].astype(str) + ')'
+    bulan_per_site = bulan_counts.groupby('sitename', observed=True)['teks'].agg(', '.join)
+    sitename_counts['Bulan Label'] = sitename_counts['Sitename'].astype(str).map(bulan_per_site).fillna('')
 
     all_sites = sitename_counts['Sitename (Circle)'].tolist()
     selected_sites = st.multiselect(
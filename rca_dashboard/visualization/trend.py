@@ -2,35 +2,22 @@ import streamlit as st
 import matplotlib.pyplot as plt
 import pandas as pd
 import matplotlib.dates as mdates
+from common.cube import trend_by
 
-def show_trend(filtered_df):
+def show_trend(cube):
     """
     Menampilkan grafik trend distribusi per bulan berdasarkan pilihan: RCA, Circle, atau Severity.
     Digunakan sebagai bagian dari dashboard visualisasi.
+
+    Parameters:
+    - cube: pd.DataFrame, cube agregasi hasil common.cube.build_cube (bukan data mentah)
     """
     st.subheader("📈 Trend Distribusi per Bulan")
 
-    # Siapkan data trend per kategori
-    trend_rca = (
-        filtered_df.groupby(['bulan_label', 'bulan_sort', 'rca'])
-        .size().reset_index(name='count')
-        .sort_values('bulan_sort')
-    )
-    trend_rca['date'] = pd.to_datetime(trend_rca['bulan_label'], format='%b %Y')
-
-    trend_circle = (
-        filtered_df.groupby(['bulan_label', 'bulan_sort', 'circle'])
-        .size().reset_index(name='count')
-        .sort_values('bulan_sort')
-    )
-    trend_circle['date'] = pd.to_datetime(trend_circle['bulan_label'], format='%b %Y')
-
-    trend_severity = (
-        filtered_df.groupby(['bulan_label', 'bulan_sort', 'severity'])
-        .size().reset_index(name='count')
-        .sort_values('bulan_sort')
-    )
-    trend_severity['date'] = pd.to_datetime(trend_severity['bulan_label'], format='%b %Y')
+    # Siapkan data trend per kategori (diturunkan dari cube, bukan groupby ke data mentah)
+    trend_rca = trend_by(cube, 'rca')
+    trend_circle = trend_by(cube, 'circle')
+    trend_severity = trend_by(cube, 'severity')
 
     # Dropdown untuk memilih kategori tren
     pilihan = st.selectbox(
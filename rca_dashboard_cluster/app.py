@@ -1,29 +1,44 @@
 import streamlit as st
 import pandas as pd
 from utils.preprocessing import load_and_clean_data
+from common.cache import load_cached, session_cached, file_content_hash
+from common import cube as rca_cube
+from common.schema import drop_unused_categories
+from common.dates import known_month, month_abbr
 from utils.visualization import show_visualizations
 from utils.modeling import show_model_results
 from utils.exporter import generate_excel_output
+from common.diagnostics import StageRecorder, show_diagnostics, stage, timed
 
 st.set_page_config(page_title="RCA Dashboard", layout="wide")
 st.title("📊 Dashboard Root Cause Analysis (RCA) by Salachudin Emir")
 
-uploaded_file = st.file_uploader("Unggah file data (CSV / Excel)", type=["csv", "xls", "xlsx"])
+# Waktu, jumlah baris & memori tiap tahap rerun ini (panel diagnostik + log JSON lines)
+diagnostics = StageRecorder('rca_dashboard_cluster').activate()
+
+uploaded_file = st.file_uploader("Unggah file data (CSV / Excel / Parquet)", type=["csv", "xls", "xlsx", "parquet", "feather"])
 
 if uploaded_file:
     try:
-        # Load & bersihkan data awal
-        df, filtered_df, trend_bulanan, total_bulanan, avg_mttr, pivot = load_and_clean_data(uploaded_file)
+        # Load & bersihkan data awal (di-cache per isi file, klik filter tidak memparsing ulang)
+        df, filtered_df, trend_bulanan, total_bulanan, avg_mttr, pivot = timed(
+            'load', load_cached, uploaded_file, load_and_clean_data
+        )
     except Exception as e:
         st.error(f"Terjadi kesalahan saat memproses file: {e}")
+        show_diagnostics(diagnostics, expanded=True)
         st.stop()
 
-    # Pastikan kolom 'bulan_label' ada dan ubah ke datetime
+    # Cube agregasi (bulan x rca x severity) dibangun sekali per isi file; ganti filter cukup memotong cube
+    base_cube = session_cached('cube', uploaded_file, lambda: timed('build_cube', rca_cube.build_cube, filtered_df))
+
+    # Pastikan kolom 'bulan_label' ada; tanggal bulan diambil dari kunci bulan_sort (tanpa parsing label)
     if 'bulan_label' in filtered_df.columns:
-        filtered_df['bulan_label_dt'] = pd.to_datetime(filtered_df['bulan_label'], format='%b %Y', errors='coerce')
-        # Ambil tahun dan bulan (nama bulan)
-        filtered_df['tahun'] = filtered_df['bulan_label_dt'].dt.year.astype('Int64')
-        filtered_df['bulan'] = filtered_df['bulan_label_dt'].dt.strftime('%b')
+        with stage('prepare_frame', rows_in=len(filtered_df)):
+            filtered_df['bulan_label_dt'] = known_month(filtered_df['bulan_sort'])
+            # Ambil tahun dan bulan (nama bulan)
+            filtered_df['tahun'] = filtered_df['bulan_label_dt'].dt.year.astype('Int64')
+            filtered_df['bulan'] = month_abbr(filtered_df['bulan_label_dt'])
     else:
         st.warning("Kolom 'bulan_label' tidak ditemukan di data.")
         st.stop()
@@ -56,123 +71,139 @@ if uploaded_file:
     #     st.warning("⚠️ Tidak ada data setelah filter Bulan diterapkan.")
     #     st.stop()
 
-    # Pastikan ada kolom datetime dari bulan_label
-    filtered_df['bulan_label_dt'] = pd.to_datetime(filtered_df['bulan_label'], format='%b %Y', errors='coerce')
+    with stage('filter:bulan_label', rows_in=len(filtered_df)) as timing:
+        # Buat dataframe unik bulan_label dengan kolom datetime
+        bulan_label_df = filtered_df[['bulan_label', 'bulan_label_dt']].drop_duplicates()
 
-    # Buat dataframe unik bulan_label dengan kolom datetime
-    bulan_label_df = filtered_df[['bulan_label', 'bulan_label_dt']].drop_duplicates()
+        # Urutkan dari terlama ke terbaru berdasarkan datetime
+        bulan_label_df = bulan_label_df.sort_values('bulan_label_dt')
 
-    # Urutkan dari terlama ke terbaru berdasarkan datetime
-    bulan_label_df = bulan_label_df.sort_values('bulan_label_dt')
+        # Ambil list bulan_label yang sudah terurut
+        available_bulan_label = bulan_label_df['bulan_label'].tolist()
 
-    # Ambil list bulan_label yang sudah terurut
-    available_bulan_label = bulan_label_df['bulan_label'].tolist()
+        # Checkbox untuk Select All
+        select_all_bulan = st.checkbox("Pilih Semua Bulan & Tahun", value=True)
 
-    # Checkbox untuk Select All
-    select_all_bulan = st.checkbox("Pilih Semua Bulan & Tahun", value=True)
-
-    if select_all_bulan:
-        selected_bulan_label = st.multiselect(
-            "Filter berdasarkan Bulan & Tahun (contoh: Jan 2024):",
-            options=available_bulan_label,
-            default=available_bulan_label  # semua otomatis terpilih
-        )
-    else:
-        selected_bulan_label = st.multiselect(
-            "Filter berdasarkan Bulan & Tahun (contoh: Jan 2024):",
-            options=available_bulan_label,
-            default=[]  # tidak ada yang dipilih defaultnya
-        )
+        if select_all_bulan:
+            selected_bulan_label = st.multiselect(
+                "Filter berdasarkan Bulan & Tahun (contoh: Jan 2024):",
+                options=available_bulan_label,
+                default=available_bulan_label  # semua otomatis terpilih
+            )
+        else:
+            selected_bulan_label = st.multiselect(
+                "Filter berdasarkan Bulan & Tahun (contoh: Jan 2024):",
+                options=available_bulan_label,
+                default=[]  # tidak ada yang dipilih defaultnya
+            )
 
-    filtered_df = filtered_df[filtered_df['bulan_label'].isin(selected_bulan_label)]
+        filtered_df = filtered_df[filtered_df['bulan_label'].isin(selected_bulan_label)]
+        timing['rows_out'] = len(filtered_df)
+        selections = {'bulan_label': selected_bulan_label}
 
     if filtered_df.empty:
         st.warning("⚠️ Tidak ada data setelah filter Bulan & Tahun diterapkan.")
         st.stop()
 
     # Filter Severity
-    if 'severity' in filtered_df.columns:
-        available_severities = sorted(filtered_df['severity'].dropna().unique())
+    with stage('filter:severity', rows_in=len(filtered_df)) as timing:
+        if 'severity' in filtered_df.columns:
+            available_severities = sorted(filtered_df['severity'].dropna().unique())
         
-        select_all_severity = st.checkbox("Pilih Semua Severity", value=True)
+            select_all_severity = st.checkbox("Pilih Semua Severity", value=True)
         
-        if select_all_severity:
-            selected_severity = st.multiselect(
-                "Filter berdasarkan Severity:",
-                options=available_severities,
-                default=available_severities
-            )
-        else:
-            selected_severity = st.multiselect(
-                "Filter berdasarkan Severity:",
-                options=available_severities,
-                default=[]
-            )
+            if select_all_severity:
+                selected_severity = st.multiselect(
+                    "Filter berdasarkan Severity:",
+                    options=available_severities,
+                    default=available_severities
+                )
+            else:
+                selected_severity = st.multiselect(
+                    "Filter berdasarkan Severity:",
+                    options=available_severities,
+                    default=[]
+                )
         
-        filtered_df = filtered_df[filtered_df['severity'].isin(selected_severity)]
+            filtered_df = filtered_df[filtered_df['severity'].isin(selected_severity)]
+            timing['rows_out'] = len(filtered_df)
+            selections['severity'] = selected_severity
 
-        if filtered_df.empty:
-            st.warning("⚠️ Tidak ada data setelah filter severity diterapkan.")
+            if filtered_df.empty:
+                st.warning("⚠️ Tidak ada data setelah filter severity diterapkan.")
+                st.stop()
+        else:
+            st.warning("Kolom 'severity' tidak ditemukan di data.")
             st.stop()
-    else:
-        st.warning("Kolom 'severity' tidak ditemukan di data.")
-        st.stop()
 
     # Filter RCA
-    if 'rca' in filtered_df.columns:
-        available_rca = sorted(filtered_df['rca'].dropna().unique())
+    with stage('filter:rca', rows_in=len(filtered_df)) as timing:
+        if 'rca' in filtered_df.columns:
+            available_rca = sorted(filtered_df['rca'].dropna().unique())
         
-        select_all_rca = st.checkbox("Pilih Semua RCA", value=True)
+            select_all_rca = st.checkbox("Pilih Semua RCA", value=True)
         
-        if select_all_rca:
-            selected_rca = st.multiselect(
-                "Filter berdasarkan RCA:",
-                options=available_rca,
-                default=available_rca
-            )
-        else:
-            selected_rca = st.multiselect(
-                "Filter berdasarkan RCA:",
-                options=available_rca,
-                default=[]
-            )
+            if select_all_rca:
+                selected_rca = st.multiselect(
+                    "Filter berdasarkan RCA:",
+                    options=available_rca,
+                    default=available_rca
+                )
+            else:
+                selected_rca = st.multiselect(
+                    "Filter berdasarkan RCA:",
+                    options=available_rca,
+                    default=[]
+                )
         
-        filtered_df = filtered_df[filtered_df['rca'].isin(selected_rca)]
+            filtered_df = filtered_df[filtered_df['rca'].isin(selected_rca)]
+            timing['rows_out'] = len(filtered_df)
+            selections['rca'] = selected_rca
 
-        if filtered_df.empty:
-            st.warning("⚠️ Tidak ada data setelah filter RCA diterapkan.")
+            if filtered_df.empty:
+                st.warning("⚠️ Tidak ada data setelah filter RCA diterapkan.")
+                st.stop()
+        else:
+            st.warning("Kolom 'rca' tidak ditemukan di data.")
             st.stop()
-    else:
-        st.warning("Kolom 'rca' tidak ditemukan di data.")
-        st.stop()
 
+    with stage('aggregate', rows_in=len(filtered_df)):
+        # Buang kategori yang sudah tidak muncul setelah filter
+        filtered_df = drop_unused_categories(filtered_df)
 
-    # Tambahkan kolom total_count jika belum ada
-    if 'total_count' not in filtered_df.columns:
-        filtered_df['total_count'] = 1
+        # Tambahkan kolom total_count jika belum ada
+        if 'total_count' not in filtered_df.columns:
+            filtered_df['total_count'] = 1
 
-    # Buat kolom quarter
-    filtered_df['quarter'] = filtered_df['bulan_label_dt'].dt.to_period('Q').dt.to_timestamp()
+        # Buat kolom quarter
+        filtered_df['quarter'] = filtered_df['bulan_label_dt'].dt.to_period('Q').dt.to_timestamp()
 
-    # Hitung ulang agregasi berdasarkan data yang sudah difilter
-    trend_bulanan = filtered_df.groupby(['bulan_label', 'rca']).size().reset_index(name='count')
-    avg_mttr = filtered_df.groupby('rca')['mttr'].mean()
-    pivot = filtered_df.pivot_table(index='rca', columns='severity', values='total_count', aggfunc='sum', fill_value=0)
-    total_bulanan = filtered_df.groupby(['quarter', 'bulan_label']).agg({'total_count': 'sum'}).reset_index()
+        # Hitung ulang agregasi dari cube yang dipotong sesuai filter (tanpa groupby ke data mentah)
+        cube = rca_cube.slice_cube(base_cube, selections)
+        trend_bulanan = rca_cube.trend_bulanan(cube)
+        avg_mttr = rca_cube.avg_mttr_by(cube, 'rca').sort_index()
+        pivot = rca_cube.pivot_by(cube, 'rca', 'severity')
+        total_bulanan = rca_cube.total_bulanan(cube)
 
-    # Visualisasi
-    show_visualizations(filtered_df, trend_bulanan, avg_mttr, pivot, total_bulanan)
+    # Visualisasi (data mentah hanya untuk sitename); tiap chart tercatat sebagai chart:<nama>
+    timed('charts', show_visualizations, filtered_df, trend_bulanan, avg_mttr, pivot, total_bulanan, cube)
 
-    # Modeling
-    y_test, y_pred = show_model_results(filtered_df)
+    # Modeling: training berjalan sebagai job latar belakang (chart di atas sudah tampil);
+    # y_test / y_pred bernilai None sampai job selesai, lalu app di-rerun otomatis
+    y_test, y_pred = timed(
+        'model_fit', show_model_results, filtered_df,
+        dataset_fingerprint=file_content_hash(uploaded_file), filter_spec=selections
+    )
 
     # Export Excel
     if y_test is not None and y_pred is not None:
-        excel_output = generate_excel_output(
+        excel_output = timed(
+            'export_excel', generate_excel_output,
             filtered_df, trend_bulanan, total_bulanan, avg_mttr, pivot, y_test, y_pred
         )
     else:
-        excel_output = generate_excel_output(
+        excel_output = timed(
+            'export_excel', generate_excel_output,
             filtered_df, trend_bulanan, total_bulanan, avg_mttr, pivot, None, None
         )
 
@@ -183,5 +214,7 @@ if uploaded_file:
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     )
 
+    show_diagnostics(diagnostics)
+
 else:
     st.info("Silakan unggah file data terlebih dahulu.")
@@ -6,13 +6,25 @@ from sklearn.metrics import classification_report, confusion_matrix
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
+from common.diagnostics import stage
+from common.jobs import check_cancelled, get_executor, session_job, job_signature, wait_for_job
 
-def show_model_results(filtered_df):
+# Slot job training model di session_state (satu job aktif per sesi)
+MODEL_JOB_SLOT = 'cluster_model'
+
+
+def fit_cluster_model(filtered_df):
+    """
+    Encode fitur lalu latih DecisionTree untuk memprediksi 'rca' (tanpa Streamlit,
+    bisa dijalankan sebagai job latar belakang).
+
+    Return (result, problem). result: dict model, y_test, y_pred, labels.
+    problem: (pesan, detail) jika data tidak layak dilatih.
+    """
     df_enc = filtered_df.copy()
 
-    # Cek duplikat kolom
+    # Kolom duplikat: ambil kemunculan pertama
     if df_enc.columns.duplicated().any():
-        st.warning("Ada kolom duplikat, akan diubah namanya.")
         df_enc = df_enc.loc[:, ~df_enc.columns.duplicated()]
 
     # Drop kolom datetime
@@ -23,7 +35,9 @@ def show_model_results(filtered_df):
     # Encode semua kolom object atau kategorikal
     le_dict = {}
     for col in df_enc.columns:
-        if pd.api.types.is_object_dtype(df_enc[col]) or pd.api.types.is_categorical_dtype(df_enc[col]):
+        check_cancelled()
+        if pd.api.types.is_object_dtype(df_enc[col]) or pd.api.types.is_string_dtype(df_enc[col]) \
+                or isinstance(df_enc[col].dtype, pd.CategoricalDtype):
             le = LabelEncoder()
             df_enc[col] = le.fit_transform(df_enc[col].astype(str))
             le_dict[col] = le
@@ -35,39 +49,71 @@ def show_model_results(filtered_df):
 
     # Cek object di fitur
     if X.select_dtypes(include=['object']).shape[1] > 0:
-        st.error("Masih ada kolom bertipe object di fitur.")
-        st.write(X.select_dtypes(include=['object']).columns.tolist())
-        return None, None
+        return None, ("Masih ada kolom bertipe object di fitur.", X.select_dtypes(include=['object']).columns.tolist())
 
     if len(df_enc) < 5:
-        st.warning("⚠️ Data terlalu sedikit untuk pelatihan model.")
-        return None, None
+        return None, ("⚠️ Data terlalu sedikit untuk pelatihan model.", None)
 
     # Validasi stratifikasi: setidaknya 2 data per kelas
     class_counts = y.value_counts()
     if (class_counts < 2).any():
-        st.warning("❗ Beberapa kelas RCA hanya memiliki 1 data. Tidak cukup untuk pelatihan model.")
-        st.write(class_counts[class_counts < 2])
-        return None, None
+        return None, ("❗ Beberapa kelas RCA hanya memiliki 1 data. Tidak cukup untuk pelatihan model.",
+                      class_counts[class_counts < 2])
 
     # Train model
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.2, random_state=42, stratify=y
     )
 
-    model = DecisionTreeClassifier(max_depth=4, random_state=42)
-    model.fit(X_train, y_train)
+    check_cancelled()
+    with stage('fit', rows_in=len(X_train)):
+        model = DecisionTreeClassifier(max_depth=4, random_state=42)
+        model.fit(X_train, y_train)
+
+        y_pred = model.predict(X_test)
 
-    y_pred = model.predict(X_test)
+    labels = le_dict['rca'].classes_ if 'rca' in le_dict else sorted(filtered_df['rca'].unique())
+    return {'model': model, 'y_test': y_test, 'y_pred': y_pred, 'labels': labels}, None
+
+
+def show_model_results(filtered_df, dataset_fingerprint=None, filter_spec=None):
+    """
+    Latih model sebagai job latar belakang dan tampilkan hasilnya saat job selesai.
+    Job dipakai ulang selama file (dataset_fingerprint) & filter sama; ganti filter
+    membatalkan job yang basi. Return (y_test, y_pred), atau (None, None) selama menunggu.
+    """
+    if filtered_df.columns.duplicated().any():
+        st.warning("Ada kolom duplikat, akan diubah namanya.")
+
+    signature = job_signature(dataset_fingerprint, filter_spec, list(filtered_df.columns), len(filtered_df))
+    job = session_job(
+        get_executor('rca_dashboard_cluster'), MODEL_JOB_SLOT, signature,
+        fit_cluster_model, filtered_df.copy(deep=False)
+    )
+    if not job.done():
+        wait_for_job(job, "Training model")
+        return None, None
+    if job.status != 'done':
+        st.error(f"Gagal melatih model (job `{job.id}`, {job.status}): {job.error}")
+        return None, None
+
+    result, problem = job.result
+    if problem is not None:
+        message, detail = problem
+        st.warning(message)
+        if detail is not None:
+            st.write(detail)
+        return None, None
+
+    y_test, y_pred, labels = result['y_test'], result['y_pred'], result['labels']
 
     # Classification Report
     st.text("📄 Classification Report:")
     report = classification_report(y_test, y_pred)
     st.text(report)
-    
+
     # Confusion_matrix
     cm = confusion_matrix(y_test, y_pred)
-    labels = le_dict['rca'].classes_ if 'rca' in le_dict else sorted(filtered_df['rca'].unique())
 
     fig, ax = plt.subplots(figsize=(8, 6))
     sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', xticklabels=labels, yticklabels=labels, ax=ax)
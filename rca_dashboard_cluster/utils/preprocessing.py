@@ -1,64 +1,81 @@
 import pandas as pd
 import os
+from common.file_probe import read_csv_fast
+from common.schema import apply_schema
+from common.dates import parse_datetime_column, month_start, month_labels
+from common.diagnostics import stage
 
 def load_and_clean_data(uploaded_file):
     file_ext = os.path.splitext(uploaded_file.name)[-1].lower()
 
-    if file_ext == ".csv":
-        try:
-            df = pd.read_csv(uploaded_file, sep=None, engine='python', encoding='utf-8')
-        except UnicodeDecodeError:
-            df = pd.read_csv(uploaded_file, sep=None, engine='python', encoding='latin1')
-    else:
-        df = pd.read_excel(uploaded_file)
+    with stage('read_file') as timing:
+        if file_ext == ".csv":
+            # Encoding, delimiter, baris header & desimal dideteksi sekali dari sampel file
+            df = read_csv_fast(uploaded_file)
+        elif file_ext == ".parquet":
+            df = pd.read_parquet(uploaded_file)
+        elif file_ext == ".feather":
+            df = pd.read_feather(uploaded_file)
+        else:
+            df = pd.read_excel(uploaded_file)
+        timing['rows_out'] = len(df)
 
-    df.columns = df.columns.str.strip().str.lower()
+    with stage('clean', rows_in=len(df)) as timing:
+        df.columns = df.columns.str.strip().str.lower()
 
-    selected_cols = ['createfaultfirstoccurtime', 'severity', 'mttr', 'sub_root_cause', 'subcause', 'slastatus', 'rca', 'sitename']
-    missing_cols = [col for col in selected_cols if col not in df.columns]
-    if missing_cols:
-        raise ValueError(f"Kolom berikut tidak ditemukan: {missing_cols}")
+        selected_cols = ['createfaultfirstoccurtime', 'severity', 'mttr', 'sub_root_cause', 'subcause', 'slastatus', 'rca', 'sitename']
+        missing_cols = [col for col in selected_cols if col not in df.columns]
+        if missing_cols:
+            raise ValueError(f"Kolom berikut tidak ditemukan: {missing_cols}")
 
-    df = df[selected_cols].copy()
-    df['createfaultfirstoccurtime'] = pd.to_datetime(df['createfaultfirstoccurtime'], dayfirst=True, errors='coerce')
-    df = df.dropna(subset=['createfaultfirstoccurtime'])
+        df = df[selected_cols].copy()
+        # Format tanggal dideteksi sekali per file, lalu diparsing per kelompok format
+        df['createfaultfirstoccurtime'] = parse_datetime_column(df['createfaultfirstoccurtime'])
+        df = df.dropna(subset=['createfaultfirstoccurtime'])
 
-    df['severity'] = df['severity'].astype(str).str.strip()
-    df['mttr'] = df['mttr'].astype(str).str.replace(',', '.', regex=False)
-    df['mttr'] = pd.to_numeric(df['mttr'], errors='coerce')
-    df = df.dropna(subset=['mttr'])
+        df['severity'] = df['severity'].astype(str).str.strip()
+        if not pd.api.types.is_numeric_dtype(df['mttr']):
+            df['mttr'] = df['mttr'].astype(str).str.replace(',', '.', regex=False)
+            df['mttr'] = pd.to_numeric(df['mttr'], errors='coerce')
+        df = df.dropna(subset=['mttr'])
 
-    df['bulan_label'] = df['createfaultfirstoccurtime'].dt.strftime('%b %Y')
-    df['bulan_sort'] = df['createfaultfirstoccurtime'].dt.to_period('M').dt.to_timestamp()
+        # bulan_sort adalah kunci bulan; bulan_label hanya untuk tampilan
+        df['bulan_sort'] = month_start(df['createfaultfirstoccurtime'])
+        df['bulan_label'] = month_labels(df['bulan_sort'])
+
+        # Kolom label -> category, mttr -> float32
+        apply_schema(df)
+        timing['rows_out'] = len(df)
 
     filtered_df = df.copy()
 
-    trend_bulanan = (
-        filtered_df.groupby(['bulan_label', 'bulan_sort', 'rca'])
-        .size().reset_index(name='count')
-        .sort_values(by='bulan_sort')
-    )
+    with stage('initial_aggregates', rows_in=len(filtered_df)):
+        trend_bulanan = (
+            filtered_df.groupby(['bulan_label', 'bulan_sort', 'rca'], observed=True)
+            .size().reset_index(name='count')
+            .sort_values(by='bulan_sort')
+        )
 
-    total_bulanan = (
-        filtered_df.groupby(['bulan_sort'])
-        .size().reset_index(name='total_count')
-        .sort_values(by='bulan_sort')
-    )
-    total_bulanan['year'] = total_bulanan['bulan_sort'].dt.year
-    total_bulanan['month'] = total_bulanan['bulan_sort'].dt.month
-    total_bulanan['total_count_last_year'] = total_bulanan.groupby('month')['total_count'].shift(1)
-    total_bulanan['yoy_growth_%'] = (
-        (total_bulanan['total_count'] - total_bulanan['total_count_last_year']) / total_bulanan['total_count_last_year']
-    ) * 100
-    total_bulanan['quarter'] = total_bulanan['bulan_sort'].dt.to_period('Q')
-    total_bulanan['total_count_last_quarter'] = total_bulanan['total_count'].shift(3)
-    total_bulanan['qoq_growth_%'] = (
-        (total_bulanan['total_count'] - total_bulanan['total_count_last_quarter']) / total_bulanan['total_count_last_quarter']
-    ) * 100
-    total_bulanan['bulan_label'] = total_bulanan['bulan_sort'].dt.strftime('%b %Y')
+        total_bulanan = (
+            filtered_df.groupby(['bulan_sort'])
+            .size().reset_index(name='total_count')
+            .sort_values(by='bulan_sort')
+        )
+        total_bulanan['year'] = total_bulanan['bulan_sort'].dt.year
+        total_bulanan['month'] = total_bulanan['bulan_sort'].dt.month
+        total_bulanan['total_count_last_year'] = total_bulanan.groupby('month')['total_count'].shift(1)
+        total_bulanan['yoy_growth_%'] = (
+            (total_bulanan['total_count'] - total_bulanan['total_count_last_year']) / total_bulanan['total_count_last_year']
+        ) * 100
+        total_bulanan['quarter'] = total_bulanan['bulan_sort'].dt.to_period('Q')
+        total_bulanan['total_count_last_quarter'] = total_bulanan['total_count'].shift(3)
+        total_bulanan['qoq_growth_%'] = (
+            (total_bulanan['total_count'] - total_bulanan['total_count_last_quarter']) / total_bulanan['total_count_last_quarter']
+        ) * 100
+        total_bulanan['bulan_label'] = month_labels(total_bulanan['bulan_sort'])
 
-    avg_mttr = filtered_df.groupby('rca')['mttr'].mean().sort_values(ascending=False)
+        avg_mttr = filtered_df.groupby('rca', observed=True)['mttr'].mean().sort_values(ascending=False)
 
-    pivot = filtered_df.pivot_table(index='severity', columns='rca', aggfunc='size', fill_value=0)
+        pivot = filtered_df.pivot_table(index='severity', columns='rca', aggfunc='size', fill_value=0, observed=True)
 
     return df, filtered_df, trend_bulanan, total_bulanan, avg_mttr, pivot
\ No newline at end of file
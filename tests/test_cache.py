@@ -0,0 +1,31 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip('streamlit')
+
+from common import cache
+from common.cache import FrameCache
+
+
+def _frame():
+    return pd.DataFrame({'rca': ['Power', None, 'HW'], 'mttr': [1.0, 2.0, 3.0]})
+
+
+@pytest.mark.parametrize('copy_on_write', [True, False])
+def test_changes_in_app_do_not_leak_into_cache(monkeypatch, copy_on_write):
+    monkeypatch.setattr(cache, 'copy_on_write_enabled', lambda: copy_on_write)
+    frame_cache = FrameCache()
+    df = _frame()
+    frame_cache.put('k', (df, df))
+    # Loader yang mengubah hasilnya setelah put tidak boleh mengubah isi cache
+    df.loc[0, 'mttr'] = 99.0
+
+    got, got_filtered = frame_cache.get('k')
+    assert got is got_filtered
+    got['rca'] = got['rca'].fillna('Unknown')
+    got.loc[1, 'mttr'] = -1.0
+    got['baru'] = 1
+
+    again, _ = frame_cache.get('k')
+    pd.testing.assert_frame_equal(again, _frame())
+
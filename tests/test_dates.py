@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+
+from common.dates import (UNKNOWN_MONTH, detect_date_formats, known_month, month_abbr, month_labels,
+                          month_start, parse_datetime_column)
+
+
+def test_mixed_formats_parse_per_value():
+    series = pd.Series([
+        '2024-01-15 08:30:00',
+        '03/04/2024 10:00',
+        '15-02-2024',
+        '05 Mar 2024 07:15',
+        '2024-01-15 08:30:00',
+        '12/31/2024 11:45 PM',
+    ], index=[10, 11, 12, 13, 14, 15], name='createtime')
+    result = parse_datetime_column(series)
+    expected = pd.Series(pd.to_datetime([
+        '2024-01-15 08:30:00',
+        '2024-04-03 10:00:00',
+        '2024-02-15 00:00:00',
+        '2024-03-05 07:15:00',
+        '2024-01-15 08:30:00',
+        '2024-12-31 23:45:00',
+    ]), index=series.index, name='createtime')
+    pd.testing.assert_series_equal(result, expected, check_dtype=False)
+
+
+def test_ambiguous_dates_are_dayfirst():
+    result = parse_datetime_column(pd.Series(['03/04/2024', '13/04/2024']))
+    assert list(result) == [pd.Timestamp('2024-04-03'), pd.Timestamp('2024-04-13')]
+
+
+def test_blank_and_missing_values_become_nat():
+    result = parse_datetime_column(pd.Series(['2024-01-01', '', '   ', None, 'bukan tanggal']))
+    assert result[0] == pd.Timestamp('2024-01-01')
+    assert result[1:].isna().all()
+
+
+def test_unknown_format_falls_back_to_dayfirst_parser():
+    # Tidak ada di CANDIDATE_FORMATS: dilempar ke parser umum dengan dayfirst=True
+    result = parse_datetime_column(pd.Series(['2024-01-15 08:30:00', '04/05/2024 08:30:15.250 +0000']))
+    assert result[1].replace(microsecond=0) == pd.Timestamp('2024-05-04 08:30:15')
+
+
+def test_explicit_formats_skip_detection():
+    # '2024-03-04' tidak cocok dengan format yang diberikan: fallback tidak boleh membaliknya jadi 3 April
+    series = pd.Series(['01/02/2024', '2024-03-04'])
+    result = parse_datetime_column(series, formats=['%m/%d/%Y'])
+    assert result[0] == pd.Timestamp('2024-01-02')
+    assert result[1] == pd.Timestamp('2024-03-04')
+
+
+def test_datetime_column_is_returned_unchanged():
+    series = pd.Series(pd.to_datetime(['2024-01-01', None]))
+    assert parse_datetime_column(series) is series
+
+
+def test_detect_date_formats_orders_by_match_count():
+    values = ['2024-01-01', '2024-01-02', '2024-01-03', '05/01/2024', None, '']
+    assert detect_date_formats(values) == ['%Y-%m-%d', '%d/%m/%Y']
+
+
+def test_month_helpers():
+    dt = pd.Series(pd.to_datetime(['2024-01-15 08:30', None, '2023-12-31 23:59']))
+    months = month_start(dt)
+    assert list(months.dropna()) == [pd.Timestamp('2024-01-01'), pd.Timestamp('2023-12-01')]
+    assert list(month_labels(months)) == ['Jan 2024', 'Unknown', 'Dec 2023']
+    abbr = month_abbr(dt)
+    assert abbr[0] == 'Jan' and pd.isna(abbr[1]) and abbr[2] == 'Dec'
+
+
+@pytest.mark.parametrize('values, expected', [
+    ([UNKNOWN_MONTH, pd.Timestamp('2024-02-01')], [pd.NaT, pd.Timestamp('2024-02-01')]),
+    ([pd.Timestamp('2024-02-01')], [pd.Timestamp('2024-02-01')]),
+])
+def test_known_month_drops_unknown_marker(values, expected):
+    result = known_month(pd.Series(values))
+    assert result.isna().tolist() == [pd.isna(v) for v in expected]
+    assert list(result.dropna()) == [v for v in expected if not pd.isna(v)]
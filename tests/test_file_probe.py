@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+from common.file_probe import read_csv_compact
+
+
+def _write(path, rows):
+    path.write_text('a,b\n' + ''.join(f"{a},{b}\n" for a, b in rows))
+    return str(path)
+
+
+def test_all_blank_chunk_keeps_category_column(tmp_path):
+    path = _write(tmp_path / 'kosong.csv', [('x', 1)] * 5 + [('', 2)] * 5)
+    df = read_csv_compact(path, category_columns=['a'], chunksize=5)
+    assert isinstance(df['a'].dtype, pd.CategoricalDtype)
+    assert df['a'].tolist()[:5] == ['x'] * 5
+    assert df['a'].iloc[5:].isna().all()
+    assert df['b'].tolist() == [1] * 5 + [2] * 5
+
+
+@pytest.mark.parametrize('rows', [
+    [('', 1)] * 5 + [('x', 2)] * 5,
+    [('1', 1)] * 5 + [('y', 2)] * 5 + [('', 3)] * 5,
+    [('', 1)] * 10,
+])
+def test_chunks_with_different_category_types_match_full_read(tmp_path, rows):
+    path = _write(tmp_path / 'campur.csv', rows)
+    chunked = read_csv_compact(path, category_columns=['a'], chunksize=5)
+    full = pd.read_csv(path, dtype={'a': object})
+    expected = [None if pd.isna(value) else str(value) for value in full['a']]
+    assert [None if pd.isna(value) else value for value in chunked['a'].astype(object)] == expected
+    assert len(chunked) == len(rows)
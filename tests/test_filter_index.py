@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from common.filter_index import FilterIndex
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'circle': pd.Categorical(['Jabo', 'Java', None, 'Java', 'Bali', 'Jabo'], categories=['Bali', 'Jabo', 'Java', 'Papua']),
+        'rca': ['Power', 'FO Cut', 'HW', None, 'Power', 'HW'],
+        'bulan_label': ['Feb 2024', 'Jan 2024', 'Feb 2024', 'Mar 2024', 'Jan 2024', None],
+        'bulan_label_dt': pd.to_datetime(['2024-02-01', '2024-01-01', '2024-02-01', '2024-03-01', '2024-01-01', None]),
+    })
+
+
+@pytest.mark.parametrize('col, selected', [
+    ('circle', ['Java']),
+    ('circle', ['Jabo', 'Bali']),
+    ('circle', ['Papua']),
+    ('rca', ['Power', 'HW']),
+    ('rca', []),
+    ('rca', ['tidak ada']),
+])
+def test_mask_matches_isin(frame, col, selected):
+    index = FilterIndex(frame, ['circle', 'rca'])
+    expected = frame[col].isin(selected).to_numpy()
+    np.testing.assert_array_equal(index.mask(col, selected), expected)
+
+
+def test_mask_never_selects_missing_values(frame):
+    index = FilterIndex(frame, ['circle', 'rca'])
+    assert not index.mask('circle', frame['circle'].cat.categories)[2]
+    assert not index.mask('rca', ['Power', 'FO Cut', 'HW', None])[3]
+
+
+def test_combined_masks_match_pandas_filter(frame):
+    index = FilterIndex(frame, ['circle', 'rca'])
+    mask = index.mask('circle', ['Jabo', 'Java']) & index.mask('rca', ['HW', 'FO Cut'])
+    expected = frame[frame['circle'].isin(['Jabo', 'Java']) & frame['rca'].isin(['HW', 'FO Cut'])]
+    pd.testing.assert_frame_equal(frame[mask], expected)
+
+
+def test_options_follow_mask_and_order_by(frame):
+    index = FilterIndex(frame, ['circle', 'rca', 'bulan_label'], order_by={'bulan_label': 'bulan_label_dt'})
+    assert index.options('bulan_label') == ['Jan 2024', 'Feb 2024', 'Mar 2024']
+    assert index.options('circle') == ['Bali', 'Jabo', 'Java']
+    assert index.options('rca', index.mask('circle', ['Java'])) == ['FO Cut']
+    assert index.options('circle', index.mask('rca', ['tidak ada'])) == []
+
+
+def test_missing_columns_are_skipped(frame):
+    index = FilterIndex(frame, ['circle', 'tidak_ada'])
+    assert index.has('circle')
+    assert not index.has('tidak_ada')
+    assert index.all_rows().all() and len(index.all_rows()) == len(frame)
@@ -5,18 +5,24 @@ import altair as alt
 import matplotlib.pyplot as plt
 import plotly.express as px
 import numpy as np
-from utils.preprocessing import (
-    load_data,
-    clean_data
-)
+from utils.preprocessing import load_and_clean
+from common.cache import load_cached, session_cached, file_content_hash
+from common.filter_index import FilterIndex
+from common.schema import drop_unused_categories
+from common.diagnostics import StageRecorder, show_diagnostics, stage, timed
 from utils.modeling import (
     train_model,
     load_model,
     predict_duration,
     user_input_features,
     load_model_features,
-    evaluate_prediction
+    evaluate_prediction,
+    model_exists,
+    MODEL_FEATURES,
+    MODEL_JOB_SLOT
 )
+from common.jobs import get_executor, session_job, cancel_session_job, job_signature, wait_for_job
+from utils.model_client import RemoteModel
 from visualization.plots import (
     plot_restore_duration,
     plot_incident_per_region,
@@ -38,11 +44,14 @@ from visualization.tables import (
 st.set_page_config(page_title="TT Incident Dashboard by Salachudin Emir", layout="wide")
 st.title("📊 TT Incident Dashboard by Salachudin Emir")
 
-uploaded_file = st.file_uploader("Upload CSV File", type="csv")
+# Waktu, jumlah baris & memori tiap tahap rerun ini (tab Diagnostik + log JSON lines)
+diagnostics = StageRecorder('tt-inc_dashboard').activate()
+
+uploaded_file = st.file_uploader("Upload CSV / Parquet File", type=["csv", "parquet", "feather"])
 
 if uploaded_file:
-    df = load_data(uploaded_file)
-    df = clean_data(df)
+    # Load & bersihkan data (di-cache per isi file, klik filter tidak memparsing ulang)
+    df = timed('load', load_cached, uploaded_file, load_and_clean)
 
     st.sidebar.header("🧰 Filter Data")
 
@@ -64,49 +73,42 @@ if uploaded_file:
         else:
             return []
 
-    df_for_filter = df.copy()
+    # Index filter (kode per kolom) dibangun sekali per isi file dan disimpan di session_state
+    filter_columns = ['circle', 'siteregion', 'severity', 'rootcause', 'subcause', 'mccluster', 'alarmname']
+    filter_index = session_cached('filter_index', uploaded_file, lambda: timed('build_filter_index', FilterIndex, df, filter_columns))
+
+    # Mask baris hasil filter; opsi tiap filter mengikuti filter sebelumnya (cascading)
+    filter_mask = filter_index.all_rows()
+
+    def cascading_filter(mask, col, label, key, **kwargs):
+        with stage(f'filter:{col}', rows_in=int(mask.sum())) as timing:
+            options = filter_index.options(col, mask) if filter_index.has(col) else []
+            selected = safe_multiselect(label, options, key=key, **kwargs)
+            if selected:
+                mask = mask & filter_index.mask(col, selected)
+            timing['rows_out'] = int(mask.sum())
+        return selected, mask
 
     # Filter Circle
-    circle_options = df_for_filter['circle'].dropna().unique() if 'circle' in df_for_filter.columns else []
-    circle_filter = safe_multiselect("Circle", circle_options, key="filter_circle")
-    if circle_filter:
-        df_for_filter = df_for_filter[df_for_filter['circle'].isin(circle_filter)]
+    circle_filter, filter_mask = cascading_filter(filter_mask, "circle", "Circle", key="filter_circle")
 
     # Filter Region
-    region_options = df_for_filter['siteregion'].dropna().unique() if 'siteregion' in df_for_filter.columns else []
-    region_filter = safe_multiselect("Region", region_options, key="filter_region")
-    if region_filter:
-        df_for_filter = df_for_filter[df_for_filter['siteregion'].isin(region_filter)]
+    region_filter, filter_mask = cascading_filter(filter_mask, "siteregion", "Region", key="filter_region")
 
     # Filter Severity
-    severity_options = df_for_filter['severity'].dropna().unique() if 'severity' in df_for_filter.columns else []
-    severity_filter = safe_multiselect("Severity", severity_options, key="filter_severity")
-    if severity_filter:
-        df_for_filter = df_for_filter[df_for_filter['severity'].isin(severity_filter)]
+    severity_filter, filter_mask = cascading_filter(filter_mask, "severity", "Severity", key="filter_severity")
 
     # Filter Root Cause
-    rootcause_options = df_for_filter['rootcause'].dropna().unique() if 'rootcause' in df_for_filter.columns else []
-    rootcause_filter = safe_multiselect("Root Cause", rootcause_options, key="filter_rootcause")
-    if rootcause_filter:
-        df_for_filter = df_for_filter[df_for_filter['rootcause'].isin(rootcause_filter)]
+    rootcause_filter, filter_mask = cascading_filter(filter_mask, "rootcause", "Root Cause", key="filter_rootcause")
 
     # Filter Subcause
-    subcause_options = df_for_filter['subcause'].dropna().unique() if 'subcause' in df_for_filter.columns else []
-    subcause_filter = safe_multiselect("Subcause", subcause_options, key="filter_subcause")
-    if subcause_filter:
-        df_for_filter = df_for_filter[df_for_filter['subcause'].isin(subcause_filter)]
+    subcause_filter, filter_mask = cascading_filter(filter_mask, "subcause", "Subcause", key="filter_subcause")
 
     # Filter MC Cluster
-    mccluster_options = df_for_filter['mccluster'].dropna().unique() if 'mccluster' in df_for_filter.columns else []
-    mccluster_filter = safe_multiselect("MC Cluster", mccluster_options, key="filter_mccluster", with_select_all=False, default_selected=[])
-    if mccluster_filter:
-        df_for_filter = df_for_filter[df_for_filter['mccluster'].isin(mccluster_filter)]
+    mccluster_filter, filter_mask = cascading_filter(filter_mask, "mccluster", "MC Cluster", key="filter_mccluster", with_select_all=False, default_selected=[])
 
     # Filter Alarm Name
-    alarmname_options = df_for_filter['alarmname'].dropna().unique() if 'alarmname' in df_for_filter.columns else []
-    alarmname_filter = safe_multiselect("Alarm Name", alarmname_options, key="filter_alarmname", with_select_all=False, default_selected=[])
-    if alarmname_filter:
-        df_for_filter = df_for_filter[df_for_filter['alarmname'].isin(alarmname_filter)]
+    alarmname_filter, filter_mask = cascading_filter(filter_mask, "alarmname", "Alarm Name", key="filter_alarmname", with_select_all=False, default_selected=[])
 
     # Filter Date Range
     if 'createtime' in df.columns and not df['createtime'].isnull().all():
@@ -139,29 +141,18 @@ if uploaded_file:
     else:
         start_date = end_date = None
 
-    # Terapkan semua filter ke dataframe asli (df_filtered)
-    df_filtered = df.copy()
-
-    if circle_filter:
-        df_filtered = df_filtered[df_filtered['circle'].isin(circle_filter)]
-    if region_filter:
-        df_filtered = df_filtered[df_filtered['siteregion'].isin(region_filter)]
-    if severity_filter:
-        df_filtered = df_filtered[df_filtered['severity'].isin(severity_filter)]
-    if rootcause_filter:
-        df_filtered = df_filtered[df_filtered['rootcause'].isin(rootcause_filter)]
-    if subcause_filter:
-        df_filtered = df_filtered[df_filtered['subcause'].isin(subcause_filter)]
-    if mccluster_filter:
-        df_filtered = df_filtered[df_filtered['mccluster'].isin(mccluster_filter)]
-    if alarmname_filter:
-        df_filtered = df_filtered[df_filtered['alarmname'].isin(alarmname_filter)]
-
-    if start_date and end_date:
-        df_filtered = df_filtered[
-            (df_filtered['createtime'] >= pd.to_datetime(start_date)) &
-            (df_filtered['createtime'] <= pd.to_datetime(end_date))
-        ]
+    # Terapkan semua filter sebagai satu seleksi baris
+    with stage('apply_filters', rows_in=len(df)) as timing:
+        if start_date and end_date:
+            filter_mask &= (
+                (df['createtime'] >= pd.to_datetime(start_date)).to_numpy() &
+                (df['createtime'] <= pd.to_datetime(end_date)).to_numpy()
+            )
+        df_filtered = df[filter_mask]
+
+        # Buang kategori yang sudah tidak muncul setelah filter (chart & tabel tidak menampilkan nilai 0)
+        df_filtered = drop_unused_categories(df_filtered)
+        timing['rows_out'] = len(df_filtered)
 
     # --- Drop kolom yang tidak ingin ditampilkan di preview & export ---
     columns_to_drop = [
@@ -172,7 +163,7 @@ if uploaded_file:
     cols_exist = [col for col in columns_to_drop if col in df_filtered.columns]
     df_filtered_dropped = df_filtered.drop(columns=cols_exist)
 
-    tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9 = st.tabs([
         "📍 Per Region",
         "🔥 Root Cause",
         "⏳ Durasi",
@@ -180,10 +171,14 @@ if uploaded_file:
         "📅 Waktu Teraktif",
         "🏘️ MC Cluster",
         "🤖 Model",
-        "🧪 Debug Filter"
+        "🧪 Debug Filter",
+        "⏱️ Diagnostik"
     ])
 
-    with tab1:
+    # Tiap tab diukur sebagai satu tahap render:<nama>
+    rows_shown = len(df_filtered_dropped)
+
+    with tab1, stage('render:per_region', rows_in=rows_shown):
         st.subheader("🗺️ Jumlah Insiden per Region")
         if 'siteregion' in df_filtered_dropped.columns and not df_filtered_dropped.empty:
             fig = plot_incident_per_region(df_filtered_dropped)
@@ -198,7 +193,7 @@ if uploaded_file:
         else:
             st.info("Data severity tidak tersedia atau kosong.")
 
-    with tab2:
+    with tab2, stage('render:root_cause', rows_in=rows_shown):
         st.subheader("Top Root Causes")
         st.dataframe(top_rootcause_table(df_filtered_dropped))
 
@@ -209,7 +204,7 @@ if uploaded_file:
         st.caption("Menampilkan subcause teratas untuk masing-masing rootcause utama.")
         st.dataframe(top_rootcause_subcause_table(df_filtered_dropped))
 
-    with tab3:
+    with tab3, stage('render:durasi', rows_in=rows_shown):
         st.subheader("Durasi Restore")
         if 'restore_duration' in df_filtered.columns and not df_filtered.empty:
             fig = plot_restore_duration(df_filtered)
@@ -217,7 +212,7 @@ if uploaded_file:
         else:
             st.info("Data restore_duration tidak tersedia atau kosong.")
 
-    with tab4:
+    with tab4, stage('render:sla_violation', rows_in=rows_shown):
         st.subheader("SLA Violation Pie Chart")
         if not df_filtered.empty and 'slastatus' in df_filtered.columns:
             fig = plot_sla_violation_pie(df_filtered)
@@ -233,7 +228,7 @@ if uploaded_file:
         else:
             st.info("Data kosong untuk tabel SLA Violation.")
 
-    with tab5:
+    with tab5, stage('render:waktu_teraktif', rows_in=rows_shown):
         st.subheader("📈 Trend Jumlah Insiden")
         if 'createtime' in df_filtered_dropped.columns and not df_filtered_dropped.empty:
             if 'week_str' not in df_filtered_dropped.columns:
@@ -320,7 +315,7 @@ if uploaded_file:
             # 🥇 Ranking Region
             st.markdown("### 🥇 Peringkat Region per Bulan")
             region_month = (
-                df_filtered_dropped.groupby(['month_str', 'siteregion'])
+                df_filtered_dropped.groupby(['month_str', 'siteregion'], observed=True)
                 .size()
                 .reset_index(name='incident_count')
             )
@@ -330,109 +325,128 @@ if uploaded_file:
         else:
             st.warning("Kolom `createtime` tidak tersedia atau data kosong.")
 
-    with tab6:
+    with tab6, stage('render:mc_cluster', rows_in=rows_shown):
         st.subheader("🏙️ Top MC Cluster Berdasarkan Jumlah Insiden")
         plot_mccluster_repetitive(df_filtered_dropped)
     
-    with tab7:
+    with tab7, stage('render:model', rows_in=rows_shown):
         st.subheader("🤖 Modeling Machine Learning")
 
         force_retrain = st.checkbox("🏋️‍♂️ Latih ulang model", value=False)
-
-        if force_retrain:
-            with st.spinner("Melatih model..."):
-                model, mae = train_model(df_filtered, force_retrain=True, return_mae=True)
-            st.success(f"Model dilatih dengan MAE: {mae:.2f} menit")
+        executor = get_executor('tt-inc_dashboard')
+        model = None
+
+        # Training berjalan sebagai job latar belakang: tab lain tetap langsung tampil dan
+        # bagian ini terisi saat job selesai. Ganti filter membatalkan job yang basi.
+        if force_retrain or not model_exists():
+            signature = job_signature(
+                file_content_hash(uploaded_file), circle_filter, region_filter, severity_filter,
+                rootcause_filter, subcause_filter, mccluster_filter, alarmname_filter, start_date, end_date
+            )
+            job = session_job(
+                executor, MODEL_JOB_SLOT, signature, train_model, df_filtered.copy(deep=False),
+                force_retrain=True, return_mae=True
+            )
+            if not job.done():
+                wait_for_job(job, "Training model")
+            elif job.status != 'done':
+                st.error(f"❌ Gagal melatih model (job `{job.id}`, {job.status}): {job.error}")
+            else:
+                model, mae = job.result
+                st.success(f"Model dilatih dengan MAE: {mae:.2f} menit")
         else:
-            model = train_model(df_filtered, force_retrain=False)
-            st.info("Model dimuat dari file.")
+            cancel_session_job(executor, MODEL_JOB_SLOT)
+            model = timed('model_load', train_model, df_filtered, force_retrain=False)
+            if isinstance(model, RemoteModel):
+                st.info(f"Model dipakai dari model server `{model.address}` (versi {model.version}).")
+            else:
+                st.info("Model dimuat dari file.")
 
-        # --- PREDIKSI (Manual Input)
-        st.subheader("📥 Prediksi Restore Duration (Manual Input)")
+        if model is not None:
+            # --- PREDIKSI (Manual Input)
+            st.subheader("📥 Prediksi Restore Duration (Manual Input)")
 
-        options = user_input_features(df_filtered)
+            options = user_input_features(df_filtered)
         
-        filtered_df = df_filtered.copy()
-
-        orderid = st.selectbox("Order ID", options=filtered_df['orderid'].dropna().unique())
-        filtered_df = filtered_df[filtered_df['orderid'] == orderid]
-
-        severity = st.selectbox("Severity", options=filtered_df['severity'].dropna().unique())
-        filtered_df = filtered_df[filtered_df['severity'] == severity]
-
-        circle = st.selectbox("Circle", options=filtered_df['circle'].dropna().unique())
-        filtered_df = filtered_df[filtered_df['circle'] == circle]
-
-        siteregion = st.selectbox("Site Region", options=filtered_df['siteregion'].dropna().unique())
-        filtered_df = filtered_df[filtered_df['siteregion'] == siteregion]
-
-        rootcause = st.selectbox("Root Cause", options=filtered_df['rootcause'].dropna().unique())
-        filtered_df = filtered_df[filtered_df['rootcause'] == rootcause]
-
-        subcause = st.selectbox("Subcause", options=filtered_df['subcause'].dropna().unique())
-        filtered_df = filtered_df[filtered_df['subcause'] == subcause]
-
-        subcause2 = st.selectbox("Subcause 2", options=filtered_df['subcause2'].dropna().unique())
-        filtered_df = filtered_df[filtered_df['subcause2'] == subcause2]
-
-        mccluster = st.selectbox("MC Cluster", options=filtered_df['mccluster'].dropna().unique())
-        filtered_df = filtered_df[filtered_df['mccluster'] == mccluster]
-
-        input_data = pd.DataFrame([{
-            'orderid': orderid,
-            'severity': severity,
-            'circle': circle,
-            'siteregion': siteregion,
-            'rootcause': rootcause,
-            'subcause': subcause,
-            'subcause2': subcause2,
-            'mccluster': mccluster
-        }])
-
-        try:
-            # Load fitur model
-            expected_features = load_model_features()
-
-            # Jika fitur model tidak ditemukan, retrain
-            if expected_features is None:
-                st.warning("Fitur dari model tidak ditemukan. Melatih ulang model...")
-                model, mae = train_model(df_filtered, force_retrain=True, return_mae=True)
-                expected_features = model.named_steps['preprocess'].transformers_[0][2] + model.named_steps['preprocess'].transformers_[1][2]
-                st.success(f"Model dilatih ulang dengan MAE: {mae:.2f}")
-
-            # Cek apakah ada fitur yang hilang di input_data
-            missing_features = set(expected_features) - set(input_data.columns)
-            if missing_features:
-                st.error(f"Fitur berikut tidak ada di input data: {missing_features}")
-            elif input_data.isnull().any().any():
-                st.error("Input data masih mengandung NaN. Pastikan semua kolom diisi dengan benar.")
-            else:
-                # Lakukan prediksi dengan fitur yang sesuai
-                prediction = predict_duration(model, input_data[expected_features])
-                pred_minutes = np.round(prediction[0], 2)
-                hours = int(pred_minutes // 60)
-                minutes = int(pred_minutes % 60)
+            filtered_df = df_filtered.copy()
+
+            orderid = st.selectbox("Order ID", options=filtered_df['orderid'].dropna().unique())
+            filtered_df = filtered_df[filtered_df['orderid'] == orderid]
+
+            severity = st.selectbox("Severity", options=filtered_df['severity'].dropna().unique())
+            filtered_df = filtered_df[filtered_df['severity'] == severity]
+
+            circle = st.selectbox("Circle", options=filtered_df['circle'].dropna().unique())
+            filtered_df = filtered_df[filtered_df['circle'] == circle]
+
+            siteregion = st.selectbox("Site Region", options=filtered_df['siteregion'].dropna().unique())
+            filtered_df = filtered_df[filtered_df['siteregion'] == siteregion]
+
+            rootcause = st.selectbox("Root Cause", options=filtered_df['rootcause'].dropna().unique())
+            filtered_df = filtered_df[filtered_df['rootcause'] == rootcause]
+
+            subcause = st.selectbox("Subcause", options=filtered_df['subcause'].dropna().unique())
+            filtered_df = filtered_df[filtered_df['subcause'] == subcause]
+
+            subcause2 = st.selectbox("Subcause 2", options=filtered_df['subcause2'].dropna().unique())
+            filtered_df = filtered_df[filtered_df['subcause2'] == subcause2]
+
+            mccluster = st.selectbox("MC Cluster", options=filtered_df['mccluster'].dropna().unique())
+            filtered_df = filtered_df[filtered_df['mccluster'] == mccluster]
+
+            input_data = pd.DataFrame([{
+                'orderid': orderid,
+                'severity': severity,
+                'circle': circle,
+                'siteregion': siteregion,
+                'rootcause': rootcause,
+                'subcause': subcause,
+                'subcause2': subcause2,
+                'mccluster': mccluster
+            }])
+
+            try:
+                # Load fitur model
+                expected_features = load_model_features()
+
+                # Jika fitur model tidak ditemukan, pakai daftar fitur bawaan training
+                if expected_features is None:
+                    st.warning("Fitur dari model tidak ditemukan. Memakai daftar fitur bawaan.")
+                    expected_features = MODEL_FEATURES
+
+                # Cek apakah ada fitur yang hilang di input_data
+                missing_features = set(expected_features) - set(input_data.columns)
+                if missing_features:
+                    st.error(f"Fitur berikut tidak ada di input data: {missing_features}")
+                elif input_data.isnull().any().any():
+                    st.error("Input data masih mengandung NaN. Pastikan semua kolom diisi dengan benar.")
+                else:
+                    # Lakukan prediksi dengan fitur yang sesuai
+                    prediction = predict_duration(model, input_data[expected_features])
+                    pred_minutes = np.round(prediction[0], 2)
+                    hours = int(pred_minutes // 60)
+                    minutes = int(pred_minutes % 60)
 
-                st.success(f"Prediksi Restore Duration: {pred_minutes} menit ({hours} jam {minutes} menit)")
+                    st.success(f"Prediksi Restore Duration: {pred_minutes} menit ({hours} jam {minutes} menit)")
 
-            # Evaluasi prediksi (gunakan df_filtered_dropped yang sudah disiapkan sebelumnya)
-            df_eval, metrics = evaluate_prediction(df_filtered_dropped, model)
+                # Evaluasi prediksi (gunakan df_filtered_dropped yang sudah disiapkan sebelumnya)
+                df_eval, metrics = timed('evaluate_prediction', evaluate_prediction, df_filtered_dropped, model)
 
-            st.markdown("#### 📄 Perbandingan Prediksi vs Aktual")
-            st.dataframe(df_eval)
+                st.markdown("#### 📄 Perbandingan Prediksi vs Aktual")
+                st.dataframe(df_eval)
 
-            st.markdown("#### 📈 Metrik Evaluasi")
-            col1, col2, col3 = st.columns(3)
-            col1.metric("MAE", f"{metrics['MAE']:.2f} menit")
-            col2.metric("RMSE", f"{metrics['RMSE']:.2f} menit")
-            col3.metric("R² Score", f"{metrics['R2']:.2f}")
+                st.markdown("#### 📈 Metrik Evaluasi")
+                col1, col2, col3 = st.columns(3)
+                col1.metric("MAE", f"{metrics['MAE']:.2f} menit")
+                col2.metric("RMSE", f"{metrics['RMSE']:.2f} menit")
+                col3.metric("R² Score", f"{metrics['R2']:.2f}")
 
-        except ValueError as e:
-            st.warning(f"⚠️ {str(e)}")
-        except Exception as e:
-            st.error(f"❌ Terjadi error saat prediksi atau evaluasi: {e}")
+            except ValueError as e:
+                st.warning(f"⚠️ {str(e)}")
+            except Exception as e:
+                st.error(f"❌ Terjadi error saat prediksi atau evaluasi: {e}")
 
-    with tab8:
+    with tab8, stage('render:debug_filter', rows_in=rows_shown):
         st.subheader("🧪 Debug Data Filter")
 
         st.markdown("### 🔵 Data Sebelum Filter (df)")
@@ -452,7 +466,7 @@ if uploaded_file:
     df_dropped = drop_columns(df_filtered)
 
     # Generate excel file
-    excel_bytes = generate_excel_output(df_filtered)
+    excel_bytes = timed('export_excel', generate_excel_output, df_filtered)
 
     st.download_button(
         label="⬇️ Unduh Data Filter (Excel .xlsx)",
@@ -461,5 +475,9 @@ if uploaded_file:
         mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
     )
 
+    # Diisi paling akhir supaya export ikut tercatat
+    with tab9:
+        show_diagnostics(diagnostics, expanded=True)
+
 else:
     st.info("Silakan upload file CSV terlebih dahulu.")
@@ -0,0 +1,97 @@
+import argparse
+import glob
+import os
+import sys
+import time
+
+from utils.modeling import MODEL_PATH, FEATURES_PATH
+from common.diagnostics import StageRecorder
+from utils.model_client import MODEL_SERVER, connect_model_server
+from utils.scoring import CHUNK_ROWS, OUTPUT_FORMATS, load_scoring_model, score_file
+
+
+def expand_files(patterns):
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) or [pattern]
+        for path in matches:
+            if path not in files:
+                files.append(path)
+    return files
+
+
+def output_path_for(path, output_dir, fmt):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(output_dir, f"{stem}_prediksi.{fmt}")
+
+
+def print_summary(summary):
+    if 'error' in summary:
+        print(f"❌ {summary['file']}: {summary['error']}")
+        return
+    per_minute = summary['rows_in'] / summary['seconds'] * 60 if summary['seconds'] else 0
+    print(f"✅ {summary['file']}: {summary['rows_out']} prediksi dari {summary['rows_in']} baris "
+          f"dalam {summary['seconds']:.1f} s ({per_minute:,.0f} baris/menit)")
+    print(f"   📁 {summary['output']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Prediksi restore duration tiket secara batch (tanpa Streamlit) dengan model tersimpan."
+    )
+    parser.add_argument("files", nargs="+", help="File tiket (CSV / Parquet / Feather), boleh pola glob")
+    parser.add_argument("--output-dir", default="output_prediksi", help="Folder output (default: output_prediksi)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default='csv', dest="fmt",
+                        help="Format output (default: csv)")
+    parser.add_argument("--model", default=MODEL_PATH, help=f"File model (default: {MODEL_PATH})")
+    parser.add_argument("--features", default=FEATURES_PATH, help=f"File daftar fitur (default: {FEATURES_PATH})")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS,
+                        help=f"Jumlah baris per chunk yang diprediksi sekaligus (default: {CHUNK_ROWS})")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Jumlah worker process untuk memprediksi chunk secara paralel (default: 1, "
+                             "model memakai semua core)")
+    parser.add_argument("--server", default=MODEL_SERVER,
+                        help="Alamat model server (default: env TT_MODEL_SERVER); bila server hidup model "
+                             "tidak dimuat di proses ini")
+    parser.add_argument("--open-only", action="store_true",
+                        help="Hanya prediksi tiket yang belum close (kolom closetime kosong)")
+    args = parser.parse_args()
+
+    # Semua tahap tercatat di log diagnostik dengan app 'tt-inc_batch_predict'
+    StageRecorder('tt-inc_batch_predict').activate()
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    # Model dimuat sekali untuk semua file (mode worker: sekali per worker process),
+    # atau dipakai dari model server bila ada
+    model = features = None
+    server = None
+    if args.server:
+        model = connect_model_server(args.server)
+        if model is not None:
+            server, features = args.server, model.features
+            print(f"🔌 Memakai model server {server} (versi {model.version})")
+        else:
+            print(f"⚠️ Model server {args.server} tidak menjawab, model dimuat lokal.")
+    if model is None and args.workers <= 1:
+        try:
+            model, features = load_scoring_model(args.model, args.features, n_jobs=-1)
+        except Exception as e:
+            print(f"❌ Gagal memuat model: {e}")
+            sys.exit(1)
+
+    failed = 0
+    for path in expand_files(args.files):
+        start = time.perf_counter()
+        try:
+            summary = score_file(path, output_path_for(path, args.output_dir, args.fmt), args.fmt,
+                                 model=model, features=features, model_path=args.model,
+                                 features_path=args.features, chunk_rows=args.chunk_rows,
+                                 workers=args.workers, open_only=args.open_only,
+                                 server=server)
+        except Exception as e:
+            summary = {'file': path, 'error': str(e)}
+            failed += 1
+        summary['seconds'] = time.perf_counter() - start
+        print_summary(summary)
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,33 @@
+import argparse
+
+from utils.modeling import MODEL_PATH, FEATURES_PATH
+from utils.model_client import DEFAULT_PORT
+from utils.model_server import MAX_BATCH_ROWS, MAX_WAIT_SECONDS, RELOAD_POLL_SECONDS, create_server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Jalankan model server restore duration: model dimuat sekali, request digabung per batch."
+    )
+    parser.add_argument("--address", default=f"127.0.0.1:{DEFAULT_PORT}",
+                        help=f"Alamat server: host:port (default: 127.0.0.1:{DEFAULT_PORT}) "
+                             "atau unix:///path/ke/socket")
+    parser.add_argument("--model", default=MODEL_PATH, help=f"File model (default: {MODEL_PATH})")
+    parser.add_argument("--features", default=FEATURES_PATH, help=f"File daftar fitur (default: {FEATURES_PATH})")
+    parser.add_argument("--max-batch-rows", type=int, default=MAX_BATCH_ROWS,
+                        help=f"Batas baris satu batch gabungan (default: {MAX_BATCH_ROWS})")
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_SECONDS * 1000,
+                        help=f"Waktu tunggu request lain sebelum predict (default: {MAX_WAIT_SECONDS * 1000:g} ms)")
+    parser.add_argument("--reload-seconds", type=float, default=RELOAD_POLL_SECONDS,
+                        help=f"Interval cek perubahan file model (default: {RELOAD_POLL_SECONDS:g} s)")
+    args = parser.parse_args()
+
+    server = create_server(args.address, args.model, args.features, max_batch_rows=args.max_batch_rows,
+                           max_wait=args.max_wait_ms / 1000, poll_seconds=args.reload_seconds)
+    print(f"🚀 Model server berjalan di {args.address} (set TT_MODEL_SERVER={args.address} di dashboard / batch)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("👋 Model server dihentikan.")
+    finally:
+        server.server_close()
@@ -0,0 +1,111 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.model_server import MicroBatcher
+
+BLOCKER_ID = 0
+
+
+class EchoModel:
+    """Prediksi = orderid; mencatat ukuran tiap batch. Batch berisi BLOCKER_ID ditahan sampai release()."""
+
+    def __init__(self):
+        self.batches = []
+        self.blocked = threading.Event()
+        self._gate = threading.Event()
+
+    def release(self):
+        self._gate.set()
+
+    def predict(self, X):
+        ids = X['orderid'].to_numpy(dtype='float64')
+        if np.isnan(ids).any():
+            raise ValueError('orderid tidak valid')
+        if (ids == BLOCKER_ID).any():
+            self.blocked.set()
+            self._gate.wait(5)
+        self.batches.append(len(ids))
+        return ids * 10
+
+
+class FakeHolder:
+    def __init__(self, model):
+        self.model = model
+
+    def current(self):
+        return self.model, ['orderid'], ['orderid'], 'v1'
+
+
+def _frame(ids):
+    return pd.DataFrame({'orderid': list(ids)})
+
+
+def _batched(batcher, model, frames):
+    """
+    Kirim frames bersamaan saat thread batcher sedang sibuk (diblok request BLOCKER_ID),
+    jadi semuanya sudah mengantre saat batch berikutnya dikumpulkan.
+    """
+    with ThreadPoolExecutor(len(frames) + 1) as pool:
+        blocker = pool.submit(batcher.predict, _frame([BLOCKER_ID]))
+        assert model.blocked.wait(5)
+        futures = [pool.submit(batcher.predict, frame) for frame in frames]
+        for _ in range(1000):
+            if batcher._queue.qsize() == len(frames):
+                break
+            threading.Event().wait(0.005)
+        model.release()
+        blocker.result(timeout=5)
+        return [future.exception(timeout=5) or future.result() for future in futures]
+
+
+@pytest.fixture
+def model():
+    return EchoModel()
+
+
+def test_concurrent_requests_get_their_own_slices(model):
+    batcher = MicroBatcher(FakeHolder(model), max_batch_rows=10_000, max_wait=0.05)
+    frames = [_frame(range(start, start + size)) for start, size in [(1, 3), (100, 1), (200, 7), (300, 2)]]
+    results = _batched(batcher, model, frames)
+
+    for frame, (preds, version) in zip(frames, results):
+        np.testing.assert_array_equal(preds, frame['orderid'].to_numpy() * 10)
+        assert version == 'v1'
+    # Request blocker sendiri, sisanya satu batch
+    assert model.batches == [1, 13]
+    assert batcher.stats['requests'] == 5 and batcher.stats['batches'] == 2
+
+
+def test_batches_stop_at_max_batch_rows(model):
+    batcher = MicroBatcher(FakeHolder(model), max_batch_rows=50, max_wait=0.05)
+    frames = [_frame(range(start, start + 30)) for start in range(1000, 1300, 100)]
+    results = _batched(batcher, model, frames)
+
+    for frame, (preds, _) in zip(frames, results):
+        np.testing.assert_array_equal(preds, frame['orderid'].to_numpy() * 10)
+    # Pengumpulan berhenti begitu batch mencapai 50 baris: 30 + 30, lalu 30 sisanya
+    assert model.batches[1:] == [60, 30]
+
+
+def test_failing_request_does_not_fail_the_batch(model):
+    batcher = MicroBatcher(FakeHolder(model), max_batch_rows=10_000, max_wait=0.05)
+    frames = [_frame([1, 2]), _frame(['rusak']), _frame([3])]
+    good, bad, other = _batched(batcher, model, frames)
+
+    np.testing.assert_array_equal(good[0], [10, 20])
+    np.testing.assert_array_equal(other[0], [30])
+    assert isinstance(bad, ValueError)
+    # Batch gabungan gagal, lalu tiap request diprediksi sendiri
+    assert model.batches[1:] == [2, 1]
+
+
+def test_single_failing_request_gets_its_error(model):
+    batcher = MicroBatcher(FakeHolder(model), max_wait=0.0)
+    with pytest.raises(ValueError, match='orderid'):
+        batcher.predict(_frame(['rusak']))
+    preds, _ = batcher.predict(_frame([4]))
+    np.testing.assert_array_equal(preds, [40])
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.modeling import FEATURES_PATH, MODEL_PATH, TARGET, train_model
+from utils.scoring import PREDICTION_COLUMN, score_file
+
+ROWS = 600
+
+
+def _tickets(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'orderid': np.arange(1, rows + 1),
+        'severity': rng.choice(['Critical', 'Major', 'Minor'], rows),
+        'circle': rng.choice(['Jabo', 'Java', 'Sumatra'], rows),
+        'siteregion': rng.choice(['R1', 'R2', 'R3', 'R4'], rows),
+        'rootcause': rng.choice(['Power', 'FO Cut', 'HW'], rows),
+        'subcause': rng.choice(['PLN', 'Vandal', 'Modul', None], rows),
+        'subcause2': rng.choice(['A', 'B'], rows),
+        'mccluster': rng.choice(['MC1', 'MC2'], rows),
+        'closetime': np.where(rng.random(rows) < 0.3, '', '2024-01-02 10:00:00'),
+    })
+    df[TARGET] = rng.gamma(2.0, 3.0, rows) + (df['severity'] == 'Critical') * 5
+    return df
+
+
+@pytest.fixture(scope='module')
+def trained(tmp_path_factory):
+    # train_model menulis ke saved_model/ relatif terhadap folder kerja
+    workdir = tmp_path_factory.mktemp('tt_model')
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(workdir)
+        train_model(_tickets(ROWS), force_retrain=True)
+    tickets = _tickets(ROWS, seed=1).drop(columns=[TARGET])
+    data_path = workdir / 'tiket.csv'
+    tickets.to_csv(data_path, index=False)
+    return {
+        'data_path': str(data_path),
+        'model_path': str(workdir / MODEL_PATH),
+        'features_path': str(workdir / FEATURES_PATH),
+        'tickets': tickets,
+    }
+
+
+def _score(trained, output_path, fmt='csv', **kwargs):
+    summary = score_file(trained['data_path'], str(output_path), fmt, model_path=trained['model_path'],
+                         features_path=trained['features_path'], chunk_rows=50, **kwargs)
+    result = pd.read_parquet(output_path) if fmt == 'parquet' else pd.read_csv(output_path)
+    return summary, result
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'parquet'])
+def test_workers_keep_input_order(trained, tmp_path, fmt):
+    summary_single, single = _score(trained, tmp_path / f"single.{fmt}", fmt, workers=1)
+    summary_multi, multi = _score(trained, tmp_path / f"multi.{fmt}", fmt, workers=3)
+
+    assert summary_single['rows_in'] == summary_multi['rows_in'] == ROWS
+    assert summary_multi['rows_out'] == ROWS
+    assert list(multi.columns) == ['orderid', PREDICTION_COLUMN]
+    assert multi['orderid'].tolist() == trained['tickets']['orderid'].tolist()
+    pd.testing.assert_frame_equal(multi, single)
+
+
+def test_workers_with_open_only_keep_order(trained, tmp_path):
+    _, single = _score(trained, tmp_path / 'single.csv', workers=1, open_only=True)
+    summary, multi = _score(trained, tmp_path / 'multi.csv', workers=2, open_only=True)
+
+    tickets = trained['tickets']
+    expected_ids = tickets.loc[tickets['closetime'].fillna('') == '', 'orderid'].tolist()
+    assert summary['rows_out'] == len(expected_ids) < ROWS
+    assert multi['orderid'].tolist() == expected_ids
+    pd.testing.assert_frame_equal(multi, single)
+
+
+def test_missing_feature_column_is_rejected(trained, tmp_path):
+    data_path = tmp_path / 'tanpa_circle.csv'
+    trained['tickets'].drop(columns=['circle']).to_csv(data_path, index=False)
+    with pytest.raises(ValueError, match='circle'):
+        score_file(str(data_path), str(tmp_path / 'out.csv'), model_path=trained['model_path'],
+                   features_path=trained['features_path'], workers=2)
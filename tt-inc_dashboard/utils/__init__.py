@@ -1,3 +1,17 @@
+import os
+import sys
+
+# Modul bersama (common/) ada di root repo, satu tingkat di atas folder aplikasi
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(APP_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from common.diagnostics import configure_log_dir
+
+# Log diagnostik selalu di <folder aplikasi>/logs, dari folder mana pun aplikasi dijalankan
+configure_log_dir(APP_DIR)
+
 from .exporter import (
     drop_unwanted_columns,
     save_df_to_excel,
@@ -0,0 +1,104 @@
+"""
+Klien model server restore duration (lihat utils/model_server.py).
+
+RemoteModel meniru model sklearn (punya .predict), jadi dashboard & batch bisa memakai
+model yang sudah hangat di proses server tanpa masing-masing men-unpickle model sendiri.
+Alamat server: 'http://127.0.0.1:8765' atau 'unix:///path/ke/socket', bisa diatur lewat
+env TT_MODEL_SERVER (kosong = tidak memakai server, model dimuat lokal).
+"""
+import http.client
+import json
+import os
+import socket
+from urllib.parse import urlparse
+
+import numpy as np
+
+MODEL_SERVER = os.environ.get('TT_MODEL_SERVER', '')
+DEFAULT_PORT = 8765
+CONNECT_TIMEOUT = 2.0
+PREDICT_TIMEOUT = 300.0
+
+
+class ModelServerError(RuntimeError):
+    """Model server tidak bisa dihubungi atau menolak request."""
+
+
+def parse_address(address):
+    """'unix:///tmp/model.sock' -> ('unix', path); 'http://host:port' / 'host:port' -> ('tcp', (host, port))."""
+    if address.startswith('unix:'):
+        path = address[len('unix:'):]
+        return 'unix', path[2:] if path.startswith('//') else path
+    parsed = urlparse(address if '://' in address else f"http://{address}")
+    return 'tcp', (parsed.hostname or '127.0.0.1', parsed.port or DEFAULT_PORT)
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout):
+        super().__init__('localhost', timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+def _connection(address, timeout):
+    kind, target = parse_address(address)
+    if kind == 'unix':
+        return UnixHTTPConnection(target, timeout)
+    return http.client.HTTPConnection(*target, timeout=timeout)
+
+
+def request(address, method, path, payload=None, timeout=PREDICT_TIMEOUT):
+    """Kirim satu request JSON ke server. Return isi response (dict)."""
+    body = None if payload is None else payload.encode() if isinstance(payload, str) else json.dumps(payload).encode()
+    conn = _connection(address, timeout)
+    try:
+        conn.request(method, path, body=body, headers={'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        data = json.loads(response.read() or b'{}')
+    except (OSError, http.client.HTTPException, ValueError) as e:
+        raise ModelServerError(f"Model server {address} tidak bisa dihubungi: {e}") from e
+    finally:
+        conn.close()
+    if response.status != 200:
+        raise ModelServerError(f"Model server {address} menolak request ({response.status}): {data.get('error')}")
+    return data
+
+
+class RemoteModel:
+    """Pengganti model lokal: predict() dikirim ke model server (dibatch bersama request lain)."""
+
+    def __init__(self, address, info):
+        self.address = address
+        self.info = info
+
+    @property
+    def features(self):
+        return self.info['features']
+
+    @property
+    def version(self):
+        return self.info.get('model_version')
+
+    def predict(self, X):
+        payload = X.to_json(orient='split', index=False, date_format='iso')
+        result = request(self.address, 'POST', '/predict', payload)
+        self.info['model_version'] = result['model_version']
+        return np.asarray(result['predictions'], dtype=float)
+
+    def __repr__(self):
+        return f"RemoteModel({self.address}, versi {self.version})"
+
+
+def connect_model_server(address=MODEL_SERVER, timeout=CONNECT_TIMEOUT):
+    """RemoteModel bila server di `address` hidup, None bila alamat kosong / server tidak menjawab."""
+    if not address:
+        return None
+    try:
+        info = request(address, 'GET', '/health', timeout=timeout)
+    except ModelServerError:
+        return None
+    return RemoteModel(address, info)
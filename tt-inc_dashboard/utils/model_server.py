@@ -0,0 +1,292 @@
+"""
+Model server restore duration: satu proses yang memegang model di memori.
+
+- Model & daftar fitur dimuat sekali; file model dicek berkala dan dimuat ulang bila
+  berubah (misal setelah dashboard melatih ulang). Model lama tetap melayani request
+  sampai model baru selesai dimuat, lalu ditukar sekaligus.
+- Request yang datang bersamaan dikumpulkan (microbatch) lalu diprediksi dengan satu
+  panggilan model.predict, hasilnya dipecah lagi per request.
+- HTTP di localhost (TCP) atau Unix socket. Endpoint:
+    GET  /health   info model (versi, fitur, statistik batch)
+    POST /predict  {"columns": [...], "data": [[...], ...]} atau {"records": [{...}, ...]}
+                   -> {"predictions": [...], "model_version": "...", "rows": n}
+"""
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from .model_client import parse_address
+from .scoring import load_scoring_model, numeric_features, read_features
+
+RELOAD_POLL_SECONDS = 2.0
+# Batas baris satu batch gabungan dan waktu tunggu request lain sebelum predict
+MAX_BATCH_ROWS = 50_000
+MAX_WAIT_SECONDS = 0.005
+
+
+def _file_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ModelHolder:
+    """Model aktif + versinya; reload_if_changed() memuat ulang bila file model / fitur berubah."""
+
+    def __init__(self, model_path, features_path):
+        self.model_path = model_path
+        self.features_path = features_path
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._model_signature = None
+        self._features_signature = None
+        if not self.reload_if_changed():
+            raise FileNotFoundError(f"Model tidak ditemukan di path: {model_path}")
+
+    def current(self):
+        """Snapshot (model, features, numeric_cols, version) yang konsisten satu sama lain."""
+        with self._lock:
+            return self._model, self._features, self._numeric_cols, self.version
+
+    def reload_if_changed(self):
+        model_signature = _file_signature(self.model_path)
+        features_signature = _file_signature(self.features_path)
+        if model_signature is None:
+            # File sedang diganti / dihapus: tetap pakai model yang sudah dimuat
+            return False
+        if (model_signature, features_signature) == (self._model_signature, self._features_signature):
+            return False
+
+        if model_signature != self._model_signature:
+            model, features = load_scoring_model(self.model_path, self.features_path, n_jobs=-1)
+        else:
+            # Hanya daftar fitur yang berubah: model tidak perlu di-unpickle ulang
+            model, features = self._model, read_features(self.features_path)
+        version = datetime.fromtimestamp(model_signature[0] / 1e9).isoformat(timespec='seconds')
+        with self._lock:
+            first_load = self._model_signature is None
+            self._model, self._features = model, list(features)
+            self._numeric_cols = numeric_features(model)
+            self._model_signature, self._features_signature = model_signature, features_signature
+            self.version = version
+            self.loaded_at = datetime.now().isoformat(timespec='seconds')
+            if not first_load:
+                self.reloads += 1
+        print(f"{'📦 Model dimuat' if first_load else '🔄 Model dimuat ulang'}: {self.model_path} (versi {version})")
+        return True
+
+    def watch(self, poll_seconds=RELOAD_POLL_SECONDS):
+        """Thread latar belakang yang mengecek perubahan file model tiap poll_seconds."""
+        def run():
+            while True:
+                time.sleep(poll_seconds)
+                try:
+                    self.reload_if_changed()
+                except Exception as e:
+                    print(f"⚠️ Gagal memuat ulang model, tetap memakai versi {self.version}: {e}")
+
+        thread = threading.Thread(target=run, name='model-reload', daemon=True)
+        thread.start()
+        return thread
+
+
+def prepare_features(frame, features, numeric_cols):
+    """
+    Urutkan kolom sesuai fitur model dan pastikan kolom numerik bertipe angka.
+    null dari JSON jadi None di kolom object; imputer model hanya mengenali NaN sebagai kosong.
+    """
+    X = frame[features].copy()
+    for col in features:
+        if col in numeric_cols:
+            X[col] = pd.to_numeric(X[col], errors='coerce')
+        elif X[col].dtype == object:
+            X[col] = X[col].where(X[col].notna(), np.nan)
+    return X
+
+
+class MicroBatcher:
+    """
+    Satu thread predict untuk semua request: request yang mengantre digabung sampai
+    max_batch_rows baris (menunggu paling lama max_wait detik) lalu diprediksi sekali.
+    """
+
+    def __init__(self, holder, max_batch_rows=MAX_BATCH_ROWS, max_wait=MAX_WAIT_SECONDS):
+        self.holder = holder
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait
+        self.stats = {'requests': 0, 'batches': 0, 'rows': 0, 'predict_seconds': 0.0}
+        self._queue = queue.Queue()
+        threading.Thread(target=self._loop, name='predict-batcher', daemon=True).start()
+
+    def predict(self, frame):
+        """Dipanggil dari thread request; blok sampai batch berisi frame ini selesai diprediksi."""
+        future = Future()
+        self._queue.put((frame, future))
+        return future.result()
+
+    def _collect(self):
+        items = [self._queue.get()]
+        rows = len(items[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while rows < self.max_batch_rows:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            items.append(item)
+            rows += len(item[0])
+        return items
+
+    def _predict(self, frames):
+        model, features, numeric_cols, version = self.holder.current()
+        frame = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+        start = time.perf_counter()
+        preds = model.predict(prepare_features(frame, features, numeric_cols))
+        self.stats['predict_seconds'] += time.perf_counter() - start
+        self.stats['batches'] += 1
+        return preds, version
+
+    def _loop(self):
+        while True:
+            items = self._collect()
+            self.stats['requests'] += len(items)
+            self.stats['rows'] += sum(len(frame) for frame, _ in items)
+            try:
+                preds, version = self._predict([frame for frame, _ in items])
+            except Exception as e:
+                if len(items) == 1:
+                    items[0][1].set_exception(e)
+                    continue
+                # Satu request rusak tidak boleh menggagalkan request lain di batch yang sama
+                for frame, future in items:
+                    try:
+                        future.set_result(self._predict([frame]))
+                    except Exception as item_error:
+                        future.set_exception(item_error)
+                continue
+            offsets = np.cumsum([len(frame) for frame, _ in items])[:-1]
+            for part, (_, future) in zip(np.split(preds, offsets), items):
+                future.set_result((part, version))
+
+
+def payload_frame(payload):
+    """DataFrame dari body /predict (format split dari DataFrame.to_json atau list records)."""
+    if 'records' in payload:
+        return pd.DataFrame(payload['records'])
+    return pd.DataFrame(payload['data'], columns=payload['columns'])
+
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _send(self, status, body):
+        data = json.dumps(body, default=str).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path != '/health':
+            return self._send(404, {'error': f"Path {self.path} tidak dikenal"})
+        self._send(200, self.server.service_info())
+
+    def do_POST(self):
+        if self.path != '/predict':
+            return self._send(404, {'error': f"Path {self.path} tidak dikenal"})
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            frame = payload_frame(json.loads(self.rfile.read(length)))
+        except (ValueError, KeyError, TypeError) as e:
+            return self._send(400, {'error': f"Body request tidak valid: {e}"})
+
+        _, features, _, _ = self.server.holder.current()
+        missing = [col for col in features if col not in frame.columns]
+        if missing:
+            return self._send(400, {'error': f"Kolom fitur berikut tidak ditemukan: {missing}"})
+        if frame.empty:
+            return self._send(200, {'predictions': [], 'model_version': self.server.holder.version, 'rows': 0})
+
+        try:
+            preds, version = self.server.batcher.predict(frame)
+        except Exception as e:
+            return self._send(500, {'error': f"{type(e).__name__}: {e}"})
+        self._send(200, {'predictions': preds.tolist(), 'model_version': version, 'rows': len(preds)})
+
+    def address_string(self):
+        # Client Unix socket tidak punya alamat IP
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        # Log per request dimatikan supaya server tidak membanjiri terminal
+        pass
+
+
+class _ServiceMixin:
+    daemon_threads = True
+
+    def attach(self, holder, batcher, address):
+        self.holder = holder
+        self.batcher = batcher
+        self.address = address
+
+    def service_info(self):
+        model, features, numeric_cols, version = self.holder.current()
+        stats = dict(self.batcher.stats)
+        stats['avg_batch_rows'] = stats['rows'] / stats['batches'] if stats['batches'] else 0
+        return {
+            'status': 'ok',
+            'address': self.address,
+            'model_path': self.holder.model_path,
+            'model_version': version,
+            'loaded_at': self.holder.loaded_at,
+            'reloads': self.holder.reloads,
+            'features': features,
+            'numeric_features': numeric_cols,
+            'stats': stats,
+        }
+
+
+class TCPModelServer(_ServiceMixin, ThreadingHTTPServer):
+    # Antrean koneksi lebih panjang dari default (5) supaya lonjakan request tidak ditolak
+    request_queue_size = 128
+
+
+class UnixModelServer(_ServiceMixin, socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    request_queue_size = 128
+
+    def server_bind(self):
+        # Socket sisa server sebelumnya yang mati tidak dibersihkan otomatis
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        super().server_bind()
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+def create_server(address, model_path, features_path, max_batch_rows=MAX_BATCH_ROWS,
+                  max_wait=MAX_WAIT_SECONDS, poll_seconds=RELOAD_POLL_SECONDS):
+    """Muat model, mulai thread batcher & reload, lalu buat server (belum serve_forever)."""
+    holder = ModelHolder(model_path, features_path)
+    holder.watch(poll_seconds)
+    batcher = MicroBatcher(holder, max_batch_rows, max_wait)
+    kind, target = parse_address(address)
+    server_class = UnixModelServer if kind == 'unix' else TCPModelServer
+    server = server_class(target, PredictionHandler)
+    server.attach(holder, batcher, address)
+    return server
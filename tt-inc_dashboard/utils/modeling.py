@@ -1,4 +1,6 @@
 import os
+import threading
+import numpy as np
 import pandas as pd
 import joblib
 from sklearn.model_selection import train_test_split
@@ -9,30 +11,41 @@ from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import json
+from common.diagnostics import stage
+from common.jobs import check_cancelled, fit_forest_in_steps
+from .model_client import MODEL_SERVER, connect_model_server
 
 
 MODEL_PATH = 'saved_model/model.pkl'
 FEATURES_PATH = 'saved_model/model_features.json'
+# Slot job training di session_state dashboard (satu job aktif per sesi)
+MODEL_JOB_SLOT = 'tt_model'
+TARGET = 'restoreduration'
+MODEL_FEATURES = [
+    'severity',
+    'circle',
+    'siteregion',
+    'rootcause',
+    'subcause',
+    'subcause2',
+    'mccluster',
+    'orderid'
+]
+
+
+def model_exists():
+    return os.path.exists(MODEL_PATH)
 
 
 def train_model(df: pd.DataFrame, force_retrain=False, return_mae=False):
     if not force_retrain and os.path.exists(MODEL_PATH):
-        model = joblib.load(MODEL_PATH)
+        model = load_model()
         if return_mae:
             return model, None
         return model
 
-    target = 'restoreduration'
-    features = [
-        'severity',
-        'circle',
-        'siteregion',
-        'rootcause',
-        'subcause',
-        'subcause2',
-        'mccluster',
-        'orderid'
-    ]
+    target = TARGET
+    features = list(MODEL_FEATURES)
 
     missing_cols = [col for col in features + [target] if col not in df.columns]
     if missing_cols:
@@ -42,8 +55,9 @@ def train_model(df: pd.DataFrame, force_retrain=False, return_mae=False):
     X = df[features]
     y = df[target]
 
-    cat_features = X.select_dtypes(include='object').columns.tolist()
-    num_features = X.select_dtypes(exclude='object').columns.tolist()
+    # Kolom non-numerik (object / string / category) di-one-hot, sisanya numerik
+    cat_features = [col for col in X.columns if not pd.api.types.is_numeric_dtype(X[col])]
+    num_features = [col for col in X.columns if pd.api.types.is_numeric_dtype(X[col])]
 
     preprocessor = ColumnTransformer([
         ('cat', Pipeline([
@@ -62,13 +76,22 @@ def train_model(df: pd.DataFrame, force_retrain=False, return_mae=False):
         X, y, test_size=0.2, random_state=42
     )
 
-    model.fit(X_train, y_train)
+    # Preprocessor lalu RandomForest dilatih terpisah: di dalam job latar belakang forest
+    # dilatih bertahap supaya bisa dibatalkan (hasilnya sama dengan model.fit)
+    with stage('fit', rows_in=len(X_train)):
+        X_train_enc = model.named_steps['preprocess'].fit_transform(X_train, y_train)
+        fit_forest_in_steps(model.named_steps['regressor'], X_train_enc, y_train)
 
     y_pred = model.predict(X_test)
     mae = mean_absolute_error(y_test, y_pred)
 
+    # Job yang sudah dibatalkan tidak boleh menimpa model di disk
+    check_cancelled()
     os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
-    joblib.dump(model, MODEL_PATH)
+    # Tulis ke file sementara lalu rename: sesi lain tidak pernah memuat file setengah jadi
+    tmp_path = f"{MODEL_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+    joblib.dump(model, tmp_path)
+    os.replace(tmp_path, MODEL_PATH)
 
     # Simpan fitur ke file json
     with open(FEATURES_PATH, 'w') as f:
@@ -80,7 +103,12 @@ def train_model(df: pd.DataFrame, force_retrain=False, return_mae=False):
         return model
 
 
-def load_model():
+def load_model(server=MODEL_SERVER):
+    # Model server (TT_MODEL_SERVER) yang hidup sudah memegang model di memori: pakai itu,
+    # tidak perlu unpickle model sendiri. Model yang baru dilatih dimuat ulang otomatis oleh server.
+    remote = connect_model_server(server)
+    if remote is not None:
+        return remote
     if not os.path.exists(MODEL_PATH):
         raise FileNotFoundError(f"Model tidak ditemukan di path: {MODEL_PATH}")
     model = joblib.load(MODEL_PATH)
@@ -131,7 +159,7 @@ def evaluate_prediction(df, model):
     if df['actual_minutes'].isnull().all():
         raise ValueError("Semua nilai 'serviceinterruptiontime' tidak dapat dikonversi ke menit.")
 
-    feature_cols = load_model_features()
+    feature_cols = load_model_features() or MODEL_FEATURES
     missing_cols = set(feature_cols) - set(df.columns)
     if missing_cols:
         raise ValueError(f"Kolom fitur berikut tidak ditemukan di data evaluasi: {missing_cols}")
@@ -150,7 +178,8 @@ def evaluate_prediction(df, model):
 
     metrics = {
         'MAE': mean_absolute_error(y_true, y_pred),
-        'RMSE': mean_squared_error(y_true, y_pred, squared=False),
+        # squared=False sudah dihapus di scikit-learn 1.6, akar MSE dihitung sendiri
+        'RMSE': np.sqrt(mean_squared_error(y_true, y_pred)),
         'R2': r2_score(y_true, y_pred)
     }
 
@@ -1,29 +1,33 @@
+import os
 import pandas as pd
+from common.file_probe import read_csv_fast
+from common.schema import apply_schema
+from common.dates import parse_datetime_column
+from common.diagnostics import timed
 
 def load_data(file):
     """
-    Load CSV file menjadi DataFrame pandas.
+    Load file CSV, Parquet, atau Feather menjadi DataFrame pandas.
+    Parquet/Feather dibaca langsung sehingga tipe datetime & numerik tetap terjaga.
     """
-    df = pd.read_csv(file)
+    file_ext = os.path.splitext(getattr(file, 'name', str(file)))[-1].lower()
+    if file_ext == '.parquet':
+        return pd.read_parquet(file)
+    if file_ext == '.feather':
+        return pd.read_feather(file)
+    df = read_csv_fast(file)
     return df
 
-def clean_data(df):
+def normalize_columns(columns):
     """
-    Bersihkan dataframe:
-    - Normalisasi nama kolom (lowercase, hapus spasi dan titik)
-    - Hindari duplikat nama kolom dengan suffix angka
-    - Convert kolom datetime tertentu ke tipe datetime
-    - Tambahkan kolom week, month, quarter berdasarkan kolom 'createtime' dengan format yang rapi
-    - Konversi kolom durasi ke numerik
-    
-    Return dataframe yang sudah dibersihkan.
+    Nama kolom bersih: lowercase, tanpa spasi & titik; nama yang bentrok diberi suffix angka
+    (`orderid`, `orderid_1`, ...). Dipakai clean_data dan scoring batch.
     """
-    # Bersihkan dan normalisasi nama kolom
     new_cols = []
     seen = set()
-    for col in df.columns:
+    for col in columns:
         col_clean = (
-            col.strip()
+            str(col).strip()
                .lower()
                .replace(' ', '')
                .replace('.', '')
@@ -35,15 +39,30 @@ def clean_data(df):
             col_clean = f"{col_clean}_{suffix}"
         seen.add(col_clean)
         new_cols.append(col_clean)
-    df.columns = new_cols
+    return new_cols
+
+def clean_data(df):
+    """
+    Bersihkan dataframe:
+    - Normalisasi nama kolom (lowercase, hapus spasi dan titik)
+    - Hindari duplikat nama kolom dengan suffix angka
+    - Convert kolom datetime tertentu ke tipe datetime
+    - Tambahkan kolom week, month, quarter berdasarkan kolom 'createtime' dengan format yang rapi
+    - Konversi kolom durasi ke numerik
+    - Kolom label (circle, severity, siteregion, mccluster, ...) disimpan sebagai category
+    
+    Return dataframe yang sudah dibersihkan.
+    """
+    # Bersihkan dan normalisasi nama kolom
+    df.columns = normalize_columns(df.columns)
 
     # List kolom datetime yang sering ada di dataset
     datetime_cols = ['createtime', 'faultfirstoccurtime', 'submittime', 'closetime', 'createat', 'closuretime']
 
-    # Convert kolom datetime ke tipe datetime pandas
+    # Convert kolom datetime ke tipe datetime pandas (format dideteksi sekali per kolom)
     for col in datetime_cols:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors='coerce')
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = parse_datetime_column(df[col])
 
     # Tambahkan kolom week, month, quarter dari kolom 'createtime'
     if 'createtime' in df.columns:
@@ -63,4 +82,11 @@ def clean_data(df):
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors='coerce')
 
+    apply_schema(df)
+
     return df
+
+def load_and_clean(file):
+    """Load file lalu bersihkan (load_data + clean_data), unit yang di-cache oleh app."""
+    df = timed('load_data', load_data, file)
+    return timed('clean_data', clean_data, df)
@@ -0,0 +1,216 @@
+"""
+Scoring batch model restore duration untuk banyak tiket sekaligus (tanpa Streamlit).
+
+Model & daftar fitur dimuat sekali (per proses worker), file tiket dibaca per chunk
+hanya untuk kolom yang dibutuhkan, lalu tiap chunk diprediksi dengan satu panggilan
+model.predict. Hasil ditulis bertahap ke CSV / Parquet, jadi ukuran file tidak dibatasi RAM.
+"""
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import pandas as pd
+
+from common.file_probe import read_csv_fast
+from .modeling import MODEL_PATH, FEATURES_PATH, MODEL_FEATURES
+from .model_client import connect_model_server
+from .preprocessing import normalize_columns
+from common.diagnostics import stage
+
+CHUNK_ROWS = 100_000
+OUTPUT_FORMATS = ['csv', 'parquet']
+PREDICTION_COLUMN = 'Predicted_Restore_Duration'
+# Kolom identitas yang ikut ditulis di samping prediksi (bila ada di file)
+KEEP_COLUMNS = ['orderid']
+# Tiket dianggap masih open bila kolom ini kosong
+CLOSE_TIME_COLUMN = 'closetime'
+
+# Model milik proses worker (diisi sekali oleh init_worker)
+_MODEL = None
+_FEATURES = None
+
+
+def read_features(features_path=FEATURES_PATH):
+    """Daftar fitur model dari model_features.json (fallback: fitur bawaan training)."""
+    if not os.path.exists(features_path):
+        return list(MODEL_FEATURES)
+    with open(features_path, 'r') as f:
+        return json.load(f)
+
+
+def load_scoring_model(model_path=MODEL_PATH, features_path=FEATURES_PATH, n_jobs=None, server=None):
+    """
+    Muat model & daftar fitur sekali. n_jobs menimpa n_jobs RandomForest saat predict
+    (-1 = semua core untuk satu proses, 1 di worker supaya core tidak rebutan).
+    server: alamat model server; bila server hidup dipakai RemoteModel (fitur dari server),
+    bila tidak model dimuat lokal. Return (model, features).
+    """
+    remote = connect_model_server(server) if server else None
+    if remote is not None:
+        return remote, remote.features
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Model tidak ditemukan di path: {model_path}")
+    model = joblib.load(model_path)
+    if n_jobs is not None and 'regressor' in getattr(model, 'named_steps', {}):
+        model.named_steps['regressor'].set_params(n_jobs=n_jobs)
+    return model, read_features(features_path)
+
+
+def numeric_features(model):
+    """Kolom yang dilatih sebagai numerik (transformer 'num' di ColumnTransformer model)."""
+    try:
+        transformers = model.named_steps['preprocess'].transformers_
+    except (AttributeError, KeyError):
+        return []
+    return [col for name, _, cols in transformers if name == 'num' for col in cols]
+
+
+def _file_columns(path):
+    """Nama kolom mentah file (tanpa membaca isinya)."""
+    ext = os.path.splitext(str(path))[-1].lower()
+    if ext == '.parquet':
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).schema_arrow.names
+    if ext == '.feather':
+        import pyarrow.feather as feather
+        return feather.read_table(path, memory_map=True).schema.names
+    return list(read_csv_fast(path, nrows=0).columns)
+
+
+def iter_ticket_chunks(path, columns, chunk_rows=CHUNK_ROWS, raw=None):
+    """
+    Baca file tiket per chunk, hanya kolom (nama sudah dinormalisasi) yang ada di `columns`.
+    raw: nama kolom mentah bila sudah dibaca. Yield DataFrame dengan nama kolom ternormalisasi.
+    """
+    raw = _file_columns(path) if raw is None else raw
+    normalized = normalize_columns(raw)
+    positions = [i for i, col in enumerate(normalized) if col in set(columns)]
+    names = [normalized[i] for i in positions]
+    ext = os.path.splitext(str(path))[-1].lower()
+
+    if ext == '.parquet':
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(path)
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=[raw[i] for i in positions]):
+            chunk = batch.to_pandas()
+            chunk.columns = names
+            yield chunk
+    elif ext == '.feather':
+        df = pd.read_feather(path, columns=[raw[i] for i in positions])
+        df.columns = names
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+    else:
+        for chunk in read_csv_fast(path, usecols=positions, chunksize=chunk_rows):
+            chunk.columns = names
+            yield chunk
+
+
+def score_chunk(chunk, model, features, numeric_cols, keep_columns=KEEP_COLUMNS, open_only=False):
+    """Prediksi satu chunk sekaligus. Return DataFrame kolom identitas + PREDICTION_COLUMN."""
+    if open_only and CLOSE_TIME_COLUMN in chunk.columns:
+        closed = chunk[CLOSE_TIME_COLUMN].astype('string').str.strip().fillna('') != ''
+        chunk = chunk[~closed.to_numpy()]
+    X = chunk[features].copy()
+    for col in numeric_cols:
+        X[col] = pd.to_numeric(X[col], errors='coerce')
+    result = chunk[[col for col in keep_columns if col in chunk.columns]].copy()
+    result[PREDICTION_COLUMN] = model.predict(X) if len(X) else []
+    return result.reset_index(drop=True)
+
+
+def init_worker(model_path, features_path, server=None):
+    """Initializer ProcessPoolExecutor: tiap worker memuat model sekali (atau terhubung ke server), satu core per worker."""
+    global _MODEL, _FEATURES
+    _MODEL, _FEATURES = load_scoring_model(model_path, features_path, n_jobs=1, server=server)
+
+
+def _score_in_worker(chunk, keep_columns, open_only):
+    return score_chunk(chunk, _MODEL, _FEATURES, numeric_features(_MODEL), keep_columns, open_only)
+
+
+class PredictionWriter:
+    """Tulis hasil per chunk ke satu file CSV (append) atau Parquet (row group per chunk)."""
+
+    def __init__(self, path, fmt):
+        self.path = path
+        self.fmt = fmt
+        self.rows = 0
+        self._writer = None
+
+    def write(self, result):
+        if self.fmt == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(result, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            else:
+                # Chunk berikutnya bisa bertipe lain (misal kolom kosong semua): samakan ke skema awal
+                table = table.cast(self._writer.schema)
+            self._writer.write_table(table)
+        else:
+            result.to_csv(self.path, mode='w' if self.rows == 0 else 'a', header=self.rows == 0, index=False)
+        self.rows += len(result)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        elif self.rows == 0:
+            # Tidak ada chunk sama sekali: tetap tulis file kosong supaya output selalu ada
+            empty = pd.DataFrame(columns=KEEP_COLUMNS + [PREDICTION_COLUMN])
+            if self.fmt == 'parquet':
+                empty.to_parquet(self.path, index=False)
+            else:
+                empty.to_csv(self.path, index=False)
+
+
+def score_file(path, output_path, fmt='csv', model=None, features=None, model_path=MODEL_PATH,
+               features_path=FEATURES_PATH, chunk_rows=CHUNK_ROWS, workers=1, keep_columns=KEEP_COLUMNS,
+               open_only=False, server=None):
+    """
+    Prediksi restore duration semua tiket di `path` lalu tulis ke output_path.
+
+    model / features: hasil load_scoring_model yang dipakai ulang antar file (dimuat dari
+    model_path bila None). workers > 1: chunk diprediksi paralel di proses worker (model
+    dimuat sekali per worker); urutan output tetap sama dengan input. server: alamat model
+    server yang dipakai bila hidup (lihat load_scoring_model).
+    Return dict ringkasan (file, output, rows_in, rows_out).
+    """
+    if features is None:
+        features = read_features(features_path)
+    raw = _file_columns(path)
+    missing = set(features) - set(normalize_columns(raw))
+    if missing:
+        raise ValueError(f"Kolom fitur berikut tidak ditemukan di {path}: {sorted(missing)}")
+    columns = list(dict.fromkeys(list(features) + list(keep_columns) + [CLOSE_TIME_COLUMN]))
+
+    writer = PredictionWriter(output_path, fmt)
+    rows_in = 0
+    with stage('score_file') as record:
+        chunks = iter_ticket_chunks(path, columns, chunk_rows, raw=raw)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                     initargs=(model_path, features_path, server)) as executor:
+                # Batasi chunk yang sedang diproses supaya memori tidak menumpuk saat baca lebih cepat dari predict
+                pending = deque()
+                for chunk in chunks:
+                    rows_in += len(chunk)
+                    pending.append(executor.submit(_score_in_worker, chunk, keep_columns, open_only))
+                    if len(pending) >= workers * 2:
+                        writer.write(pending.popleft().result())
+                while pending:
+                    writer.write(pending.popleft().result())
+        else:
+            if model is None:
+                model, features = load_scoring_model(model_path, features_path, n_jobs=-1, server=server)
+            numeric_cols = numeric_features(model)
+            for chunk in chunks:
+                rows_in += len(chunk)
+                writer.write(score_chunk(chunk, model, features, numeric_cols, keep_columns, open_only))
+        writer.close()
+        record['rows_in'] = rows_in
+        record['rows_out'] = writer.rows
+    return {'file': path, 'output': output_path, 'rows_in': rows_in, 'rows_out': writer.rows}